@@ -1,31 +1,70 @@
-"""Context storage for agent tools to access user credentials."""
+"""Request-scoped context for agent tools (n8n credentials, session, etc).
+
+State lives in a `contextvars.ContextVar`, so every request (and every
+asyncio task it spawns) sees only its own values. Many chats can run
+concurrently on one event loop without overwriting each other.
+"""
 import logging
-from typing import Optional, Dict, Any
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, replace
+from typing import Optional, Dict, Any, Iterator
 
 logger = logging.getLogger(__name__)
 
-# Thread-local storage for n8n credentials
-_n8n_credentials: Optional[Dict[str, str]] = None
+
+@dataclass(frozen=True)
+class RequestContext:
+    """Per-request state read by the agent tools."""
+    n8n_credentials: Optional[Dict[str, str]] = None
+    session_id: Optional[str] = None
+    extras: Dict[str, Any] = field(default_factory=dict)
+
+
+_EMPTY_CONTEXT = RequestContext()
+_request_context: ContextVar[RequestContext] = ContextVar("flowgent_request_context", default=_EMPTY_CONTEXT)
+
+
+def get_request_context() -> RequestContext:
+    """Get the context of the current request."""
+    return _request_context.get()
+
+
+@contextmanager
+def request_context(
+    instance_url: Optional[str] = None,
+    api_key: Optional[str] = None,
+    session_id: Optional[str] = None,
+    **extras: Any
+) -> Iterator[RequestContext]:
+    """Scope a request context to a block; the previous context is restored on exit."""
+    credentials = None
+    if instance_url and api_key:
+        credentials = {"instance_url": instance_url, "api_key": api_key}
+    ctx = RequestContext(n8n_credentials=credentials, session_id=session_id, extras=dict(extras))
+    token = _request_context.set(ctx)
+    try:
+        yield ctx
+    finally:
+        _request_context.reset(token)
 
 
 def set_n8n_credentials(instance_url: str, api_key: str) -> None:
     """Store n8n credentials for current request context."""
-    global _n8n_credentials
-    _n8n_credentials = {
-        "instance_url": instance_url,
-        "api_key": api_key
-    }
+    # Contexts are immutable so a parent context is never changed under a child task
+    _request_context.set(replace(
+        _request_context.get(),
+        n8n_credentials={"instance_url": instance_url, "api_key": api_key}
+    ))
     logger.debug("Stored n8n credentials for agent context")
 
 
 def get_n8n_credentials() -> Optional[Dict[str, str]]:
     """Get n8n credentials for current request context."""
-    global _n8n_credentials
-    return _n8n_credentials
+    return _request_context.get().n8n_credentials
 
 
 def clear_n8n_credentials() -> None:
     """Clear stored n8n credentials."""
-    global _n8n_credentials
-    _n8n_credentials = None
+    _request_context.set(replace(_request_context.get(), n8n_credentials=None))
     logger.debug("Cleared n8n credentials from agent context")
@@ -1,7 +1,8 @@
 import os
 import json
+import time
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator, Union
 
 # Load environment variables FIRST, before any ADK imports
 from dotenv import load_dotenv
@@ -17,24 +18,31 @@ if _api_key:
 import google.genai as genai
 from google.genai import types
 from google.adk import Agent, Runner
-from google.adk.sessions import InMemorySessionService
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.models import BaseLlm
+from google.adk.sessions import BaseSessionService
 
 from agent.config import AGENT_MODEL, SYSTEM_INSTRUCTION, get_gemini_api_key
 from agent.context import get_n8n_credentials
+from agent.projection import project_tool_output
+from agent.session_store import create_session_service_from_env
+from observability.metrics import instrument_tool, record_llm_response, chat_turn
+from observability.tracing import llm_step_started, llm_step_finished
 from n8n_mcp.n8n_client import get_mcp_client
 from n8n_mcp.direct_client import create_n8n_client
+from n8n_mcp.workflow_patch import WorkflowConflictError
+from n8n_mcp.workflow_graph import auto_connect
+from n8n_mcp.workflow_validator import get_workflow_validator
+from n8n_mcp.idempotency import get_idempotency_store, request_fingerprint
+from n8n_mcp.env import env_int
 
 logger = logging.getLogger(__name__)
 
-# Simple session management
-USER_ID = "flowgent_user"
-_sessions = {}
+# Most workflows list_workflows hands the model per call
+LIST_WORKFLOWS_MAX = 100
 
-async def ensure_session(session_id: str):
-    """Ensure session exists for the given ID."""
-    if session_id not in _sessions:
-        # For simple client, we don't need complex session management
-        pass
+# Concurrent MCP calls per get_nodes_documentation call
+NODE_DOCS_CONCURRENCY = env_int("AGENT_NODE_DOCS_CONCURRENCY", 6)
 
 # ============= Core MCP Tools (Work without n8n API) =============
 
@@ -43,7 +51,7 @@ async def search_nodes(query: str) -> Dict[str, Any]:
     try:
         client = get_mcp_client()
         result = await client.search_nodes(query)
-        return {"status": "success", "data": result}
+        return {"status": "success", "data": project_tool_output("search_nodes", result)}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
@@ -53,7 +61,38 @@ async def get_node_documentation(node_type: str) -> Dict[str, Any]:
     try:
         client = get_mcp_client()
         result = await client.get_node(node_type, mode="docs", detail="full")
-        return {"status": "success", "data": result}
+        return {"status": "success", "data": project_tool_output("get_node_documentation", result)}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+async def get_nodes_documentation(node_types: List[str]) -> Dict[str, Any]:
+    """Get detailed documentation for several n8n node types at once (e.g., ['n8n-nodes-base.webhook', 'n8n-nodes-base.slack']). Prefer this over calling get_node_documentation once per node."""
+    try:
+        # Order-preserving de-duplication
+        unique_types = list(dict.fromkeys(t for t in node_types if t))
+        if not unique_types:
+            return {"status": "error", "message": "No node types given"}
+        
+        client = get_mcp_client()
+        results = await client.call_tools_batch(
+            [("get_node", {"nodeType": t, "mode": "docs", "detail": "full"}) for t in unique_types],
+            max_concurrency=NODE_DOCS_CONCURRENCY
+        )
+        docs = {}
+        errors = {}
+        for node_type, item in zip(unique_types, results):
+            if "error" in item:
+                errors[node_type] = item["error"]
+            else:
+                docs[node_type] = project_tool_output("get_nodes_documentation", item["result"])
+        
+        if not docs:
+            return {"status": "error", "message": "Could not fetch documentation", "errors": errors}
+        response = {"status": "success", "data": docs}
+        if errors:
+            response["errors"] = errors
+        return response
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
@@ -63,7 +102,7 @@ async def search_workflow_templates(query: str) -> Dict[str, Any]:
     try:
         client = get_mcp_client()
         result = await client.search_templates(query, search_mode="keyword")
-        return {"status": "success", "data": result}
+        return {"status": "success", "data": project_tool_output("search_workflow_templates", result)}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
@@ -73,18 +112,22 @@ async def get_workflow_template(template_id: str) -> Dict[str, Any]:
     try:
         client = get_mcp_client()
         result = await client.get_template(template_id, mode="full")
-        return {"status": "success", "data": result}
+        return {"status": "success", "data": project_tool_output("get_workflow_template", result)}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
 async def validate_workflow_json(workflow_json: str) -> Dict[str, Any]:
-    """Validate a workflow JSON structure."""
+    """Validate a workflow JSON structure.
+
+    Structural errors are reported locally without calling n8n-mcp, and
+    results are cached by content so revalidating unchanged JSON is free.
+    """
     try:
         workflow = json.loads(workflow_json) if isinstance(workflow_json, str) else workflow_json
         client = get_mcp_client()
-        result = await client.validate_workflow(workflow)
-        return {"status": "success", "data": result}
+        result = await get_workflow_validator().validate(workflow, client.validate_workflow)
+        return {"status": "success", "data": project_tool_output("validate_workflow_json", result)}
     except json.JSONDecodeError as e:
         return {"status": "error", "message": f"Invalid JSON: {str(e)}"}
     except Exception as e:
@@ -93,37 +136,51 @@ async def validate_workflow_json(workflow_json: str) -> Dict[str, Any]:
 
 # ============= n8n Management Tools (Require n8n API Config) =============
 
-async def list_workflows() -> Dict[str, Any]:
-    """List all workflows from connected n8n instance."""
+async def list_workflows(limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """List workflows from connected n8n instance, one page at a time.
+
+    Returns at most `limit` workflows (up to 100); pass the returned
+    next_cursor to get the next page.
+    """
+    limit = max(1, min(limit or LIST_WORKFLOWS_MAX, LIST_WORKFLOWS_MAX))
     try:
         # Check for direct n8n credentials first
         n8n_creds = get_n8n_credentials()
         if n8n_creds and n8n_creds.get("instance_url") and n8n_creds.get("api_key"):
             logger.info("Using direct n8n client for list_workflows (agent)")
             direct_client = create_n8n_client(n8n_creds["instance_url"], n8n_creds["api_key"])
-            workflows = await direct_client.list_workflows()
-            return {
-                "status": "success",
-                "count": len(workflows),
-                "workflows": [{"id": w.get("id"), "name": w.get("name"), "active": w.get("active")} for w in workflows]
-            }
+            workflows, next_cursor = [], None
+            async for page, next_cursor in direct_client.iter_workflow_pages(limit, cursor, limit):
+                workflows.extend(page)
+        else:
+            # Fall back to MCP, which has no cursor: pages are offsets into its list
+            logger.info("Using MCP client for list_workflows (agent)")
+            client = get_mcp_client()
+            everything = await client.list_workflows()
+            offset = int(cursor) if cursor and cursor.isdigit() else 0
+            workflows = everything[offset:offset + limit]
+            next_cursor = str(offset + limit) if offset + limit < len(everything) else None
         
-        # Fall back to MCP
-        logger.info("Using MCP client for list_workflows (agent)")
-        client = get_mcp_client()
-        workflows = await client.list_workflows()
-        return {
+        result = {
             "status": "success",
             "count": len(workflows),
             "workflows": [{"id": w.get("id"), "name": w.get("name"), "active": w.get("active")} for w in workflows]
         }
+        if next_cursor:
+            result["next_cursor"] = next_cursor
+            result["note"] = "More workflows exist; call list_workflows with this cursor to see them"
+        return result
     except Exception as e:
         logger.error(f"list_workflows failed: {e}", exc_info=True)
         return {"status": "error", "message": str(e)}
 
 
-async def get_workflow(workflow_id: str) -> Dict[str, Any]:
-    """Get a specific workflow by ID from connected n8n instance."""
+async def get_workflow(workflow_id: str, node_name: Optional[str] = None) -> Dict[str, Any]:
+    """Get a specific workflow by ID from connected n8n instance.
+
+    Large workflows come back as an outline; pass node_name to get one node
+    in full, with its outgoing connections.
+    """
     try:
         n8n_creds = get_n8n_credentials()
         if n8n_creds and n8n_creds.get("instance_url") and n8n_creds.get("api_key"):
@@ -135,46 +192,27 @@ async def get_workflow(workflow_id: str) -> Dict[str, Any]:
             client = get_mcp_client()
             workflow = await client.get_workflow(workflow_id)
         
+        if workflow and node_name:
+            for node in workflow.get("nodes") or []:
+                if isinstance(node, dict) and node.get("name") == node_name:
+                    connections = (workflow.get("connections") or {}).get(node_name, {})
+                    return {"status": "success", "node": node, "connections": connections}
+            return {"status": "error", "message": f"Workflow {workflow_id} has no node named '{node_name}'"}
         if workflow:
-            return {"status": "success", "workflow": workflow}
+            return {"status": "success", "workflow": project_tool_output("get_workflow", workflow)}
         return {"status": "error", "message": f"Workflow {workflow_id} not found"}
     except Exception as e:
         logger.error(f"get_workflow failed for {workflow_id}: {e}", exc_info=True)
         return {"status": "error", "message": str(e)}
 
 
-def _auto_connect_nodes(nodes: List[Dict]) -> Dict[str, Any]:
-    """
-    Automatically connect nodes in a linear sequence (1->2->3).
-    Useful when AI fails to generate connections.
+async def create_workflow(name: str, description: str, nodes_json: str, idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+    """Create a new n8n workflow from JSON definition.
+
+    Pass the same idempotency_key when retrying a create so it cannot make a
+    duplicate; without one, identical calls within a short window are
+    answered with the workflow created by the first.
     """
-    if not nodes or len(nodes) < 2:
-        return {}
-    
-    connections = {}
-    for i in range(len(nodes) - 1):
-        source_node = nodes[i].get("name")
-        target_node = nodes[i+1].get("name")
-        
-        if source_node and target_node:
-            if source_node not in connections:
-                connections[source_node] = {}
-            
-            # Default to 'main' output and input
-            connections[source_node]["main"] = [
-                [
-                    {
-                        "node": target_node,
-                        "type": "main",
-                        "index": 0
-                    }
-                ]
-            ]
-    return connections
-
-
-async def create_workflow(name: str, description: str, nodes_json: str) -> Dict[str, Any]:
-    """Create a new n8n workflow from JSON definition."""
     try:
         nodes_data = json.loads(nodes_json) if isinstance(nodes_json, str) else nodes_json
         
@@ -190,22 +228,29 @@ async def create_workflow(name: str, description: str, nodes_json: str) -> Dict[
         if not isinstance(nodes, list):
             nodes = []
             
-        # AUTO-CONNECT: If we have nodes but no connections, connect them linearly
+        # AUTO-CONNECT: If we have nodes but no connections, wire them in list order
         if nodes and not connections and len(nodes) > 1:
             logger.info(f"Auto-connecting {len(nodes)} nodes for workflow '{name}'")
-            connections = _auto_connect_nodes(nodes)
+            connections = auto_connect(nodes)
         
         n8n_creds = get_n8n_credentials()
         if n8n_creds and n8n_creds.get("instance_url") and n8n_creds.get("api_key"):
             logger.info(f"Using direct n8n client for create_workflow '{name}' (agent)")
             direct_client = create_n8n_client(n8n_creds["instance_url"], n8n_creds["api_key"])
-            result = await direct_client.create_workflow(name, nodes, connections)
+            scope = "#".join(direct_client.cache_key)
+            create = lambda: direct_client.create_workflow(name, nodes, connections)
         else:
             logger.info(f"Using MCP client for create_workflow '{name}' (agent)")
             client = get_mcp_client()
-            result = await client.create_workflow(name, nodes, connections)
+            scope = "mcp"
+            create = lambda: client.create_workflow(name, nodes, connections)
         
-        return {"status": "success", "workflow_id": result.get("id"), "name": name}
+        fingerprint = request_fingerprint(name, nodes, connections)
+        result, replayed = await get_idempotency_store().run(scope, idempotency_key, fingerprint, create)
+        response = {"status": "success", "workflow_id": result.get("id"), "name": name}
+        if replayed:
+            response["replayed"] = True
+        return response
     except json.JSONDecodeError as e:
         return {"status": "error", "message": f"Invalid JSON: {str(e)}"}
     except Exception as e:
@@ -240,6 +285,36 @@ async def update_workflow(workflow_id: str, updates_json: str) -> Dict[str, Any]
         return {"status": "error", "message": str(e)}
 
 
+async def patch_workflow(workflow_id: str, operations_json: str, expected_updated_at: Optional[str] = None) -> Dict[str, Any]:
+    """Edit part of an existing n8n workflow without resending it. Provide a JSON list of operations, e.g. [{"type": "updateNode", "nodeName": "HTTP Request", "updates": {"parameters.url": "https://example.com"}}, {"type": "addConnection", "source": "Webhook", "target": "HTTP Request"}]. Supported types: addNode, removeNode, updateNode, renameNode, moveNode, enableNode, disableNode, addConnection, removeConnection, updateName, updateSettings. Pass the workflow's updatedAt as expected_updated_at to avoid overwriting someone else's changes."""
+    try:
+        operations = json.loads(operations_json) if isinstance(operations_json, str) else operations_json
+        
+        n8n_creds = get_n8n_credentials()
+        if n8n_creds and n8n_creds.get("instance_url") and n8n_creds.get("api_key"):
+            logger.info(f"Using direct n8n client for patch_workflow {workflow_id} (agent)")
+            direct_client = create_n8n_client(n8n_creds["instance_url"], n8n_creds["api_key"])
+            result = await direct_client.patch_workflow(workflow_id, operations, expected_updated_at)
+        else:
+            logger.info(f"Using MCP client for patch_workflow {workflow_id} (agent)")
+            client = get_mcp_client()
+            result = await client.patch_workflow(workflow_id, operations, expected_updated_at)
+        
+        return {
+            "status": "success",
+            "workflow_id": result.get("id", workflow_id),
+            "updated_at": result.get("updatedAt"),
+            "message": f"Applied {len(operations)} operations to workflow {workflow_id}"
+        }
+    except json.JSONDecodeError as e:
+        return {"status": "error", "message": f"Invalid JSON: {str(e)}"}
+    except WorkflowConflictError as e:
+        return {"status": "conflict", "message": f"{e}. Fetch the workflow again and reapply your changes."}
+    except Exception as e:
+        logger.error(f"patch_workflow failed for {workflow_id}: {e}", exc_info=True)
+        return {"status": "error", "message": str(e)}
+
+
 async def execute_workflow(workflow_id: str, input_data: Optional[str] = None) -> Dict[str, Any]:
     """Execute a workflow with optional input data."""
     try:
@@ -255,7 +330,7 @@ async def execute_workflow(workflow_id: str, input_data: Optional[str] = None) -
                 logger.info(f"Trying direct n8n client for execute_workflow {workflow_id}")
                 direct_client = create_n8n_client(n8n_creds["instance_url"], n8n_creds["api_key"])
                 result = await direct_client.execute_workflow(workflow_id, parsed_input)
-                return {"status": "success", "execution_id": result.get("id"), "result": result}
+                return {"status": "success", "execution_id": result.get("id"), "result": project_tool_output("execute_workflow", result)}
             except Exception as direct_error:
                 logger.warning(f"Direct n8n execute failed, falling back to MCP: {direct_error}")
         
@@ -264,7 +339,7 @@ async def execute_workflow(workflow_id: str, input_data: Optional[str] = None) -
         client = get_mcp_client()
         result = await client.execute_workflow(workflow_id, parsed_input)
         
-        return {"status": "success", "execution_id": result.get("id"), "result": result}
+        return {"status": "success", "execution_id": result.get("id"), "result": project_tool_output("execute_workflow", result)}
     except json.JSONDecodeError as e:
         return {"status": "error", "message": f"Invalid input JSON: {str(e)}"}
     except Exception as e:
@@ -274,27 +349,62 @@ async def execute_workflow(workflow_id: str, input_data: Optional[str] = None) -
 
 # ============= ADK Agent =============
 
-def create_flowgent_agent() -> Agent:
-    """Create the Flowgent agent with all MCP tools."""
+def _model_callbacks(model_name: str):
+    """ADK model callbacks recording metrics and trace spans under `model_name`.
+
+    They leave requests and responses unchanged.
+    """
+    def before_model(callback_context, llm_request):
+        llm_step_started(callback_context.invocation_id, model_name)
+        return None
+
+    def after_model(callback_context, llm_response):
+        record_llm_response(model_name, llm_response)
+        llm_step_finished(callback_context.invocation_id, llm_response)
+        return None
+
+    def on_model_error(callback_context, llm_request, error):
+        # ADK re-raises the error after this
+        llm_step_finished(callback_context.invocation_id, error=error)
+        return None
+
+    return before_model, after_model, on_model_error
+
+
+def create_flowgent_agent(model: Optional[Union[str, BaseLlm]] = None) -> Agent:
+    """Create the Flowgent agent with all MCP tools.
+
+    `model` defaults to AGENT_MODEL; a BaseLlm instance (e.g. the scripted
+    model in benchmarks/) replaces Gemini entirely.
+    """
+    model = model or AGENT_MODEL
+    model_name = model if isinstance(model, str) else model.model
+    before_model, after_model, on_model_error = _model_callbacks(model_name)
+    tools = [
+        # Core MCP tools (always work)
+        search_nodes,
+        get_node_documentation,
+        get_nodes_documentation,
+        search_workflow_templates,
+        get_workflow_template,
+        validate_workflow_json,
+        # n8n management tools (need n8n API)
+        list_workflows,
+        get_workflow,
+        create_workflow,
+        update_workflow,
+        patch_workflow,
+        execute_workflow,
+    ]
     return Agent(
         name="flowgent",
-        model=AGENT_MODEL,
+        model=model,
         description="AI assistant for n8n workflow automation with MCP integration",
         instruction=SYSTEM_INSTRUCTION,
-        tools=[
-            # Core MCP tools (always work)
-            search_nodes,
-            get_node_documentation,
-            search_workflow_templates,
-            get_workflow_template,
-            validate_workflow_json,
-            # n8n management tools (need n8n API)
-            list_workflows,
-            get_workflow,
-            create_workflow,
-            update_workflow,
-            execute_workflow,
-        ]
+        tools=[instrument_tool(tool) for tool in tools],
+        before_model_callback=before_model,
+        after_model_callback=after_model,
+        on_model_error_callback=on_model_error
     )
 
 
@@ -302,27 +412,43 @@ APP_NAME = "flowgent"
 USER_ID = "default_user"
 
 # Singletons
-_session_service: Optional[InMemorySessionService] = None
+_session_service: Optional[BaseSessionService] = None
 _runner: Optional[Runner] = None
 _agent: Optional[Agent] = None
+_agent_model: Optional[Union[str, BaseLlm]] = None  # None means AGENT_MODEL
 
 
-def get_session_service() -> InMemorySessionService:
+def get_session_service() -> BaseSessionService:
     global _session_service
     if _session_service is None:
-        _session_service = InMemorySessionService()
+        _session_service = create_session_service_from_env()
     return _session_service
 
 
-def reset_agent():
-    """Reset cached agent/runner/session to pick up new environment variables."""
-    global _session_service, _runner, _agent
+def close_session_service():
+    """Close the session store (on shutdown)."""
+    global _session_service, _runner
+    if _session_service is not None and hasattr(_session_service, "close"):
+        _session_service.close()
+    _session_service = None
+    _runner = None
+
+
+def reset_agent(model: Optional[Union[str, BaseLlm]] = None):
+    """Reset cached agent/runner/session to pick up new environment variables.
+
+    `model` is used for the next agent instead of AGENT_MODEL.
+    """
+    global _session_service, _runner, _agent, _agent_model
     _session_service = None
     _runner = None
     _agent = None
+    _agent_model = model
 
 
 def _init_env():
+    if isinstance(_agent_model, BaseLlm):
+        return  # not a Gemini model, no API key needed
     api_key = get_gemini_api_key()
     os.environ["GOOGLE_GENAI_API_KEY"] = api_key
 
@@ -331,7 +457,7 @@ def get_agent() -> Agent:
     global _agent
     if _agent is None:
         _init_env()
-        _agent = create_flowgent_agent()
+        _agent = create_flowgent_agent(_agent_model)
     return _agent
 
 
@@ -356,6 +482,88 @@ async def ensure_session(session_id: str):
         await svc.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
 
 
+API_KEY_NOT_CONFIGURED = (
+    "⚠️ **API Key Not Configured**\n\n"
+    "The Gemini API key is missing or invalid. Please configure it in your backend .env file:\n\n"
+    "1. Get your API key from: https://aistudio.google.com/apikey\n"
+    "2. Add it to backend/.env: `GOOGLE_GENAI_API_KEY=your-key-here`\n"
+    "3. Restart the backend\n\n"
+    "Until then, I can't provide AI-powered responses, but the n8n MCP tools should still work."
+)
+
+
+def is_api_key_error(e: Exception) -> bool:
+    """Whether an agent failure comes from a missing or invalid Gemini API key."""
+    error_msg = str(e).lower()
+    return any(marker in error_msg for marker in (
+        "google_genai_api_key", "api_key", "missing key", "api key not valid", "api key expired"
+    ))
+
+
+def agent_error_message(e: Exception) -> str:
+    """User-facing message for a failed agent turn (chat and streaming alike)."""
+    if is_api_key_error(e):
+        return API_KEY_NOT_CONFIGURED
+    return f"Error processing request: {str(e)}"
+
+
+async def stream_agent_events(message: str, session_id: str = "default_session") -> AsyncIterator[Dict[str, Any]]:
+    """Run the agent and yield events as soon as the runner produces them.
+
+    Each event is a dict with a "type" of:
+    - "text": a partial chunk of model text
+    - "tool_start": a tool call was issued (id, name)
+    - "tool_end": a tool call returned (id, name, duration_ms, status)
+    - "final": the complete final response
+    """
+    runner = get_runner()
+    await ensure_session(session_id)
+    
+    user_content = types.Content(role="user", parts=[types.Part(text=message)])
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE)
+    
+    tool_starts: Dict[str, Any] = {}
+    final_response = ""
+    with chat_turn("stream"):
+        async for event in runner.run_async(
+            user_id=USER_ID,
+            session_id=session_id,
+            new_message=user_content,
+            run_config=run_config
+        ):
+            if event.partial:
+                if event.content and event.content.parts:
+                    for part in event.content.parts:
+                        if getattr(part, "text", None):
+                            yield {"type": "text", "text": part.text}
+                continue
+        
+            for call in event.get_function_calls():
+                tool_starts[call.id] = (call.name, time.perf_counter())
+                yield {"type": "tool_start", "id": call.id, "name": call.name}
+        
+            for response in event.get_function_responses():
+                name, started = tool_starts.pop(response.id, (response.name, None))
+                status = response.response.get("status") if isinstance(response.response, dict) else None
+                yield {
+                    "type": "tool_end",
+                    "id": response.id,
+                    "name": name,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 1) if started else None,
+                    "status": status
+                }
+        
+            if event.is_final_response() and event.content and event.content.parts:
+                for part in event.content.parts:
+                    if getattr(part, "text", None):
+                        final_response += part.text
+    
+    yield {
+        "type": "final",
+        "response": final_response if final_response else "I processed your request but have no response."
+    }
+
+
 async def chat_with_agent(message: str, session_id: str = "default_session") -> str:
     """Send a message to the agent and get a response."""
     try:
@@ -366,45 +574,26 @@ async def chat_with_agent(message: str, session_id: str = "default_session") ->
         
         final_response = ""
         try:
-            async for event in runner.run_async(
-                user_id=USER_ID,
-                session_id=session_id,
-                new_message=user_content
-            ):
-                if event.is_final_response():
-                    if event.content and event.content.parts:
-                        for part in event.content.parts:
-                            if hasattr(part, 'text') and part.text:
-                                final_response += part.text
+            with chat_turn("chat"):
+                async for event in runner.run_async(
+                    user_id=USER_ID,
+                    session_id=session_id,
+                    new_message=user_content
+                ):
+                    if event.is_final_response():
+                        if event.content and event.content.parts:
+                            for part in event.content.parts:
+                                if hasattr(part, 'text') and part.text:
+                                    final_response += part.text
         except Exception as e:
             logger.error(f"Error during agent run: {e}", exc_info=True)
-            
-            # Check if it's an API key error
-            error_msg = str(e)
-            if "api_key" in error_msg.lower() or "missing key" in error_msg.lower():
-                return (
-                    "⚠️ **API Key Not Configured**\n\n"
-                    "The Gemini API key is not set. Please configure it in your backend .env file:\n\n"
-                    "1. Get your API key from: https://aistudio.google.com/apikey\n"
-                    "2. Add it to backend/.env: `GOOGLE_GENAI_API_KEY=your-key-here`\n"
-                    "3. Restart the backend\n\n"
-                    "Until then, I can't provide AI-powered responses, but the n8n MCP tools should still work."
-                )
-            
-            return f"Error processing request: {str(e)}"
+            return agent_error_message(e)
             
         return final_response if final_response else "I processed your request but have no response."
     except ValueError as e:
         # Handle API key configuration errors
-        error_msg = str(e)
-        if "GOOGLE_GENAI_API_KEY" in error_msg:
-            return (
-                "⚠️ **API Key Not Configured**\n\n"
-                "The Gemini API key is not set. Please configure it in your backend .env file:\n\n"
-                "1. Get your API key from: https://aistudio.google.com/apikey\n"
-                "2. Add it to backend/.env: `GOOGLE_GENAI_API_KEY=your-key-here`\n"
-                "3. Restart the backend"
-            )
+        if is_api_key_error(e):
+            return API_KEY_NOT_CONFIGURED
         raise
     except Exception as e:
         logger.error(f"Unexpected error in chat_with_agent: {e}", exc_info=True)
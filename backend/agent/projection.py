@@ -0,0 +1,197 @@
+"""Size budgets for tool results before they reach the model.
+
+Raw MCP payloads (full node docs, full templates, workflows with pinned data)
+can be tens of kilobytes per call. `project_tool_output` removes fields the
+model never needs, shortens long strings and lists, and then tightens those
+limits until the JSON fits the tool's byte budget (roughly 4 bytes per token).
+Trimmed places are marked in the output so the model knows something was left
+out.
+
+Workflows are the exception: the model edits from what get_workflow shows,
+so a workflow is never trimmed. It is passed on whole, or, if it doesn't fit,
+as an outline of its nodes (name, type, id) plus its connections and a note
+to fetch single nodes in full.
+
+AGENT_TOOL_MAX_BYTES_<TOOL> overrides a tool's byte budget; 0 disables
+projection for that tool.
+"""
+import os
+import json
+import logging
+from dataclasses import dataclass, replace
+from typing import Any, Dict, FrozenSet, Optional
+
+logger = logging.getLogger(__name__)
+
+# UI-only or bookkeeping fields that never help build a workflow
+NOISE_KEYS = frozenset({
+    "icon", "iconUrl", "iconColor", "iconBasePath", "badgeIconUrl", "codex",
+    "pinData", "staticData", "shared", "meta", "user", "image", "views",
+    "totalViews", "recentViews", "webhookId",
+})
+
+# Workflow fields never sent back on update; dropped from the top level only
+WORKFLOW_NOISE_KEYS = frozenset({"pinData", "staticData", "shared", "meta"})
+
+# Limits are never tightened below these
+MIN_STRING = 200
+MIN_LIST = 5
+
+
+@dataclass(frozen=True)
+class ProjectionBudget:
+    """How much of a tool's result is passed on to the model."""
+    max_bytes: int = 16_000
+    max_string: int = 2_000
+    max_list: int = 30
+    drop_keys: FrozenSet[str] = NOISE_KEYS
+    # Pass the result on whole or as an outline, never trimmed (workflows)
+    lossless: bool = False
+
+
+DEFAULT_BUDGET = ProjectionBudget()
+
+TOOL_BUDGETS: Dict[str, ProjectionBudget] = {
+    "search_nodes": ProjectionBudget(max_bytes=8_000, max_string=400, max_list=20),
+    "get_node_documentation": ProjectionBudget(max_bytes=16_000, max_string=4_000),
+    # Per node; the tool returns several of these
+    "get_nodes_documentation": ProjectionBudget(max_bytes=8_000, max_string=2_000),
+    "search_workflow_templates": ProjectionBudget(max_bytes=8_000, max_string=300, max_list=15),
+    "get_workflow_template": ProjectionBudget(max_bytes=20_000, max_string=1_500),
+    "validate_workflow_json": ProjectionBudget(max_bytes=8_000, max_string=500, max_list=40),
+    # Workflows are edited from what the model sees; see summarize_workflow
+    "get_workflow": ProjectionBudget(max_bytes=48_000, lossless=True),
+    "execute_workflow": ProjectionBudget(max_bytes=8_000, max_string=500, max_list=10),
+}
+
+
+@dataclass
+class ProjectionStats:
+    """Running totals for one tool."""
+    calls: int = 0
+    trimmed_calls: int = 0
+    original_bytes: int = 0
+    projected_bytes: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        saved = self.original_bytes - self.projected_bytes
+        return {
+            "calls": self.calls,
+            "trimmed_calls": self.trimmed_calls,
+            "original_bytes": self.original_bytes,
+            "projected_bytes": self.projected_bytes,
+            "saved_ratio": round(saved / self.original_bytes, 3) if self.original_bytes else 0.0,
+        }
+
+
+_stats: Dict[str, ProjectionStats] = {}
+
+
+def _json_size(value: Any) -> int:
+    return len(json.dumps(value, default=str, ensure_ascii=False).encode("utf-8"))
+
+
+def get_budget(tool_name: str) -> Optional[ProjectionBudget]:
+    """Budget for a tool, after env overrides. None means don't project."""
+    budget = TOOL_BUDGETS.get(tool_name, DEFAULT_BUDGET)
+    override = os.getenv(f"AGENT_TOOL_MAX_BYTES_{tool_name.upper()}")
+    if override:
+        try:
+            max_bytes = int(override)
+        except ValueError:
+            logger.warning(f"Ignoring invalid byte budget for {tool_name}: {override}")
+        else:
+            if max_bytes <= 0:
+                return None
+            budget = replace(budget, max_bytes=max_bytes)
+    return budget
+
+
+def _shrink(value: Any, drop_keys: FrozenSet[str], max_string: int, max_list: int) -> Any:
+    if isinstance(value, dict):
+        # Node parameters are user data - a parameter may well be called "user" or "image" -
+        # and connections are keyed by node names
+        return {
+            k: _shrink(v, frozenset() if k in ("parameters", "connections") else drop_keys, max_string, max_list)
+            for k, v in value.items() if k not in drop_keys
+        }
+    if isinstance(value, list):
+        items = [_shrink(v, drop_keys, max_string, max_list) for v in value[:max_list]]
+        if len(value) > max_list:
+            items.append(f"... {len(value) - max_list} more items omitted")
+        return items
+    if isinstance(value, str) and len(value) > max_string:
+        return value[:max_string] + f"... [{len(value) - max_string} chars truncated]"
+    return value
+
+
+def project(value: Any, budget: ProjectionBudget) -> Any:
+    """Fit `value` into `budget`, tightening string/list limits as needed."""
+    max_string, max_list = budget.max_string, budget.max_list
+    while True:
+        projected = _shrink(value, budget.drop_keys, max_string, max_list)
+        if _json_size(projected) <= budget.max_bytes:
+            return projected
+        if max_string <= MIN_STRING and max_list <= MIN_LIST:
+            break
+        max_string = max(MIN_STRING, max_string // 2)
+        max_list = max(MIN_LIST, max_list // 2)
+
+    # Still too big (e.g. very wide objects): hand over a JSON prefix instead
+    text = json.dumps(projected, default=str, ensure_ascii=False)
+    return {
+        "truncated": True,
+        "note": "Result exceeded the size budget; showing the beginning of its JSON",
+        "preview": text.encode("utf-8")[:budget.max_bytes].decode("utf-8", errors="ignore"),
+    }
+
+
+def summarize_workflow(workflow: Any, max_bytes: int) -> Any:
+    """The workflow without WORKFLOW_NOISE_KEYS, or an outline if that exceeds `max_bytes`.
+
+    Nodes, parameters and connections are never truncated: the outline lists
+    every node without its parameters and keeps the connections whole.
+    """
+    if not isinstance(workflow, dict):
+        return workflow
+    kept = {k: v for k, v in workflow.items() if k not in WORKFLOW_NOISE_KEYS}
+    size = _json_size(kept)
+    if size <= max_bytes:
+        return kept
+    outline = {k: v for k, v in kept.items() if k != "nodes"}
+    outline["nodes"] = [
+        {k: node[k] for k in ("name", "type", "typeVersion", "id") if k in node}
+        for node in kept.get("nodes") or [] if isinstance(node, dict)
+    ]
+    outline["too_large"] = True
+    outline["note"] = (
+        f"Workflow is too large to show in full ({size} bytes); nodes are listed without their parameters. "
+        "Call get_workflow(workflow_id, node_name) to fetch a node in full and edit with patch_workflow. "
+        "Do not send this outline back through update_workflow."
+    )
+    return outline
+
+
+def project_tool_output(tool_name: str, value: Any) -> Any:
+    """Project a tool result with the tool's budget and record its size before and after."""
+    budget = get_budget(tool_name)
+    if budget is None or value is None:
+        return value
+
+    original_size = _json_size(value)
+    projected = summarize_workflow(value, budget.max_bytes) if budget.lossless else project(value, budget)
+    projected_size = _json_size(projected)
+
+    stats = _stats.setdefault(tool_name, ProjectionStats())
+    stats.calls += 1
+    stats.original_bytes += original_size
+    stats.projected_bytes += projected_size
+    if projected_size < original_size:
+        stats.trimmed_calls += 1
+        logger.info(f"Projected {tool_name} output from {original_size} to {projected_size} bytes")
+    return projected
+
+
+def projection_stats() -> Dict[str, Dict[str, Any]]:
+    """Original vs projected sizes per tool."""
+    return {name: stats.as_dict() for name, stats in _stats.items()}
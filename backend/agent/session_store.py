@@ -0,0 +1,401 @@
+"""SQLite-backed ADK session service.
+
+Sessions and their events live in one SQLite file (WAL mode), so chat history
+survives restarts and can be shared by several workers. Recently used sessions
+are kept decoded in a bounded LRU; each read still checks the session's
+`last_update_time` in the database, so another worker's writes are picked up.
+
+Idle sessions expire after `idle_ttl` seconds and each session keeps at most
+`max_events` events (older turns are dropped from the start of a user turn so
+function calls and responses stay paired).
+
+Database work runs in a worker thread (asyncio.to_thread) so reads, writes
+and commits never block the event loop.
+"""
+import os
+import json
+import asyncio
+import time
+import sqlite3
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.errors.session_not_found_error import SessionNotFoundError
+from google.adk.events.event import Event
+from google.adk.sessions import BaseSessionService, Session, State
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+
+from n8n_mcp.env import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+SessionKey = Tuple[str, str, str]
+
+# Expired sessions are purged at most this often
+PURGE_INTERVAL = 300.0
+
+
+def _split_state(state: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """Split a state delta into (app, user, session) parts; temp: keys are dropped."""
+    app, user, session = {}, {}, {}
+    for key, value in (state or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            app[key[len(State.APP_PREFIX):]] = value
+        elif key.startswith(State.USER_PREFIX):
+            user[key[len(State.USER_PREFIX):]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session[key] = value
+    return app, user, session
+
+
+def _light_copy(session: Session) -> Session:
+    """Copy with its own events list and state dict; events themselves are shared."""
+    copied = session.model_copy(deep=False)
+    copied.events = list(session.events)
+    copied.state = dict(session.state)
+    return copied
+
+
+def _history_cut(events: List[Event], max_events: int) -> int:
+    """Index of the first event to keep so at most `max_events` remain, starting at a user turn."""
+    if len(events) <= max_events:
+        return 0
+    cut = len(events) - max_events
+    while cut < len(events) - 1 and events[cut].author != "user":
+        cut += 1
+    return cut
+
+
+class SqliteSessionService(BaseSessionService):
+    """Persistent, bounded session service."""
+
+    def __init__(
+        self,
+        db_path: str,
+        max_cached: int = 256,
+        idle_ttl: float = 7 * 24 * 3600,
+        max_events: int = 200
+    ):
+        self.db_path = db_path
+        self.max_cached = max_cached
+        self.idle_ttl = idle_ttl
+        self.max_events = max_events
+        self._hot: "OrderedDict[SessionKey, Session]" = OrderedDict()
+        self._last_purge = 0.0
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " app_name TEXT NOT NULL, user_id TEXT NOT NULL, id TEXT NOT NULL,"
+            " state TEXT NOT NULL, last_update_time REAL NOT NULL,"
+            " PRIMARY KEY (app_name, user_id, id));"
+            "CREATE INDEX IF NOT EXISTS sessions_by_update ON sessions (last_update_time);"
+            "CREATE TABLE IF NOT EXISTS events ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " app_name TEXT NOT NULL, user_id TEXT NOT NULL, session_id TEXT NOT NULL,"
+            " event_id TEXT NOT NULL, data TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS events_by_session ON events (app_name, user_id, session_id, seq);"
+            "CREATE TABLE IF NOT EXISTS app_state (app_name TEXT PRIMARY KEY, state TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS user_state ("
+            " app_name TEXT NOT NULL, user_id TEXT NOT NULL, state TEXT NOT NULL,"
+            " PRIMARY KEY (app_name, user_id));"
+        )
+        self._conn.commit()
+
+    # ---------- storage helpers (callers hold self._lock) ----------
+
+    def _load_scoped_state(self, app_name: str, user_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        row = self._conn.execute("SELECT state FROM app_state WHERE app_name = ?", (app_name,)).fetchone()
+        app_state = json.loads(row[0]) if row else {}
+        row = self._conn.execute(
+            "SELECT state FROM user_state WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+        ).fetchone()
+        user_state = json.loads(row[0]) if row else {}
+        return app_state, user_state
+
+    def _merge_scoped_state(self, table_key: str, where: Tuple, delta: Dict[str, Any]) -> None:
+        if not delta:
+            return
+        if table_key == "app":
+            row = self._conn.execute("SELECT state FROM app_state WHERE app_name = ?", where).fetchone()
+            state = {**(json.loads(row[0]) if row else {}), **delta}
+            self._conn.execute(
+                "INSERT OR REPLACE INTO app_state (app_name, state) VALUES (?, ?)", (*where, json.dumps(state, default=str))
+            )
+        else:
+            row = self._conn.execute(
+                "SELECT state FROM user_state WHERE app_name = ? AND user_id = ?", where
+            ).fetchone()
+            state = {**(json.loads(row[0]) if row else {}), **delta}
+            self._conn.execute(
+                "INSERT OR REPLACE INTO user_state (app_name, user_id, state) VALUES (?, ?, ?)",
+                (*where, json.dumps(state, default=str))
+            )
+
+    def _with_scoped_state(self, session: Session) -> Session:
+        app_state, user_state = self._load_scoped_state(session.app_name, session.user_id)
+        for key, value in app_state.items():
+            session.state[State.APP_PREFIX + key] = value
+        for key, value in user_state.items():
+            session.state[State.USER_PREFIX + key] = value
+        return session
+
+    def _load_session(self, key: SessionKey) -> Optional[Session]:
+        """The canonical session, from the hot cache if it is current, else from the database."""
+        row = self._conn.execute(
+            "SELECT state, last_update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?", key
+        ).fetchone()
+        if row is None:
+            self._hot.pop(key, None)
+            return None
+        state, last_update_time = row
+        if time.time() - last_update_time > self.idle_ttl:
+            self._delete(key)
+            return None
+
+        cached = self._hot.get(key)
+        if cached is not None and cached.last_update_time == last_update_time:
+            self._hot.move_to_end(key)
+            return cached
+
+        events = [
+            Event.model_validate_json(data)
+            for (data,) in self._conn.execute(
+                "SELECT data FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? ORDER BY seq", key
+            )
+        ]
+        session = Session(
+            app_name=key[0], user_id=key[1], id=key[2],
+            state=json.loads(state), events=events, last_update_time=last_update_time
+        )
+        self._remember(key, session)
+        return session
+
+    def _remember(self, key: SessionKey, session: Session) -> None:
+        self._hot[key] = session
+        self._hot.move_to_end(key)
+        while len(self._hot) > self.max_cached:
+            self._hot.popitem(last=False)
+
+    def _delete(self, key: SessionKey) -> None:
+        self._conn.execute("DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?", key)
+        self._conn.execute("DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?", key)
+        self._conn.commit()
+        self._hot.pop(key, None)
+
+    def _purge_expired_locked(self) -> int:
+        cutoff = time.time() - self.idle_ttl
+        expired = self._conn.execute(
+            "SELECT app_name, user_id, id FROM sessions WHERE last_update_time < ?", (cutoff,)
+        ).fetchall()
+        for key in expired:
+            self._conn.execute("DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?", key)
+            self._hot.pop(tuple(key), None)
+        self._conn.execute("DELETE FROM sessions WHERE last_update_time < ?", (cutoff,))
+        self._conn.commit()
+        self._last_purge = time.monotonic()
+        if expired:
+            logger.info(f"Expired {len(expired)} idle sessions")
+        return len(expired)
+
+    def _maybe_purge(self) -> None:
+        if time.monotonic() - self._last_purge >= PURGE_INTERVAL:
+            self._purge_expired_locked()
+
+    # ---------- BaseSessionService ----------
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = session_id.strip() if session_id else str(uuid.uuid4())
+        return await asyncio.to_thread(self._create_session, (app_name, user_id, session_id), state or {})
+
+    def _create_session(self, key: SessionKey, state: Dict[str, Any]) -> Session:
+        app_name, user_id, session_id = key
+        app_delta, user_delta, session_state = _split_state(state)
+        with self._lock:
+            self._maybe_purge()
+            if self._load_session(key) is not None:
+                raise AlreadyExistsError(f"Session with id {session_id} already exists.")
+            session = Session(
+                app_name=app_name, user_id=user_id, id=session_id,
+                state=session_state, last_update_time=time.time()
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (app_name, user_id, id, state, last_update_time) VALUES (?, ?, ?, ?, ?)",
+                (*key, json.dumps(session_state, default=str), session.last_update_time)
+            )
+            self._merge_scoped_state("app", (app_name,), app_delta)
+            self._merge_scoped_state("user", (app_name, user_id), user_delta)
+            self._conn.commit()
+            self._remember(key, session)
+            return self._with_scoped_state(_light_copy(session))
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        key = (app_name, user_id, session_id.strip() if session_id else session_id)
+        return await asyncio.to_thread(self._get_session, key, config)
+
+    def _get_session(self, key: SessionKey, config: Optional[GetSessionConfig]) -> Optional[Session]:
+        with self._lock:
+            session = self._load_session(key)
+            if session is None:
+                return None
+            copied = _light_copy(session)
+            if config:
+                if config.num_recent_events is not None:
+                    copied.events = copied.events[-config.num_recent_events:] if config.num_recent_events else []
+                if config.after_timestamp:
+                    copied.events = [e for e in copied.events if e.timestamp >= config.after_timestamp]
+            return self._with_scoped_state(copied)
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        query = "SELECT user_id, id, state, last_update_time FROM sessions WHERE app_name = ?"
+        params: Tuple = (app_name,)
+        if user_id is not None:
+            query += " AND user_id = ?"
+            params += (user_id,)
+        query += " ORDER BY last_update_time, user_id, id"
+        return await asyncio.to_thread(self._list_sessions, app_name, query, params)
+
+    def _list_sessions(self, app_name: str, query: str, params: Tuple) -> ListSessionsResponse:
+        with self._lock:
+            self._maybe_purge()
+            sessions = [
+                self._with_scoped_state(Session(
+                    app_name=app_name, user_id=uid, id=sid,
+                    state=json.loads(state), last_update_time=updated
+                ))
+                for uid, sid, state, updated in self._conn.execute(query, params).fetchall()
+            ]
+        return ListSessionsResponse(sessions=sessions)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await asyncio.to_thread(self._delete_locked, (app_name, user_id, session_id.strip() if session_id else session_id))
+
+    def _delete_locked(self, key: SessionKey) -> None:
+        with self._lock:
+            self._delete(key)
+
+    async def get_user_state(self, *, app_name: str, user_id: str) -> Dict[str, Any]:
+        return await asyncio.to_thread(self._get_user_state, app_name, user_id)
+
+    def _get_user_state(self, app_name: str, user_id: str) -> Dict[str, Any]:
+        with self._lock:
+            return self._load_scoped_state(app_name, user_id)[1]
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        key = (session.app_name, session.user_id, session.id)
+        canonical = await asyncio.to_thread(self._canonical_session, key, event)
+        if canonical is None:
+            return event  # already stored
+
+        await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+        await asyncio.to_thread(self._store_event, key, session, canonical, event)
+        return event
+
+    def _canonical_session(self, key: SessionKey, event: Event) -> Optional[Session]:
+        """The cached session `event` is appended to, or None if it already holds the event."""
+        with self._lock:
+            canonical = self._load_session(key)
+            if canonical is None:
+                raise SessionNotFoundError(f"Session {key[2]} not found.")
+            # The same event can be delivered to several session references
+            if any(e == event for e in canonical.events if e.id == event.id):
+                return None
+            return canonical
+
+    def _store_event(self, key: SessionKey, session: Session, canonical: Session, event: Event) -> None:
+        app_delta, user_delta, session_delta = _split_state(
+            event.actions.state_delta if event.actions else {}
+        )
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO events (app_name, user_id, session_id, event_id, data) VALUES (?, ?, ?, ?, ?)",
+                (*key, event.id, event.model_dump_json(exclude_none=True))
+            )
+            if canonical is not session:
+                canonical.events.append(event)
+            canonical.state.update(session_delta)
+            canonical.last_update_time = event.timestamp
+
+            cut = _history_cut(canonical.events, self.max_events)
+            if cut:
+                first_kept = canonical.events[cut].id
+                row = self._conn.execute(
+                    "SELECT MIN(seq) FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? AND event_id = ?",
+                    (*key, first_kept)
+                ).fetchone()
+                if row and row[0] is not None:
+                    self._conn.execute(
+                        "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? AND seq < ?",
+                        (*key, row[0])
+                    )
+                del canonical.events[:cut]
+
+            self._conn.execute(
+                "UPDATE sessions SET state = ?, last_update_time = ? WHERE app_name = ? AND user_id = ? AND id = ?",
+                (json.dumps(canonical.state, default=str), canonical.last_update_time, *key)
+            )
+            self._merge_scoped_state("app", (session.app_name,), app_delta)
+            self._merge_scoped_state("user", (session.app_name, session.user_id), user_delta)
+            self._conn.commit()
+            self._remember(key, canonical)
+
+    def purge_expired(self) -> int:
+        """Delete sessions idle for longer than `idle_ttl`. Returns how many."""
+        with self._lock:
+            return self._purge_expired_locked()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stored = self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        return {"stored_sessions": stored, "cached_sessions": len(self._hot)}
+
+    def close(self) -> None:
+        with self._lock:
+            self._hot.clear()
+            self._conn.close()
+
+
+def create_session_service_from_env() -> BaseSessionService:
+    """Session service from environment settings.
+
+    SESSION_STORE=memory keeps ADK's InMemorySessionService. Otherwise sessions
+    are stored in SESSION_DB_PATH; SESSION_CACHE_SIZE bounds the decoded
+    sessions kept in memory, SESSION_IDLE_TTL_SECONDS expires idle sessions and
+    SESSION_MAX_EVENTS caps history per session.
+    """
+    if os.getenv("SESSION_STORE", "sqlite").lower() == "memory":
+        from google.adk.sessions import InMemorySessionService
+        return InMemorySessionService()
+    return SqliteSessionService(
+        db_path=os.getenv("SESSION_DB_PATH", os.path.join(".cache", "sessions.sqlite3")),
+        max_cached=env_int("SESSION_CACHE_SIZE", 256),
+        idle_ttl=env_float("SESSION_IDLE_TTL_SECONDS", 7 * 24 * 3600),
+        max_events=env_int("SESSION_MAX_EVENTS", 200),
+    )
@@ -1,39 +1,58 @@
-from fastapi import APIRouter, HTTPException, Query, Header
-from typing import List, Optional, Dict
+from fastapi import APIRouter, HTTPException, Query, Header, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Optional, Dict, Any
+import os
+import json
+import asyncio
 import logging
 from models.schemas import (
     ChatMessage, ChatResponse, WorkflowListItem, Workflow,
     ExecutionRequest, ExecutionResponse, NodeInfo, CreateWorkflowRequest,
-    UpdateWorkflowRequest
+    UpdateWorkflowRequest, PatchWorkflowRequest
 )
-from agent.flowgent_agent import chat_with_agent
-from agent.context import set_n8n_credentials, clear_n8n_credentials
+from agent.flowgent_agent import chat_with_agent, stream_agent_events, agent_error_message
+from agent.context import request_context
+from observability.tracing import span, timing_breakdown
 from n8n_mcp.n8n_client import get_mcp_client, N8nMcpClient
-from n8n_mcp.direct_client import create_n8n_client
+from n8n_mcp.direct_client import create_n8n_client, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from n8n_mcp.cache import SingleFlightCache
+from n8n_mcp.env import env_float, env_int
+from n8n_mcp.workflow_patch import WorkflowPatchError, WorkflowConflictError
+from n8n_mcp.execution_watch import get_execution_watcher, is_finished
+from n8n_mcp.execution_store import get_execution_sync, parse_timestamp
+from n8n_mcp.execution_analytics import get_execution_analytics
+from n8n_mcp.idempotency import get_idempotency_store, request_fingerprint, IdempotencyConflict
 
 logger = logging.getLogger(__name__)
 
-# Cache for node info to improve performance and reduce API/LLM calls
-NODE_INFO_CACHE: Dict[str, NodeInfo] = {
-    "n8n-nodes-base.manualTrigger": NodeInfo(
+# Cache for node info to improve performance and reduce API/LLM calls.
+# Bounded, with a short TTL for fallback results and coalesced concurrent loads.
+NODE_INFO_CACHE = SingleFlightCache(
+    max_entries=env_int("NODE_INFO_CACHE_SIZE", 1024),
+    ttl=env_float("NODE_INFO_CACHE_TTL", 24 * 3600.0),
+    negative_ttl=env_float("NODE_INFO_CACHE_NEGATIVE_TTL", 30.0)
+)
+for _seed in [
+    NodeInfo(
         node_type="n8n-nodes-base.manualTrigger",
         display_name="Manual Trigger",
         description="Starts a workflow manually from the n8n interface.",
         parameters=[], use_cases=["Testing workflows", "On-demand execution"], best_practices=[], example_config=None
     ),
-    "n8n-nodes-base.httpRequest": NodeInfo(
+    NodeInfo(
         node_type="n8n-nodes-base.httpRequest",
         display_name="HTTP Request",
         description="Makes an HTTP request to an API or website.",
         parameters=[], use_cases=["Fetching data from APIs", "Sending webhooks"], best_practices=["Use authentication"], example_config=None
     ),
-    "n8n-nodes-base.set": NodeInfo(
+    NodeInfo(
         node_type="n8n-nodes-base.set",
         display_name="Set",
         description="Sets values on items and removes other values.",
         parameters=[], use_cases=["Creating variables", "Mocking data"], best_practices=[], example_config=None
     )
-}
+]:
+    NODE_INFO_CACHE.pin(_seed.node_type, _seed)
 router = APIRouter(prefix="/api", tags=["api"])
 
 
@@ -44,72 +63,183 @@ def get_n8n_client_from_headers(instance_url: str = None, api_key: str = None):
     return None
 
 
+def _chat_session_id(message: ChatMessage) -> str:
+    """Session ID sent by the extension, or the shared default."""
+    if message.context and "session_id" in message.context:
+        return message.context["session_id"]
+    return "default_session"
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat(message: ChatMessage):
     """Chat with the Flowgent AI assistant."""
     try:
         logger.info(f"Chat message received: {message.message[:50]}...")
-        session_id = "default_session"
-        if message.context and "session_id" in message.context:
-            session_id = message.context["session_id"]
-        
-        # Set n8n credentials in agent context for this request
-        if message.n8n_config and message.n8n_config.instance_url and message.n8n_config.api_key:
-            set_n8n_credentials(
-                instance_url=message.n8n_config.instance_url,
-                api_key=message.n8n_config.api_key
-            )
-            logger.info(f"n8n credentials set for agent: {message.n8n_config.instance_url}")
+        session_id = _chat_session_id(message)
         
-        try:
-            response_text = await chat_with_agent(message.message, session_id)
+        # Credentials live in a request-scoped context so concurrent chats stay isolated
+        n8n_config = message.n8n_config
+        with request_context(
+            instance_url=n8n_config.instance_url if n8n_config else None,
+            api_key=n8n_config.api_key if n8n_config else None,
+            session_id=session_id
+        ) as ctx:
+            if ctx.n8n_credentials:
+                logger.info(f"n8n credentials set for agent: {n8n_config.instance_url}")
+            with span("chat.turn", category="chat", session_id=session_id) as turn:
+                response_text = await chat_with_agent(message.message, session_id)
             logger.info(f"Chat response generated: {len(response_text)} chars")
-            return ChatResponse(response=response_text, workflow_data=None, action=None)
-        finally:
-            # Clear credentials after request
-            clear_n8n_credentials()
+            return ChatResponse(
+                response=response_text,
+                workflow_data=None,
+                action=None,
+                timings=timing_breakdown(turn) if message.debug else None
+            )
     except Exception as e:
         logger.error(f"Chat error: {e}", exc_info=True)
         return ChatResponse(response=f"I apologize, but I encountered an error: {str(e)}. Please try again or rephrase your question.")
 
 
+@router.post("/chat/stream")
+async def chat_stream(message: ChatMessage):
+    """Chat with the Flowgent AI assistant, streaming agent events as SSE.
+
+    Emits `text` (partial model output), `tool_start`, `tool_end`, and a
+    closing `final` event, or an `error` event if the turn fails. With
+    `debug`, the `final` event carries a timing breakdown.
+    """
+    logger.info(f"Streaming chat message received: {message.message[:50]}...")
+    session_id = _chat_session_id(message)
+    
+    async def event_source():
+        # The context must be entered where the agent actually runs, i.e. inside the stream
+        n8n_config = message.n8n_config
+        with request_context(
+            instance_url=n8n_config.instance_url if n8n_config else None,
+            api_key=n8n_config.api_key if n8n_config else None,
+            session_id=session_id
+        ) as ctx:
+            if ctx.n8n_credentials:
+                logger.info(f"n8n credentials set for agent: {n8n_config.instance_url}")
+            try:
+                with span("chat.turn", category="chat", session_id=session_id, streaming=True) as turn:
+                    async for event in stream_agent_events(message.message, session_id):
+                        if event["type"] == "final" and message.debug:
+                            event = {**event, "timings": timing_breakdown(turn)}
+                        yield _sse_event(event["type"], event)
+            except Exception as e:
+                logger.error(f"Streaming chat error: {e}", exc_info=True)
+                yield _sse_event("error", {"type": "error", "message": agent_error_message(e)})
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _to_list_item(w: Dict[str, Any]) -> WorkflowListItem:
+    return WorkflowListItem(
+        id=str(w.get("id", "")),
+        name=w.get("name", "Untitled"),
+        active=w.get("active", False),
+        createdAt=w.get("createdAt"),
+        updatedAt=w.get("updatedAt")
+    )
+
+
+async def _iter_workflow_pages(direct_client, page_size: int, cursor: Optional[str], limit: Optional[int]):
+    """Yield (workflows, next_cursor) from the direct client, or one page from MCP."""
+    if direct_client:
+        logger.info("Using direct n8n client for list_workflows")
+        async for page, next_cursor in direct_client.iter_workflow_pages(page_size, cursor, limit):
+            yield page, next_cursor
+    else:
+        # Fall back to MCP
+        logger.info("Using MCP client for list_workflows")
+        client = get_mcp_client()
+        workflows = await client.list_workflows()
+        yield (workflows[:limit] if limit is not None else workflows), None
+
+
+def _workflows_error(e: Exception) -> HTTPException:
+    if "401" in str(e) or "403" in str(e):
+        return HTTPException(status_code=401, detail="Authentication failed with n8n. Check your API key.")
+    return HTTPException(status_code=500, detail=f"Failed to retrieve workflows: {str(e)}")
+
+
 @router.get("/workflows", response_model=List[WorkflowListItem])
 async def list_workflows(
+    response: Response,
+    stream: bool = Query(False, description="Stream NDJSON rows as pages arrive"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of workflows"),
+    cursor: Optional[str] = Query(None, description="n8n pagination cursor to resume from"),
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     x_n8n_instance_url: Optional[str] = Header(None, alias="X-N8N-Instance-URL"),
     x_n8n_api_key: Optional[str] = Header(None, alias="X-N8N-API-Key")
 ):
-    """Get all workflows from n8n."""
+    """Get workflows from n8n, following pagination.
+    
+    With `stream=1` the response is NDJSON: one workflow per line as each page
+    arrives, then a final `{"nextCursor": ...}` line (null when there are no
+    more workflows). Otherwise, when `limit` stops the list early, the cursor
+    to resume from is in the `X-Next-Cursor` header.
+    """
+    direct_client = get_n8n_client_from_headers(x_n8n_instance_url, x_n8n_api_key)
+    pages = _iter_workflow_pages(direct_client, page_size, cursor, limit)
+    
     try:
-        # Try direct n8n client first
-        direct_client = get_n8n_client_from_headers(x_n8n_instance_url, x_n8n_api_key)
-        if direct_client:
-            logger.info("Using direct n8n client for list_workflows")
-            workflows = await direct_client.list_workflows()
-        else:
-            # Fall back to MCP
-            logger.info("Using MCP client for list_workflows")
-            client = get_mcp_client()
-            workflows = await client.list_workflows()
+        # Fetch the first page up front so auth/upstream errors still map to a status code
+        first_page = await pages.__anext__()
+    except StopAsyncIteration:
+        first_page = ([], None)
+    except Exception as e:
+        logger.error(f"Failed to list workflows: {e}", exc_info=True)
+        raise _workflows_error(e)
+    
+    if stream:
+        async def ndjson():
+            count = 0
+            page, next_cursor = first_page
+            try:
+                while True:
+                    for w in page:
+                        yield json.dumps(_to_list_item(w).model_dump(by_alias=True)) + "\n"
+                    count += len(page)
+                    try:
+                        page, next_cursor = await pages.__anext__()
+                    except StopAsyncIteration:
+                        break
+            except Exception as e:
+                logger.error(f"Workflow stream failed after {count} rows: {e}", exc_info=True)
+                yield json.dumps({"error": str(e), "nextCursor": next_cursor}) + "\n"
+                return
+            logger.info(f"Streamed {count} workflows")
+            yield json.dumps({"nextCursor": next_cursor}) + "\n"
+        
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+    
+    try:
+        workflows, next_cursor = list(first_page[0]), first_page[1]
+        async for page, next_cursor in pages:
+            workflows.extend(page)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         
         if not workflows:
             logger.warning("No workflows returned from n8n")
             return []
         
         logger.info(f"Retrieved {len(workflows)} workflows")
-        return [
-            WorkflowListItem(
-                id=str(w.get("id", "")),
-                name=w.get("name", "Untitled"),
-                active=w.get("active", False),
-                createdAt=w.get("createdAt"),
-                updatedAt=w.get("updatedAt")
-            ) for w in workflows
-        ]
+        return [_to_list_item(w) for w in workflows]
     except Exception as e:
         logger.error(f"Failed to list workflows: {e}", exc_info=True)
-        if "401" in str(e) or "403" in str(e):
-            raise HTTPException(status_code=401, detail="Authentication failed with n8n. Check your API key.")
-        raise HTTPException(status_code=500, detail=f"Failed to retrieve workflows: {str(e)}")
+        raise _workflows_error(e)
 
 
 @router.get("/workflows/{workflow_id}", response_model=Workflow)
@@ -151,22 +281,39 @@ async def get_workflow(
 
 
 @router.post("/workflows", response_model=Workflow)
-async def create_workflow(req: CreateWorkflowRequest):
-    """Create a new workflow in n8n."""
+async def create_workflow(
+    req: CreateWorkflowRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """Create a new workflow in n8n.
+
+    Retries with the same Idempotency-Key (or, without one, identical requests
+    within a short window) return the first result instead of creating a
+    duplicate; they are marked with an Idempotent-Replayed header.
+    """
     try:
         logger.info(f"Creating workflow: {req.name}")
         # Use direct client if n8n config provided
         if req.n8n_config and req.n8n_config.instance_url and req.n8n_config.api_key:
             logger.info("Using direct n8n client for create_workflow")
             direct_client = create_n8n_client(req.n8n_config.instance_url, req.n8n_config.api_key)
-            result = await direct_client.create_workflow(req.name, req.nodes, req.connections)
+            scope = "#".join(direct_client.cache_key)
+            create = lambda: direct_client.create_workflow(req.name, req.nodes, req.connections)
         else:
             # Fall back to MCP
             logger.info("Using MCP client for create_workflow")
             client = get_mcp_client()
-            result = await client.create_workflow(req.name, req.nodes, req.connections)
+            scope = "mcp"
+            create = lambda: client.create_workflow(req.name, req.nodes, req.connections)
         
-        logger.info(f"Workflow created successfully: {result.get('id')}")
+        fingerprint = request_fingerprint(req.name, req.nodes, req.connections)
+        result, replayed = await get_idempotency_store().run(scope, idempotency_key, fingerprint, create)
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+            logger.info(f"Returning existing workflow {result.get('id')} for a repeated create")
+        else:
+            logger.info(f"Workflow created successfully: {result.get('id')}")
         return Workflow(
             id=str(result.get("id", "")),
             name=result.get("name", req.name),
@@ -176,6 +323,8 @@ async def create_workflow(req: CreateWorkflowRequest):
             createdAt=result.get("createdAt"),
             updatedAt=result.get("updatedAt")
         )
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to create workflow: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to create workflow: {str(e)}")
@@ -224,9 +373,49 @@ async def update_workflow(workflow_id: str, req: UpdateWorkflowRequest):
         raise HTTPException(status_code=500, detail=f"Failed to update workflow: {str(e)}")
 
 
+@router.patch("/workflows/{workflow_id}", response_model=Workflow)
+async def patch_workflow(workflow_id: str, req: PatchWorkflowRequest):
+    """Apply node-level patch operations to a workflow.
+    
+    With `expected_updated_at`, responds 409 if the workflow changed since that version.
+    """
+    try:
+        logger.info(f"Patching workflow {workflow_id} with {len(req.operations)} operations")
+        if req.n8n_config and req.n8n_config.instance_url and req.n8n_config.api_key:
+            logger.info("Using direct n8n client for patch_workflow")
+            direct_client = create_n8n_client(req.n8n_config.instance_url, req.n8n_config.api_key)
+            result = await direct_client.patch_workflow(workflow_id, req.operations, req.expected_updated_at)
+        else:
+            logger.info("Using MCP client for patch_workflow")
+            client = get_mcp_client()
+            result = await client.patch_workflow(workflow_id, req.operations, req.expected_updated_at)
+        
+        logger.info(f"Workflow patched successfully: {workflow_id}")
+        return Workflow(
+            id=str(result.get("id", workflow_id)),
+            name=result.get("name", "Untitled"),
+            active=result.get("active", False),
+            nodes=result.get("nodes", []),
+            connections=result.get("connections", {}),
+            createdAt=result.get("createdAt"),
+            updatedAt=result.get("updatedAt")
+        )
+    except WorkflowConflictError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=409, detail=str(e))
+    except WorkflowPatchError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid patch: {str(e)}")
+    except Exception as e:
+        logger.error(f"Failed to patch workflow {workflow_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to patch workflow: {str(e)}")
+
+
 @router.post("/execute", response_model=ExecutionResponse)
 async def execute_workflow(req: ExecutionRequest):
-    """Execute a workflow with optional input data."""
+    """Execute a workflow with optional input data.
+    
+    Follow a running execution with `/executions/{execution_id}/wait` or `/stream`.
+    """
     try:
         logger.info(f"Executing workflow: {req.workflow_id}")
         if req.n8n_config and req.n8n_config.instance_url and req.n8n_config.api_key:
@@ -245,135 +434,285 @@ async def execute_workflow(req: ExecutionRequest):
             data=result.get("data"),
             error=result.get("error"),
             started_at=result.get("startedAt"),
-            finished_at=result.get("finishedAt")
+            finished_at=result.get("finishedAt"),
+            status=result.get("status")
         )
     except Exception as e:
         logger.error(f"Failed to execute workflow: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to execute workflow: {str(e)}")
 
 
-@router.get("/node-info/{node_type:path}")
-async def get_node_info(node_type: str):
-    """Get fast node information for Information Hand tooltip using MCP."""
+@router.get("/nodes/search")
+async def search_nodes(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Search n8n nodes - served from the local catalog, falling back to MCP."""
     try:
-        # Check cache first for speed
-        if node_type in NODE_INFO_CACHE:
-            logger.info(f"Using cached info for: {node_type}")
-            return NODE_INFO_CACHE[node_type]
+        client = get_mcp_client()
+        return await client.search_nodes(q, limit=limit)
+    except Exception as e:
+        logger.error(f"Node search failed for '{q}': {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to search nodes: {str(e)}")
 
-        logger.info(f"Getting fast node info for: {node_type}")
-        
+
+def _fallback_node_info(node_type: str) -> Dict[str, Any]:
+    """Fast fallback tooltip info derived from the node type alone."""
+    short_name = node_type.split(".")[-1].replace("-", " ")
+    return {
+        "name": short_name.title(),
+        "description": f"Node for {short_name.lower()} operations",
+        "howItWorks": f"Configurable {short_name.lower()} node for workflow automation",
+        "whatItDoes": f"Executes {short_name.lower()} tasks within automation workflows",
+        "nodeType": node_type,
+        "icon": ""
+    }
+
+
+async def _load_node_info(node_type: str):
+    """Fetch and format tooltip info from MCP. Returns (result, is_fallback)."""
+    logger.info(f"Getting fast node info for: {node_type}")
+    
+    try:
         # Use MCP client directly for speed (not slow chat)
         client = get_mcp_client()
         info = await client.get_node_info(node_type)
+    except Exception as e:
+        logger.error(f"Failed to get node info for {node_type}: {e}", exc_info=True)
+        info = None
+    
+    if not info:
+        logger.warning(f"No MCP info for {node_type}, using fallback")
+        # Fast fallback without slow AI call - cached only briefly
+        return _fallback_node_info(node_type), True
+    
+    logger.info(f"Successfully retrieved MCP node info for {node_type}")
+    
+    # Parse and format the response for tooltip
+    if isinstance(info, dict):
+        # Extract basic info
+        display_name = info.get("displayName", info.get("name", node_type.split(".")[-1]))
+        description = info.get("description", info.get("text", info.get("summary", "")))
         
-        if info:
-            logger.info(f"Successfully retrieved MCP node info for {node_type}")
-            
-            # Parse and format the response for tooltip
-            if isinstance(info, dict):
-                # Extract basic info
-                display_name = info.get("displayName", info.get("name", node_type.split(".")[-1]))
-                description = info.get("description", info.get("text", info.get("summary", "")))
-                
-                # Generate "how it works" and "what it does" from available data
-                how_it_works = ""
-                what_it_does = ""
-                
-                # Try to extract meaningful content from various fields
-                if "properties" in info:
-                    # Use parameter descriptions to understand functionality
-                    params = info["properties"]
-                    if params:
-                        how_it_works = f"Operates with {len(params)} parameters including {', '.join(list(params.keys())[:3])}"
-                
-                if "inputs" in info:
-                    inputs = info["inputs"]
-                    if isinstance(inputs, list) and inputs:
-                        how_it_works += f", processes {len(inputs)} input types"
-                
-                # Default descriptions if we can't extract meaningful content
-                if not how_it_works:
-                    how_it_works = f"Processes data according to its configuration and parameters"
-                
-                if not what_it_does:
-                    what_it_does = f"Performs {display_name.lower()} operations within automation workflows"
-                
-                # Format response for tooltip
-                result = {
-                    "name": display_name,
-                    "description": description[:100] if description else f"Node for {display_name.lower()} operations",
-                    "howItWorks": how_it_works[:200] if how_it_works else f"Configurable {display_name.lower()} node",
-                    "whatItDoes": what_it_does[:200] if what_it_does else f"Executes {display_name.lower()} tasks in workflows",
-                    "nodeType": node_type,
-                    "icon": info.get("icon", "")
-                }
-            else:
-                # Fallback for non-dict responses
-                result = {
-                    "name": node_type.split(".")[-1].replace("-", " ").title(),
-                    "description": str(info)[:100],
-                    "howItWorks": f"Performs {node_type.split('.')[-1].replace('-', ' ')} operations",
-                    "whatItDoes": f"Executes {node_type.split('.')[-1].replace('-', ' ')} tasks in workflows",
-                    "nodeType": node_type,
-                    "icon": ""
-                }
-        else:
-            logger.warning(f"No MCP info for {node_type}, using fallback")
-            # Fast fallback without slow AI call
-            result = {
-                "name": node_type.split(".")[-1].replace("-", " ").title(),
-                "description": f"Node for {node_type.split('.')[-1].replace('-', ' ').lower()} operations",
-                "howItWorks": f"Configurable {node_type.split('.')[-1].replace('-', ' ').lower()} node for workflow automation",
-                "whatItDoes": f"Executes {node_type.split('.')[-1].replace('-', ' ').lower()} tasks within automation workflows",
-                "nodeType": node_type,
-                "icon": ""
-            }
+        # Generate "how it works" and "what it does" from available data
+        how_it_works = ""
+        what_it_does = ""
+        
+        # Try to extract meaningful content from various fields
+        if "properties" in info:
+            # Use parameter descriptions to understand functionality
+            params = info["properties"]
+            if params:
+                how_it_works = f"Operates with {len(params)} parameters including {', '.join(list(params.keys())[:3])}"
         
-        # Cache the result for future fast access
-        NODE_INFO_CACHE[node_type] = result
-        logger.info(f"Cached node info for: {node_type}")
-        return result
-            
+        if "inputs" in info:
+            inputs = info["inputs"]
+            if isinstance(inputs, list) and inputs:
+                how_it_works += f", processes {len(inputs)} input types"
+        
+        # Default descriptions if we can't extract meaningful content
+        if not how_it_works:
+            how_it_works = f"Processes data according to its configuration and parameters"
+        
+        if not what_it_does:
+            what_it_does = f"Performs {display_name.lower()} operations within automation workflows"
+        
+        # Format response for tooltip
+        return {
+            "name": display_name,
+            "description": description[:100] if description else f"Node for {display_name.lower()} operations",
+            "howItWorks": how_it_works[:200] if how_it_works else f"Configurable {display_name.lower()} node",
+            "whatItDoes": what_it_does[:200] if what_it_does else f"Executes {display_name.lower()} tasks in workflows",
+            "nodeType": node_type,
+            "icon": info.get("icon", "")
+        }, False
+    
+    # Fallback for non-dict responses
+    return {
+        "name": node_type.split(".")[-1].replace("-", " ").title(),
+        "description": str(info)[:100],
+        "howItWorks": f"Performs {node_type.split('.')[-1].replace('-', ' ')} operations",
+        "whatItDoes": f"Executes {node_type.split('.')[-1].replace('-', ' ')} tasks in workflows",
+        "nodeType": node_type,
+        "icon": ""
+    }, False
+
+
+@router.get("/node-info/{node_type:path}")
+async def get_node_info(node_type: str):
+    """Get fast node information for Information Hand tooltip using MCP."""
+    try:
+        # Concurrent hovers over the same node type share a single MCP call
+        return await NODE_INFO_CACHE.get_or_load(node_type, lambda: _load_node_info(node_type))
     except Exception as e:
         logger.error(f"Failed to get node info for {node_type}: {e}", exc_info=True)
         # Return fast fallback instead of error
-        return {
-            "name": node_type.split(".")[-1].replace("-", " ").title(),
-            "description": f"Node for {node_type.split('.')[-1].replace('-', ' ').lower()} operations",
-            "howItWorks": f"Configurable {node_type.split('.')[-1].replace('-', ' ').lower()} node",
-            "whatItDoes": f"Executes {node_type.split('.')[-1].replace('-', ' ').lower()} tasks in workflows",
-            "nodeType": node_type,
-            "icon": ""
-        }
+        return _fallback_node_info(node_type)
+
+
+async def _synced_executions(instance_url: Optional[str], api_key: Optional[str], fresh: bool):
+    """The execution sync and store instance for the caller's n8n, synced if needed."""
+    direct_client = get_n8n_client_from_headers(instance_url, api_key)
+    if direct_client:
+        instance, client = "#".join(direct_client.cache_key), direct_client
+    else:
+        instance, client = "mcp", get_mcp_client()
+    sync = get_execution_sync()
+    try:
+        await sync.ensure(instance, client, fresh=fresh)
+    except Exception as e:
+        logger.error(f"Failed to sync executions: {e}", exc_info=True)
+        if "401" in str(e) or "403" in str(e):
+            raise HTTPException(status_code=401, detail="Authentication failed with n8n. Check your API key.")
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve executions: {str(e)}")
+    return sync, instance
+
+
+def _time_filter(name: str, value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    parsed = parse_timestamp(value)
+    if parsed is None:
+        raise HTTPException(status_code=400, detail=f"Invalid {name} timestamp: {value}")
+    return parsed
 
 
 @router.get("/executions")
 async def list_executions(
+    response: Response,
     workflow_id: Optional[str] = Query(None),
+    status: Optional[str] = Query(None, description="Comma-separated statuses, e.g. error,crashed"),
+    since: Optional[str] = Query(None, description="Started at or after (ISO 8601 or epoch seconds)"),
+    until: Optional[str] = Query(None, description="Started before (ISO 8601 or epoch seconds)"),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    fresh: bool = Query(False, description="Sync with n8n before answering"),
     x_n8n_instance_url: Optional[str] = Header(None, alias="X-N8N-Instance-URL"),
     x_n8n_api_key: Optional[str] = Header(None, alias="X-N8N-API-Key")
 ):
-    """Get execution history."""
+    """Get execution history, newest first, from the local execution store.
+    
+    The store is synced with n8n in the background; the first request for an
+    instance, or one with `fresh=1`, waits for a sync. When there are more
+    executions, the cursor for the next page is in the `X-Next-Cursor` header.
+    """
+    since_ts, until_ts = _time_filter("since", since), _time_filter("until", until)
+    statuses = [s.strip() for s in status.split(",") if s.strip()] if status else None
+    if cursor is not None and not cursor.isdigit():
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {cursor}")
+    
+    sync, instance = await _synced_executions(x_n8n_instance_url, x_n8n_api_key, fresh)
+    
+    # Up to `limit` JSON decodes; keep them off the event loop
+    executions, next_cursor = await asyncio.to_thread(
+        sync.store.query, instance, workflow_id=workflow_id, statuses=statuses,
+        since=since_ts, until=until_ts, limit=limit, cursor=cursor
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    logger.info(f"Served {len(executions)} executions from the store")
+    return executions
+
+
+@router.get("/analytics/executions")
+async def execution_analytics(
+    workflow_id: Optional[str] = Query(None),
+    since: Optional[str] = Query(None, description="Started at or after (ISO 8601 or epoch seconds)"),
+    until: Optional[str] = Query(None, description="Started before (ISO 8601 or epoch seconds)"),
+    bucket: Optional[float] = Query(None, ge=60, description="Histogram bucket width in seconds (default: hourly, widened to fit the window)"),
+    fresh: bool = Query(False, description="Sync with n8n before answering"),
+    x_n8n_instance_url: Optional[str] = Header(None, alias="X-N8N-Instance-URL"),
+    x_n8n_api_key: Optional[str] = Header(None, alias="X-N8N-API-Key")
+):
+    """Per-workflow execution counts, failure rate, p50/p95/p99 duration and time buckets.
+    
+    Computed over the local execution store (see `/executions`), busiest
+    workflows first.
+    """
+    since_ts, until_ts = _time_filter("since", since), _time_filter("until", until)
+    sync, instance = await _synced_executions(x_n8n_instance_url, x_n8n_api_key, fresh)
+    
     try:
-        logger.info(f"Listing executions{f' for workflow {workflow_id}' if workflow_id else ''}")
-        direct_client = get_n8n_client_from_headers(x_n8n_instance_url, x_n8n_api_key)
-        if direct_client:
-            logger.info("Using direct n8n client for list_executions")
-            executions = await direct_client.list_executions(workflow_id)
-        else:
-            logger.info("Using MCP client for list_executions")
-            client = get_mcp_client()
-            executions = await client.list_executions(workflow_id)
-        
-        if not executions:
-            logger.info("No executions found")
-            return []
-        
-        logger.info(f"Retrieved {len(executions)} executions")
-        return executions
+        # Loading and sorting hundreds of thousands of rows would stall the event loop
+        summary = await asyncio.to_thread(
+            get_execution_analytics().summary, sync.store, instance,
+            since=since_ts, until=until_ts, workflow_id=workflow_id, bucket_seconds=bucket
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Already plain JSON types; jsonable_encoder would re-walk every bucket
+    return JSONResponse(summary)
+
+
+def _execution_source(execution_id: str, direct_client):
+    """Watcher key and status fetcher for an execution, via the direct client or MCP."""
+    if direct_client:
+        return (direct_client.cache_key, execution_id), lambda: direct_client.get_execution(execution_id)
+    client = get_mcp_client()
+    return ("mcp", execution_id), lambda: client.get_execution(execution_id)
+
+
+def _execution_error(execution_id: str, e: Exception) -> HTTPException:
+    if "401" in str(e) or "403" in str(e):
+        return HTTPException(status_code=401, detail="Authentication failed with n8n. Check your API key.")
+    if "404" in str(e):
+        return HTTPException(status_code=404, detail=f"Execution {execution_id} not found")
+    return HTTPException(status_code=500, detail=f"Failed to get execution status: {str(e)}")
+
+
+@router.get("/executions/{execution_id}/wait")
+async def wait_for_execution(
+    execution_id: str,
+    timeout: float = Query(30.0, ge=0, le=300, description="Seconds to wait for the execution to finish"),
+    x_n8n_instance_url: Optional[str] = Header(None, alias="X-N8N-Instance-URL"),
+    x_n8n_api_key: Optional[str] = Header(None, alias="X-N8N-API-Key")
+):
+    """Long-poll an execution until it finishes or `timeout` passes.
+    
+    Returns `{"execution": ..., "done": bool}`; with `done` false, call again.
+    All waiters on the same execution share one upstream poller.
+    """
+    key, fetch = _execution_source(execution_id, get_n8n_client_from_headers(x_n8n_instance_url, x_n8n_api_key))
+    try:
+        execution, done = await get_execution_watcher().wait(key, fetch, timeout)
     except Exception as e:
-        logger.error(f"Failed to list executions: {e}", exc_info=True)
-        if "401" in str(e) or "403" in str(e):
-            raise HTTPException(status_code=401, detail="Authentication failed with n8n. Check your API key.")
-        raise HTTPException(status_code=500, detail=f"Failed to retrieve executions: {str(e)}")
+        logger.error(f"Failed to wait for execution {execution_id}: {e}", exc_info=True)
+        raise _execution_error(execution_id, e)
+    return {"execution": execution, "done": done}
+
+
+@router.get("/executions/{execution_id}/stream")
+async def stream_execution(
+    execution_id: str,
+    timeout: float = Query(600.0, ge=1, le=3600, description="Seconds before the stream is closed"),
+    x_n8n_instance_url: Optional[str] = Header(None, alias="X-N8N-Instance-URL"),
+    x_n8n_api_key: Optional[str] = Header(None, alias="X-N8N-API-Key")
+):
+    """Stream an execution's status as SSE.
+    
+    Emits a `status` event whenever the status changes, then `done` when the
+    execution finishes, `timeout` when the stream gives up first, or `error`.
+    """
+    key, fetch = _execution_source(execution_id, get_n8n_client_from_headers(x_n8n_instance_url, x_n8n_api_key))
+    
+    async def event_source():
+        execution = None
+        try:
+            async for execution in get_execution_watcher().watch(key, fetch, timeout):
+                if execution is None:
+                    yield ": keep-alive\n\n"
+                elif is_finished(execution):
+                    yield _sse_event("done", {"type": "done", "execution": execution})
+                    return
+                else:
+                    yield _sse_event("status", {"type": "status", "execution": execution})
+            yield _sse_event("timeout", {"type": "timeout", "execution": execution})
+        except Exception as e:
+            logger.error(f"Execution stream for {execution_id} failed: {e}", exc_info=True)
+            yield _sse_event("error", {"type": "error", "message": _execution_error(execution_id, e).detail})
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
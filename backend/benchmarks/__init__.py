@@ -0,0 +1 @@
+# Benchmarks for Flowgent: fake n8n / MCP upstreams and a latency runner
@@ -0,0 +1,228 @@
+"""Drive many concurrent chat sessions through the real agent stack with a scripted model.
+
+    python -m benchmarks.agent_load                          # 200 sessions x 2 turns, 50 in flight
+    python -m benchmarks.agent_load --script edit --sessions 500 --concurrency 100
+    python -m benchmarks.agent_load --session-store sqlite --tracemalloc --json load.json
+
+Gemini is replaced by ScriptedLlm, and the MCP and n8n upstreams by the fakes
+in servers.py (zero latency by default). Everything else is the production
+path: chat_with_agent, the ADK Runner, the session service, tool
+instrumentation and the clients. Per-turn latency is therefore our own
+orchestration overhead plus whatever --think-ms and upstream latency add. The
+report also covers tool calls per turn, event-loop lag and memory growth.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Sequence
+
+from benchmarks.fixtures import FakeSettings
+from benchmarks.run import API_KEY, configure_environment, percentile, summarize
+from benchmarks.scripted_llm import SCRIPTS, ScriptedLlm
+from benchmarks.servers import fake_upstreams
+
+
+class LoopLagMonitor:
+    """Measures how late a periodic timer fires, i.e. how long the loop was blocked."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lags: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(loop.time() - expected, 0.0))
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> Dict[str, float]:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        ordered = sorted(self.lags)
+        return {
+            "samples": len(ordered),
+            "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+            "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+            "max_ms": round((ordered[-1] if ordered else 0.0) * 1000, 2),
+        }
+
+
+def rss_mb() -> float:
+    """Current resident set size (Linux), else the peak."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def run_load(
+    urls: Dict[str, str],
+    llm: ScriptedLlm,
+    sessions: int = 200,
+    turns: int = 2,
+    concurrency: int = 50,
+    trace_memory: bool = False
+) -> Dict[str, Any]:
+    """Run `sessions` conversations of `turns` turns each, with at most `concurrency` turns in flight."""
+    from agent.context import request_context
+    from agent.flowgent_agent import chat_with_agent, close_session_service, reset_agent
+    from n8n_mcp.client_pool import close_client_pool
+    from n8n_mcp.n8n_client import get_mcp_client
+
+    reset_agent(model=llm)
+
+    async def turn(session_id: str, text: str) -> str:
+        with request_context(instance_url=urls["n8n"], api_key=API_KEY, session_id=session_id):
+            return await chat_with_agent(text, session_id)
+
+    # Warm up imports, clients and the tool declarations outside the measurement
+    await turn("warmup", "warm up")
+    gc.collect()
+    rss_before = rss_mb()
+    if trace_memory:
+        tracemalloc.start(10)
+    heap_before = tracemalloc.get_traced_memory()[0] if trace_memory else 0
+    stats_before = llm.stats
+
+    latencies: List[float] = []
+    failures: List[str] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def conversation(index: int) -> None:
+        session_id = f"load-{index}"
+        for number in range(turns):
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    reply = await turn(session_id, f"Build workflow {index}.{number}")
+                except Exception as e:
+                    reply = f"{type(e).__name__}: {e}"
+                latencies.append(time.perf_counter() - started)
+                if reply != llm.final_text:
+                    failures.append(reply[:200])
+
+    monitor = LoopLagMonitor()
+    monitor.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(conversation(index) for index in range(sessions)))
+    elapsed = time.perf_counter() - started
+    loop_lag = await monitor.stop()
+
+    gc.collect()
+    memory: Dict[str, Any] = {"rss_before_mb": round(rss_before, 1), "rss_after_mb": round(rss_mb(), 1)}
+    if trace_memory:
+        heap_after, heap_peak = tracemalloc.get_traced_memory()
+        top = tracemalloc.take_snapshot().statistics("lineno")[:5]
+        tracemalloc.stop()
+        memory.update({
+            "heap_growth_kb": round((heap_after - heap_before) / 1024, 1),
+            "heap_growth_per_session_kb": round((heap_after - heap_before) / 1024 / max(sessions, 1), 2),
+            "heap_peak_kb": round(heap_peak / 1024, 1),
+            "top_allocations": [f"{stat.traceback[0]}: {stat.size / 1024:.1f} KiB" for stat in top],
+        })
+
+    stats_after = llm.stats
+    count = len(latencies)
+    per_turn = lambda key: round((stats_after[key] - stats_before[key]) / max(count, 1), 2)
+    result = {
+        "turns": summarize(latencies, elapsed, len(failures)),
+        "llm_calls_per_turn": per_turn("llm_calls"),
+        "tool_calls_per_turn": per_turn("tool_calls"),
+        "tool_errors": stats_after["tool_errors"] - stats_before["tool_errors"],
+        "scripted_model_ms_per_turn": round(per_turn("llm_calls") * llm.think_ms, 2),
+        "event_loop_lag": loop_lag,
+        "memory": memory,
+    }
+    if failures:
+        result["first_failure"] = failures[0]
+
+    close_session_service()
+    reset_agent()
+    await get_mcp_client().close()
+    await close_client_pool()
+    return result
+
+
+def print_report(result: Dict[str, Any], args: argparse.Namespace) -> None:
+    turns = result["turns"]
+    print(f"script={args.script} sessions={args.sessions} turns/session={args.turns} "
+          f"concurrency={args.concurrency} session_store={args.session_store} think_ms={args.think_ms}")
+    print(f"turns:     {turns['requests']} in {turns['requests'] / max(turns['throughput_rps'], 1e-9):.2f}s "
+          f"({turns['throughput_rps']} turns/s), {turns['errors']} failed")
+    print(f"latency:   p50 {turns['p50_ms']} ms  p90 {turns['p90_ms']} ms  p99 {turns['p99_ms']} ms  "
+          f"max {turns['max_ms']} ms  (scripted model: {result['scripted_model_ms_per_turn']} ms/turn)")
+    print(f"per turn:  {result['llm_calls_per_turn']} LLM calls, {result['tool_calls_per_turn']} tool calls, "
+          f"{result['tool_errors']} tool errors in total")
+    lag = result["event_loop_lag"]
+    print(f"loop lag:  p50 {lag['p50_ms']} ms  p99 {lag['p99_ms']} ms  max {lag['max_ms']} ms")
+    memory = result["memory"]
+    print(f"memory:    RSS {memory['rss_before_mb']} -> {memory['rss_after_mb']} MiB")
+    if "heap_growth_kb" in memory:
+        print(f"           Python heap +{memory['heap_growth_kb']} KiB "
+              f"({memory['heap_growth_per_session_kb']} KiB/session), peak {memory['heap_peak_kb']} KiB")
+        for line in memory["top_allocations"]:
+            print(f"           {line}")
+    if "first_failure" in result:
+        print(f"! first failure: {result['first_failure']}")
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load-test the Flowgent agent with a scripted model")
+    parser.add_argument("--script", choices=sorted(SCRIPTS), default="build")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=2, help="turns per session")
+    parser.add_argument("--concurrency", type=int, default=50, help="turns in flight")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="scripted model latency per call")
+    parser.add_argument("--mcp-latency-ms", type=float, default=0.0)
+    parser.add_argument("--n8n-latency-ms", type=float, default=0.0)
+    parser.add_argument("--payload-kb", type=float, default=2.0)
+    parser.add_argument("--session-store", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--tracemalloc", action="store_true", help="trace Python allocations (slows the run)")
+    parser.add_argument("--json", dest="json_path", help="also write the report to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    settings = FakeSettings(
+        n8n_latency_ms=args.n8n_latency_ms, mcp_latency_ms=args.mcp_latency_ms, jitter_ms=0.0,
+        payload_kb=args.payload_kb
+    )
+    llm = ScriptedLlm(script=SCRIPTS[args.script], think_ms=args.think_ms)
+
+    with tempfile.TemporaryDirectory() as data_dir, fake_upstreams(settings) as urls:
+        configure_environment(urls, no_cache=False)
+        os.environ["SESSION_STORE"] = args.session_store
+        os.environ["SESSION_DB_PATH"] = os.path.join(data_dir, "sessions.sqlite3")
+        logging.disable(logging.WARNING)  # per-request logging would dominate the numbers
+        result = asyncio.run(run_load(
+            urls, llm, args.sessions, args.turns, args.concurrency, trace_memory=args.tracemalloc
+        ))
+
+    print_report(result, args)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), **result}, f, indent=2)
+    return 1 if result["turns"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
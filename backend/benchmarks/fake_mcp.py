@@ -0,0 +1,131 @@
+"""A stand-in for the n8n-mcp server: streamable HTTP transport answering in SSE.
+
+Answers every tool the backend calls with deterministic payloads. A JSON-RPC
+batch costs one round trip; with `batch=False` batches are rejected the way a
+server without batch support does.
+"""
+import asyncio
+import json
+import random
+import secrets
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from benchmarks.fixtures import FakeSettings, NODE_TYPES, TIMESTAMP, make_execution, make_node_doc, make_workflow
+
+TOOLS = [
+    "tools_documentation", "search_nodes", "get_node", "validate_workflow", "search_templates", "get_template",
+    "n8n_list_workflows", "n8n_get_workflow", "n8n_create_workflow", "n8n_update_workflow",
+    "n8n_update_partial_workflow", "n8n_test_workflow", "n8n_executions",
+]
+
+
+def create_fake_mcp_app(settings: FakeSettings) -> FastAPI:
+    app = FastAPI(title="Fake n8n-mcp")
+    rng = random.Random(settings.seed)
+    workflows = {str(i): make_workflow(i, settings) for i in range(1, settings.workflows + 1)}
+    node_docs = {node_type: make_node_doc(node_type, settings) for node_type in NODE_TYPES}
+
+    def call_tool(name: str, args: Dict[str, Any]) -> Any:
+        if name == "search_nodes":
+            query = str(args.get("query", "")).lower()
+            matches = [t for t in NODE_TYPES if query in t.lower()] or NODE_TYPES[:5]
+            return {"query": query, "results": [
+                {"nodeType": t, "displayName": node_docs[t]["displayName"], "description": node_docs[t]["description"]}
+                for t in matches[:args.get("limit", 20)]
+            ]}
+        if name == "get_node":
+            node_type = args.get("nodeType", "")
+            return node_docs.get(node_type) or make_node_doc(node_type, settings)
+        if name == "validate_workflow":
+            nodes = (args.get("workflow") or {}).get("nodes", [])
+            return {"valid": True, "summary": {"totalNodes": len(nodes), "errorCount": 0}, "errors": [], "warnings": []}
+        if name == "search_templates":
+            return {"templates": [
+                {"id": i, "name": f"Template {i}", "description": f"Benchmark template {i}", "nodes": NODE_TYPES[i:i + 4]}
+                for i in range(10)
+            ]}
+        if name == "get_template":
+            template = make_workflow(int(args.get("templateId", 1) or 1), settings)
+            return {"id": args.get("templateId"), "name": template["name"], "workflow": template}
+        if name == "n8n_list_workflows":
+            return {"workflows": [
+                {key: w[key] for key in ("id", "name", "active", "createdAt", "updatedAt")} for w in workflows.values()
+            ]}
+        if name == "n8n_get_workflow":
+            workflow = workflows.get(str(args.get("workflowId")))
+            if workflow is None:
+                raise KeyError(f"Workflow {args.get('workflowId')} not found")
+            if args.get("mode") == "minimal":
+                return {key: workflow[key] for key in ("id", "name", "active", "updatedAt")}
+            return workflow
+        if name == "n8n_create_workflow":
+            return {**args, "id": secrets.token_hex(8), "active": False, "createdAt": TIMESTAMP, "updatedAt": TIMESTAMP}
+        if name in ("n8n_update_workflow", "n8n_update_partial_workflow"):
+            workflow_id = str(args.get("workflowId") or args.get("id"))
+            workflow = workflows.get(workflow_id)
+            if workflow is None:
+                raise KeyError(f"Workflow {workflow_id} not found")
+            return {**workflow, **{k: v for k, v in args.items() if k in ("name", "nodes", "connections", "active")}}
+        if name == "n8n_test_workflow":
+            return {**make_execution(rng.randint(1, 10**6), settings), "workflowId": args.get("workflowId")}
+        if name == "n8n_executions":
+            return {"executions": [make_execution(i, settings) for i in range(1, 21)]}
+        if name == "tools_documentation":
+            return {"text": "Benchmark MCP server"}
+        raise KeyError(f"Unknown tool: {name}")
+
+    def handle(message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if "id" not in message:
+            return None  # notification
+        method = message.get("method")
+        params = message.get("params") or {}
+        if method == "initialize":
+            result: Any = {
+                "protocolVersion": params.get("protocolVersion", "2024-11-05"),
+                "capabilities": {"tools": {}},
+                "serverInfo": {"name": "fake-n8n-mcp", "version": "1.0.0"},
+            }
+        elif method == "tools/list":
+            result = {"tools": [{"name": name, "inputSchema": {"type": "object"}} for name in TOOLS]}
+        elif method == "tools/call":
+            try:
+                value = call_tool(params.get("name", ""), params.get("arguments") or {})
+            except KeyError as e:
+                return {"jsonrpc": "2.0", "id": message["id"], "error": {"code": -32602, "message": str(e.args[0])}}
+            result = {"content": [{"type": "text", "text": json.dumps(value)}]}
+        else:
+            return {"jsonrpc": "2.0", "id": message["id"], "error": {"code": -32601, "message": f"Unknown method {method}"}}
+        return {"jsonrpc": "2.0", "id": message["id"], "result": result}
+
+    @app.get("/healthz")
+    async def healthz():
+        return {"status": "ok"}
+
+    @app.post("/mcp")
+    async def mcp(request: Request):
+        body = await request.json()
+        if isinstance(body, list) and not settings.batch:
+            return JSONResponse(
+                {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "Batch requests are not supported"}},
+                status_code=400
+            )
+        await asyncio.sleep(max(settings.mcp_latency_ms + rng.uniform(-1, 1) * settings.jitter_ms, 0) / 1000)
+
+        messages: List[Dict[str, Any]] = body if isinstance(body, list) else [body]
+        responses = [r for r in (handle(m) for m in messages) if r is not None]
+        headers = {}
+        if any(m.get("method") == "initialize" for m in messages):
+            headers["Mcp-Session-Id"] = secrets.token_hex(16)
+        if not responses:
+            return Response(status_code=202, headers=headers)
+
+        async def events():
+            for response in responses:
+                yield f"event: message\ndata: {json.dumps(response)}\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+    return app
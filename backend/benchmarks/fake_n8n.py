@@ -0,0 +1,110 @@
+"""A stand-in for the n8n public REST API (`/api/v1`), with configurable latency."""
+import asyncio
+import random
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+
+from benchmarks.fixtures import FakeSettings, TIMESTAMP, make_execution, make_workflow
+
+
+def create_fake_n8n_app(settings: FakeSettings) -> FastAPI:
+    app = FastAPI(title="Fake n8n")
+    rng = random.Random(settings.seed)
+    workflows: Dict[str, Dict[str, Any]] = {
+        str(i): make_workflow(i, settings) for i in range(1, settings.workflows + 1)
+    }
+    executions = [make_execution(i, settings) for i in range(settings.executions, 0, -1)]
+    next_id = {"workflow": settings.workflows + 1, "execution": settings.executions + 1}
+
+    @app.middleware("http")
+    async def latency(request: Request, call_next):
+        if request.url.path.startswith("/api/v1"):
+            await asyncio.sleep(max(settings.n8n_latency_ms + rng.uniform(-1, 1) * settings.jitter_ms, 0) / 1000)
+        return await call_next(request)
+
+    def check_key(api_key: Optional[str]) -> None:
+        if not api_key:
+            raise HTTPException(status_code=401, detail="X-N8N-API-KEY header required")
+
+    def get_or_404(workflow_id: str) -> Dict[str, Any]:
+        if workflow_id not in workflows:
+            raise HTTPException(status_code=404, detail="Not Found")
+        return workflows[workflow_id]
+
+    @app.get("/healthz")
+    async def healthz():
+        return {"status": "ok"}
+
+    @app.get("/api/v1/workflows")
+    async def list_workflows(
+        limit: int = Query(100, ge=1, le=250),
+        cursor: Optional[str] = None,
+        x_n8n_api_key: Optional[str] = Header(None)
+    ):
+        check_key(x_n8n_api_key)
+        ids = list(workflows)
+        start = int(cursor) if cursor else 0
+        page = ids[start:start + limit]
+        next_cursor = str(start + limit) if start + limit < len(ids) else None
+        return {"data": [workflows[i] for i in page], "nextCursor": next_cursor}
+
+    @app.get("/api/v1/workflows/{workflow_id}")
+    async def get_workflow(workflow_id: str, x_n8n_api_key: Optional[str] = Header(None)):
+        check_key(x_n8n_api_key)
+        return get_or_404(workflow_id)
+
+    @app.post("/api/v1/workflows")
+    async def create_workflow(body: Dict[str, Any], x_n8n_api_key: Optional[str] = Header(None)):
+        check_key(x_n8n_api_key)
+        workflow_id = str(next_id["workflow"])
+        next_id["workflow"] += 1
+        # Created workflows are not kept, so repeated benchmark runs stay the same size
+        return {**body, "id": workflow_id, "active": False, "createdAt": TIMESTAMP, "updatedAt": TIMESTAMP}
+
+    @app.put("/api/v1/workflows/{workflow_id}")
+    async def update_workflow(workflow_id: str, body: Dict[str, Any], x_n8n_api_key: Optional[str] = Header(None)):
+        check_key(x_n8n_api_key)
+        current = get_or_404(workflow_id)
+        # Writes are answered but not applied, so every request sees the same workflow
+        return {**current, **body, "id": workflow_id, "updatedAt": current["updatedAt"]}
+
+    async def run(workflow_id: str) -> Dict[str, Any]:
+        get_or_404(workflow_id)
+        execution = {**make_execution(next_id["execution"], settings), "workflowId": workflow_id}
+        next_id["execution"] += 1
+        executions.insert(0, execution)
+        return {**execution, "data": {"resultData": {"runData": {}}}}
+
+    @app.post("/api/v1/workflows/{workflow_id}/execute")
+    async def execute_workflow(workflow_id: str, x_n8n_api_key: Optional[str] = Header(None)):
+        check_key(x_n8n_api_key)
+        return await run(workflow_id)
+
+    @app.post("/api/v1/workflows/{workflow_id}/run")
+    async def run_workflow(workflow_id: str, x_n8n_api_key: Optional[str] = Header(None)):
+        check_key(x_n8n_api_key)
+        return await run(workflow_id)
+
+    @app.get("/api/v1/executions")
+    async def list_executions(
+        workflowId: Optional[str] = None,
+        limit: int = Query(100, ge=1, le=250),
+        cursor: Optional[str] = None,
+        x_n8n_api_key: Optional[str] = Header(None)
+    ):
+        check_key(x_n8n_api_key)
+        rows = [e for e in executions if workflowId is None or e["workflowId"] == workflowId]
+        start = int(cursor) if cursor else 0
+        next_cursor = str(start + limit) if start + limit < len(rows) else None
+        return {"data": rows[start:start + limit], "nextCursor": next_cursor}
+
+    @app.get("/api/v1/executions/{execution_id}")
+    async def get_execution(execution_id: str, x_n8n_api_key: Optional[str] = Header(None)):
+        check_key(x_n8n_api_key)
+        for execution in executions:
+            if execution["id"] == execution_id:
+                return execution
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    return app
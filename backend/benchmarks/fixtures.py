@@ -0,0 +1,111 @@
+"""Deterministic payloads served by the fake n8n and MCP servers."""
+import random
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+NODE_TYPES = [
+    "n8n-nodes-base.manualTrigger", "n8n-nodes-base.scheduleTrigger", "n8n-nodes-base.webhook",
+    "n8n-nodes-base.httpRequest", "n8n-nodes-base.set", "n8n-nodes-base.if", "n8n-nodes-base.switch",
+    "n8n-nodes-base.merge", "n8n-nodes-base.code", "n8n-nodes-base.slack", "n8n-nodes-base.gmail",
+    "n8n-nodes-base.googleSheets", "n8n-nodes-base.notion", "n8n-nodes-base.airtable",
+    "n8n-nodes-base.postgres", "n8n-nodes-base.mysql", "n8n-nodes-base.redis", "n8n-nodes-base.github",
+    "n8n-nodes-base.jira", "n8n-nodes-base.telegram", "n8n-nodes-base.discord", "n8n-nodes-base.splitInBatches",
+    "n8n-nodes-base.wait", "n8n-nodes-base.respondToWebhook", "@n8n/n8n-nodes-langchain.agent",
+    "@n8n/n8n-nodes-langchain.lmChatOpenAi", "@n8n/n8n-nodes-langchain.memoryBufferWindow",
+    "n8n-nodes-base.stripe", "n8n-nodes-base.hubspot", "n8n-nodes-base.dropbox",
+]
+
+TIMESTAMP = "2026-01-01T00:00:00.000Z"
+_EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _timestamp(offset_ms: int) -> str:
+    """n8n-style timestamp `offset_ms` after TIMESTAMP."""
+    return (_EPOCH + timedelta(milliseconds=offset_ms)).strftime("%Y-%m-%dT%H:%M:%S.") + f"{offset_ms % 1000:03d}Z"
+
+
+@dataclass
+class FakeSettings:
+    """Shape and speed of the fake upstreams."""
+    n8n_latency_ms: float = 20.0
+    mcp_latency_ms: float = 40.0
+    jitter_ms: float = 5.0
+    payload_kb: float = 2.0        # filler per node (n8n) and per node document (MCP)
+    workflows: int = 50
+    nodes_per_workflow: int = 8
+    executions: int = 100
+    batch: bool = True             # MCP server accepts JSON-RPC batches
+    seed: int = 7
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def filler(size: int, seed: int) -> str:
+    """A printable string of `size` bytes (same input, same output)."""
+    rng = random.Random(seed)
+    alphabet = "abcdefghijklmnopqrstuvwxyz     {}$.=\n"
+    return "".join(rng.choice(alphabet) for _ in range(size))
+
+
+def make_nodes(count: int, payload_bytes: int, seed: int) -> List[Dict[str, Any]]:
+    nodes = []
+    for index in range(count):
+        node_type = NODE_TYPES[(seed + index) % len(NODE_TYPES)]
+        nodes.append({
+            "id": f"node-{seed}-{index}",
+            "name": f"{node_type.split('.')[-1]} {index}",
+            "type": node_type,
+            "typeVersion": 1,
+            "position": [index * 220, 300],
+            "parameters": {"notes": filler(payload_bytes, seed * 1000 + index), "mode": "manual"},
+        })
+    return nodes
+
+
+def make_connections(nodes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        source["name"]: {"main": [[{"node": target["name"], "type": "main", "index": 0}]]}
+        for source, target in zip(nodes, nodes[1:])
+    }
+
+
+def make_workflow(workflow_id: int, settings: FakeSettings) -> Dict[str, Any]:
+    nodes = make_nodes(settings.nodes_per_workflow, int(settings.payload_kb * 1024), workflow_id)
+    return {
+        "id": str(workflow_id),
+        "name": f"Benchmark workflow {workflow_id}",
+        "active": workflow_id % 3 == 0,
+        "nodes": nodes,
+        "connections": make_connections(nodes),
+        "settings": {"executionOrder": "v1"},
+        "tags": [],
+        "createdAt": TIMESTAMP,
+        "updatedAt": TIMESTAMP,
+    }
+
+
+def make_execution(execution_id: int, settings: FakeSettings) -> Dict[str, Any]:
+    return {
+        "id": str(execution_id),
+        "workflowId": str(execution_id % max(settings.workflows, 1) + 1),
+        "finished": True,
+        "mode": "manual" if execution_id % 4 else "trigger",
+        "status": "error" if execution_id % 10 == 0 else "success",
+        "startedAt": _timestamp(execution_id * 60_000),
+        "stoppedAt": _timestamp(execution_id * 60_000 + 200 + execution_id * 37 % 5000),
+    }
+
+
+def make_node_doc(node_type: str, settings: FakeSettings) -> Dict[str, Any]:
+    short_name = node_type.split(".")[-1]
+    size = int(settings.payload_kb * 1024)
+    return {
+        "nodeType": node_type,
+        "displayName": short_name.title(),
+        "description": f"Benchmark documentation for {short_name}",
+        "properties": {f"field{i}": filler(max(size // 8, 1), i) for i in range(8)},
+        "inputs": ["main"],
+        "outputs": ["main"],
+    }
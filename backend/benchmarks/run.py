@@ -0,0 +1,345 @@
+"""Benchmark the API routes and upstream clients against local fake servers.
+
+    python -m benchmarks.run                                # everything, default settings
+    python -m benchmarks.run --suite direct,mcp --concurrency 1,16,64
+    python -m benchmarks.run --only workflows --n8n-latency-ms 80 --payload-kb 16
+    python -m benchmarks.run --no-cache --json results.json
+
+Fake n8n and MCP servers run in child processes (see servers.py); routes are
+driven in-process through the ASGI app, including its middleware. For each
+scenario and concurrency level the runner reports p50/p90/p99 latency and
+throughput. The chat routes need a model; agent_load.py covers that path.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import math
+import os
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+import httpx
+
+from benchmarks.fixtures import FakeSettings, NODE_TYPES
+from benchmarks.servers import fake_upstreams
+
+API_KEY = "benchmark-key"
+
+
+@dataclass
+class Scenario:
+    name: str
+    suite: str  # "routes", "direct" or "mcp"
+    call: Callable[[int], Awaitable[Any]]
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence (q in 0..1)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(q * len(sorted_values)), 1)
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    ms = lambda seconds: round(seconds * 1000, 2)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "p50_ms": ms(percentile(ordered, 0.50)),
+        "p90_ms": ms(percentile(ordered, 0.90)),
+        "p99_ms": ms(percentile(ordered, 0.99)),
+        "max_ms": ms(ordered[-1]) if ordered else 0.0,
+        "mean_ms": ms(sum(ordered) / len(ordered)) if ordered else 0.0,
+        "throughput_rps": round(len(ordered) / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+async def measure(scenario: Scenario, concurrency: int, requests: int, warmup: int = 0) -> Dict[str, Any]:
+    """Run `requests` calls with `concurrency` workers; each call gets a distinct index."""
+    for index in range(warmup):
+        try:
+            await scenario.call(index)
+        except Exception:
+            pass
+
+    latencies: List[float] = []
+    errors = 0
+    first_error: Optional[str] = None
+    indexes = itertools.count(warmup)
+    last_index = warmup + requests
+
+    async def worker() -> None:
+        nonlocal errors, first_error
+        while True:
+            index = next(indexes)
+            if index >= last_index:
+                return
+            started = time.perf_counter()
+            try:
+                await scenario.call(index)
+            except Exception as e:
+                errors += 1
+                first_error = first_error or f"{type(e).__name__}: {e}"
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result = summarize(latencies, time.perf_counter() - started, errors)
+    result.update({"scenario": scenario.name, "suite": scenario.suite, "concurrency": concurrency})
+    if first_error:
+        result["first_error"] = first_error[:200]
+    return result
+
+
+# ========== Scenarios ==========
+
+def _workflow_id(index: int, settings: FakeSettings) -> str:
+    return str(index % settings.workflows + 1)
+
+
+def _new_nodes(index: int) -> List[Dict[str, Any]]:
+    return [
+        {"id": "trigger", "name": "Manual Trigger", "type": "n8n-nodes-base.manualTrigger",
+         "typeVersion": 1, "position": [0, 0], "parameters": {}},
+        {"id": "request", "name": "HTTP Request", "type": "n8n-nodes-base.httpRequest",
+         "typeVersion": 1, "position": [220, 0], "parameters": {"url": f"https://example.com/{index}"}},
+    ]
+
+
+_CONNECTIONS = {"Manual Trigger": {"main": [[{"node": "HTTP Request", "type": "main", "index": 0}]]}}
+
+
+def route_scenarios(http: httpx.AsyncClient, urls: Dict[str, str], settings: FakeSettings) -> List[Scenario]:
+    headers = {"X-N8N-Instance-URL": urls["n8n"], "X-N8N-API-Key": API_KEY}
+    n8n_config = {"instance_url": urls["n8n"], "api_key": API_KEY}
+    wf = lambda i: _workflow_id(i, settings)
+
+    def route(name: str, method: str, path: Callable[[int], str], **kwargs: Callable[[int], Any]) -> Scenario:
+        async def call(index: int) -> None:
+            options = {key: build(index) for key, build in kwargs.items()}
+            response = await http.request(method, path(index), **options)
+            response.raise_for_status()
+        return Scenario(name, "routes", call)
+
+    return [
+        route("GET /api/workflows", "GET", lambda i: "/api/workflows", headers=lambda i: headers),
+        route("GET /api/workflows?stream=1", "GET", lambda i: "/api/workflows?stream=1", headers=lambda i: headers),
+        route("GET /api/workflows (mcp)", "GET", lambda i: "/api/workflows"),
+        route("GET /api/workflows/{id}", "GET", lambda i: f"/api/workflows/{wf(i)}", headers=lambda i: headers),
+        route("GET /api/workflows/{id} (mcp)", "GET", lambda i: f"/api/workflows/{wf(i)}"),
+        route("POST /api/workflows", "POST", lambda i: "/api/workflows", json=lambda i: {
+            "name": f"Bench {i}", "nodes": _new_nodes(i), "connections": _CONNECTIONS, "n8n_config": n8n_config
+        }),
+        route("PUT /api/workflows/{id}", "PUT", lambda i: f"/api/workflows/{wf(i)}", json=lambda i: {
+            "workflow_id": wf(i), "name": f"Renamed {i}", "n8n_config": n8n_config
+        }),
+        route("PATCH /api/workflows/{id}", "PATCH", lambda i: f"/api/workflows/{wf(i)}", json=lambda i: {
+            "operations": [{"type": "updateName", "name": f"Patched {i}"}], "n8n_config": n8n_config
+        }),
+        route("POST /api/execute", "POST", lambda i: "/api/execute", json=lambda i: {
+            "workflow_id": wf(i), "n8n_config": n8n_config
+        }),
+        route("GET /api/executions", "GET", lambda i: "/api/executions", headers=lambda i: headers),
+        route("GET /api/executions?status=error", "GET", lambda i: f"/api/executions?status=error&workflow_id={wf(i)}",
+              headers=lambda i: headers),
+        route("GET /api/executions?fresh=1", "GET", lambda i: "/api/executions?fresh=1", headers=lambda i: headers),
+        route("GET /api/analytics/executions", "GET", lambda i: "/api/analytics/executions", headers=lambda i: headers),
+        route("GET /api/executions/{id}/wait", "GET", lambda i: f"/api/executions/{i % settings.executions + 1}/wait",
+              headers=lambda i: headers),
+        route("GET /api/nodes/search", "GET", lambda i: f"/api/nodes/search?q={NODE_TYPES[i % len(NODE_TYPES)].split('.')[-1]}"),
+        route("GET /api/node-info/{type}", "GET", lambda i: f"/api/node-info/{NODE_TYPES[i % len(NODE_TYPES)]}"),
+        route("GET /health", "GET", lambda i: "/health"),
+        route("GET /metrics", "GET", lambda i: "/metrics"),
+        route("GET /", "GET", lambda i: "/"),
+    ]
+
+
+def direct_scenarios(client, settings: FakeSettings) -> List[Scenario]:
+    wf = lambda i: _workflow_id(i, settings)
+    scenario = lambda name, call: Scenario(f"direct.{name}", "direct", call)
+    return [
+        scenario("list_workflows", lambda i: client.list_workflows()),
+        scenario("get_workflow", lambda i: client.get_workflow(wf(i))),
+        scenario("get_workflow(use_cache=False)", lambda i: client.get_workflow(wf(i), use_cache=False)),
+        scenario("create_workflow", lambda i: client.create_workflow(f"Bench {i}", _new_nodes(i), _CONNECTIONS)),
+        scenario("update_workflow", lambda i: client.update_workflow(wf(i), {"name": f"Renamed {i}"})),
+        scenario("patch_workflow", lambda i: client.patch_workflow(wf(i), [{"type": "updateName", "name": f"Patched {i}"}])),
+        scenario("execute_workflow", lambda i: client.execute_workflow(wf(i), {"index": i})),
+        scenario("list_executions", lambda i: client.list_executions()),
+        scenario("get_execution", lambda i: client.get_execution(str(i % settings.executions + 1))),
+        scenario("check_connection", lambda i: client.check_connection()),
+    ]
+
+
+def mcp_scenarios(client, settings: FakeSettings) -> List[Scenario]:
+    wf = lambda i: _workflow_id(i, settings)
+    node_type = lambda i: NODE_TYPES[i % len(NODE_TYPES)]
+    scenario = lambda name, call: Scenario(f"mcp.{name}", "mcp", call)
+    return [
+        scenario("initialize", lambda i: client._call_mcp("initialize", {"protocolVersion": "2024-11-05"})),
+        scenario("list_tools", lambda i: client.list_tools()),
+        scenario("search_nodes(remote)", lambda i: client.search_nodes(node_type(i).split(".")[-1], remote=True)),
+        scenario("get_node", lambda i: client.get_node(node_type(i))),
+        scenario("get_node_info", lambda i: client.get_node_info(node_type(i))),
+        scenario("call_tools_batch(5 x get_node)", lambda i: client.call_tools_batch(
+            [("get_node", {"nodeType": NODE_TYPES[(i + k) % len(NODE_TYPES)], "mode": "info", "detail": "full"})
+             for k in range(5)]
+        )),
+        scenario("validate_workflow", lambda i: client.validate_workflow({"nodes": _new_nodes(i), "connections": _CONNECTIONS})),
+        scenario("search_templates", lambda i: client.search_templates(f"query {i % 10}")),
+        scenario("get_template", lambda i: client.get_template(str(i % 10 + 1))),
+        scenario("list_workflows", lambda i: client.list_workflows()),
+        scenario("get_workflow", lambda i: client.get_workflow(wf(i))),
+        scenario("create_workflow", lambda i: client.create_workflow(f"Bench {i}", _new_nodes(i), _CONNECTIONS)),
+        scenario("update_workflow", lambda i: client.update_workflow(wf(i), {"name": f"Renamed {i}"})),
+        scenario("patch_workflow", lambda i: client.patch_workflow(wf(i), [{"type": "updateName", "name": f"Patched {i}"}])),
+        scenario("execute_workflow", lambda i: client.execute_workflow(wf(i))),
+        scenario("list_executions", lambda i: client.list_executions()),
+    ]
+
+
+# ========== Runner ==========
+
+def configure_environment(urls: Dict[str, str], no_cache: bool) -> None:
+    """Point the backend at the fakes. Must run before the backend creates its clients."""
+    os.environ["N8N_MCP_URL"] = urls["mcp"]
+    os.environ["N8N_MCP_API_KEY"] = API_KEY
+    os.environ.setdefault("SESSION_STORE", "memory")
+    os.environ.setdefault("N8N_MCP_CACHE_PATH", "")  # memory-only; keep the real cache file out of it
+    os.environ.setdefault("EXECUTION_DB_PATH", ":memory:")
+    os.environ.setdefault("EXECUTION_RETAIN_DAYS", "0")  # the fake executions are dated 2026-01-01
+    os.environ.setdefault("IDEMPOTENCY_DB_PATH", ":memory:")
+    if no_cache:
+        os.environ["N8N_MCP_CACHE"] = "0"
+        os.environ["NODE_INFO_CACHE_TTL"] = "0"
+        os.environ["NODE_INFO_CACHE_NEGATIVE_TTL"] = "0"
+        os.environ["WORKFLOW_CACHE_FRESH_SECONDS"] = "0"
+        os.environ["WORKFLOW_CACHE_INDEX_SECONDS"] = "0"
+        os.environ["EXECUTION_SYNC_INTERVAL_SECONDS"] = "0"
+        os.environ["IDEMPOTENCY_CONTENT_WINDOW_SECONDS"] = "0"
+
+
+async def run_benchmarks(
+    urls: Dict[str, str],
+    settings: FakeSettings,
+    suites: Sequence[str] = ("routes", "direct", "mcp"),
+    concurrency: Sequence[int] = (1, 8, 32),
+    requests: int = 200,
+    warmup: int = 10,
+    only: Optional[str] = None,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> List[Dict[str, Any]]:
+    """Run every selected scenario at every concurrency level."""
+    from main import app
+    from n8n_mcp.n8n_client import N8nMcpClient, get_mcp_client
+    from n8n_mcp.direct_client import DirectN8nClient
+    from n8n_mcp.client_pool import close_client_pool
+
+    transport = httpx.ASGITransport(app=app)
+    http = httpx.AsyncClient(transport=transport, base_url="http://flowgent", timeout=120.0)
+    mcp_client = N8nMcpClient()
+    scenarios: List[Scenario] = []
+    if "routes" in suites:
+        scenarios += route_scenarios(http, urls, settings)
+    if "direct" in suites:
+        scenarios += direct_scenarios(DirectN8nClient(urls["n8n"], API_KEY), settings)
+    if "mcp" in suites:
+        scenarios += mcp_scenarios(mcp_client, settings)
+    if only:
+        scenarios = [s for s in scenarios if only.lower() in s.name.lower()]
+
+    results = []
+    try:
+        for scenario in scenarios:
+            for level in concurrency:
+                result = await measure(scenario, level, requests, warmup)
+                results.append(result)
+                if on_result:
+                    on_result(result)
+    finally:
+        await http.aclose()
+        await mcp_client.close()
+        await get_mcp_client().close()
+        await close_client_pool()
+    return results
+
+
+def format_row(result: Dict[str, Any]) -> str:
+    return (
+        f"{result['scenario']:<44} {result['concurrency']:>5} {result['requests']:>6} {result['errors']:>5} "
+        f"{result['p50_ms']:>9.2f} {result['p90_ms']:>9.2f} {result['p99_ms']:>9.2f} {result['throughput_rps']:>9.1f}"
+    )
+
+
+HEADER = (
+    f"{'scenario':<44} {'conc':>5} {'reqs':>6} {'errs':>5} "
+    f"{'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'req/s':>9}"
+)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    defaults = FakeSettings()
+    parser = argparse.ArgumentParser(description="Benchmark Flowgent routes and clients against fake upstreams")
+    parser.add_argument("--suite", default="routes,direct,mcp", help="comma-separated: routes, direct, mcp")
+    parser.add_argument("--only", help="only scenarios whose name contains this text")
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per scenario and level")
+    parser.add_argument("--warmup", type=int, default=10, help="unmeasured requests before each level")
+    parser.add_argument("--n8n-latency-ms", type=float, default=defaults.n8n_latency_ms)
+    parser.add_argument("--mcp-latency-ms", type=float, default=defaults.mcp_latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=defaults.jitter_ms)
+    parser.add_argument("--payload-kb", type=float, default=defaults.payload_kb, help="filler per node / node document")
+    parser.add_argument("--workflows", type=int, default=defaults.workflows)
+    parser.add_argument("--nodes", type=int, default=defaults.nodes_per_workflow, help="nodes per workflow")
+    parser.add_argument("--no-batch", action="store_true", help="fake MCP server rejects JSON-RPC batches")
+    parser.add_argument("--no-cache", action="store_true", help="disable the backend's MCP, node-info and workflow caches")
+    parser.add_argument("--json", dest="json_path", help="also write results to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    settings = FakeSettings(
+        n8n_latency_ms=args.n8n_latency_ms,
+        mcp_latency_ms=args.mcp_latency_ms,
+        jitter_ms=args.jitter_ms,
+        payload_kb=args.payload_kb,
+        workflows=args.workflows,
+        nodes_per_workflow=args.nodes,
+        batch=not args.no_batch,
+    )
+    suites = [s.strip() for s in args.suite.split(",") if s.strip()]
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    with tempfile.TemporaryDirectory() as cache_dir, fake_upstreams(settings) as urls:
+        os.environ.setdefault("SESSION_DB_PATH", os.path.join(cache_dir, "sessions.sqlite3"))
+        configure_environment(urls, args.no_cache)
+        logging.disable(logging.WARNING)  # request logging would dominate the numbers
+
+        print(f"Fake n8n: {urls['n8n']}  fake MCP: {urls['mcp']}  settings: {settings.to_dict()}")
+        print(HEADER)
+        print("-" * len(HEADER))
+        results = asyncio.run(run_benchmarks(
+            urls, settings, suites, levels, args.requests, args.warmup, args.only,
+            on_result=lambda result: print(format_row(result), flush=True)
+        ))
+
+    failed = [r for r in results if r["errors"]]
+    for result in failed:
+        print(f"! {result['scenario']} (concurrency {result['concurrency']}): "
+              f"{result['errors']} errors, first: {result.get('first_error')}")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"settings": settings.to_dict(), "no_cache": args.no_cache, "results": results}, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
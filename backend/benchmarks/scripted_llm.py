@@ -0,0 +1,120 @@
+"""A deterministic stand-in for Gemini that replays a scripted tool-call sequence.
+
+Each step of a script is either a list of tool calls (issued together, as
+one model turn) or the final text. The step is chosen by counting the model
+turns since the user's latest message, so concurrent sessions and multi-turn
+conversations each follow the script independently.
+"""
+import asyncio
+import json
+from typing import Any, AsyncGenerator, Dict, List, Union
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+from pydantic import PrivateAttr
+
+ToolCall = Dict[str, Any]  # {"name": ..., "args": {...}}
+Step = Union[str, List[ToolCall]]
+
+_WORKFLOW = {
+    "nodes": [
+        {"name": "Schedule Trigger", "type": "n8n-nodes-base.scheduleTrigger", "typeVersion": 1,
+         "position": [0, 0], "parameters": {"rule": {"interval": [{"field": "hours"}]}}},
+        {"name": "Slack", "type": "n8n-nodes-base.slack", "typeVersion": 2,
+         "position": [220, 0], "parameters": {"channel": "#alerts", "text": "Hourly report"}},
+    ],
+    "connections": {"Schedule Trigger": {"main": [[{"node": "Slack", "type": "main", "index": 0}]]}},
+}
+
+SCRIPTS: Dict[str, List[Step]] = {
+    # A typical "build me a workflow" turn: parallel searches, docs, validate, create
+    "build": [
+        [{"name": "search_nodes", "args": {"query": "slack"}},
+         {"name": "search_workflow_templates", "args": {"query": "slack schedule"}}],
+        [{"name": "get_nodes_documentation",
+          "args": {"node_types": ["n8n-nodes-base.scheduleTrigger", "n8n-nodes-base.slack"]}}],
+        [{"name": "validate_workflow_json", "args": {"workflow_json": json.dumps(_WORKFLOW)}}],
+        [{"name": "create_workflow",
+          "args": {"name": "Hourly Slack report", "description": "Posts to Slack every hour",
+                   "nodes_json": json.dumps(_WORKFLOW)}}],
+        "I created the workflow 'Hourly Slack report'. It posts to #alerts every hour.",
+    ],
+    # Reading an existing workflow and patching it
+    "edit": [
+        [{"name": "get_workflow", "args": {"workflow_id": "1"}}],
+        [{"name": "patch_workflow",
+          "args": {"workflow_id": "1", "operations_json": json.dumps([{"type": "updateName", "name": "Renamed"}])}}],
+        "Renamed the workflow.",
+    ],
+    # No tools: runner and session overhead only
+    "text": ["n8n is a workflow automation tool."],
+}
+
+
+def _content_size(content: types.Content) -> int:
+    size = 0
+    for part in content.parts or []:
+        if part.text:
+            size += len(part.text)
+        elif part.function_call:
+            size += len(json.dumps(part.function_call.args or {}, default=str))
+        elif part.function_response:
+            size += len(json.dumps(part.function_response.response or {}, default=str))
+    return size
+
+
+class ScriptedLlm(BaseLlm):
+    """Replays `script`, sleeping `think_ms` per model call to stand in for model latency."""
+
+    model: str = "scripted"
+    script: List[Step] = SCRIPTS["build"]
+    think_ms: float = 0.0
+
+    _stats: Dict[str, int] = PrivateAttr(default_factory=lambda: {"llm_calls": 0, "tool_calls": 0, "tool_errors": 0})
+
+    @property
+    def final_text(self) -> str:
+        return next(step for step in reversed(self.script) if isinstance(step, str))
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return dict(self._stats)
+
+    def _position(self, llm_request: LlmRequest) -> int:
+        """Model turns since the latest user text message; counts tool errors seen in between."""
+        steps = 0
+        for content in reversed(llm_request.contents):
+            parts = content.parts or []
+            if content.role == "model":
+                steps += 1
+            elif any(part.text for part in parts):
+                break
+        last = llm_request.contents[-1] if llm_request.contents else None
+        if last is not None and last.role == "user":
+            for part in last.parts or []:
+                response = part.function_response.response if part.function_response else None
+                if isinstance(response, dict) and response.get("status") == "error":
+                    self._stats["tool_errors"] += 1
+        return steps
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self._stats["llm_calls"] += 1
+        step = self.script[min(self._position(llm_request), len(self.script) - 1)]
+        if self.think_ms:
+            await asyncio.sleep(self.think_ms / 1000)
+
+        usage = types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=sum(_content_size(c) for c in llm_request.contents) // 4,
+            candidates_token_count=max(len(json.dumps(step, default=str)) // 4, 1),
+        )
+        if isinstance(step, str):
+            if stream:
+                yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=step)]), partial=True)
+            yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=step)]), usage_metadata=usage)
+            return
+
+        self._stats["tool_calls"] += len(step)
+        parts = [types.Part(function_call=types.FunctionCall(name=call["name"], args=call["args"])) for call in step]
+        yield LlmResponse(content=types.Content(role="model", parts=parts), usage_metadata=usage)
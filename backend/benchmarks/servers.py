@@ -0,0 +1,65 @@
+"""Run the fake upstreams in child processes, so they don't compete with the
+code under test for the GIL or the event loop."""
+import multiprocessing
+import socket
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+import httpx
+
+from benchmarks.fixtures import FakeSettings
+
+STARTUP_TIMEOUT = 15.0
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _serve(kind: str, settings: Dict, port: int) -> None:
+    import uvicorn
+    from benchmarks.fake_mcp import create_fake_mcp_app
+    from benchmarks.fake_n8n import create_fake_n8n_app
+
+    factory = create_fake_mcp_app if kind == "mcp" else create_fake_n8n_app
+    uvicorn.run(factory(FakeSettings(**settings)), host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+def _wait_ready(url: str, process: multiprocessing.Process) -> None:
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if not process.is_alive():
+            raise RuntimeError(f"Fake server for {url} exited with code {process.exitcode}")
+        try:
+            if httpx.get(f"{url}/healthz", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    raise RuntimeError(f"Fake server for {url} did not start within {STARTUP_TIMEOUT}s")
+
+
+@contextmanager
+def fake_upstreams(settings: FakeSettings) -> Iterator[Dict[str, str]]:
+    """Start fake n8n and MCP servers; yields {"n8n": base_url, "mcp": endpoint_url}."""
+    context = multiprocessing.get_context("spawn")
+    processes = {}
+    urls = {}
+    try:
+        for kind in ("n8n", "mcp"):
+            port = _free_port()
+            process = context.Process(target=_serve, args=(kind, settings.to_dict(), port), daemon=True)
+            process.start()
+            processes[kind] = process
+            urls[kind] = f"http://127.0.0.1:{port}"
+        for kind, process in processes.items():
+            _wait_ready(urls[kind], process)
+        yield {"n8n": urls["n8n"], "mcp": f"{urls['mcp']}/mcp"}
+    finally:
+        for process in processes.values():
+            process.terminate()
+        for process in processes.values():
+            process.join(timeout=5)
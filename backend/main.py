@@ -3,13 +3,23 @@ import logging
 import uvicorn
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 load_dotenv()
 
-from api.routes import router
+from api.routes import router, NODE_INFO_CACHE
 from models.schemas import HealthCheck
 from n8n_mcp.n8n_client import get_mcp_client, N8nMcpClient
+from n8n_mcp.client_pool import close_client_pool
+from n8n_mcp.resilience import breaker_states, MCP_BREAKER, OPEN
+from agent.flowgent_agent import close_session_service
+from n8n_mcp.workflow_cache import get_workflow_cache
+from n8n_mcp.workflow_validator import get_workflow_validator
+from n8n_mcp.execution_store import close_execution_sync
+from n8n_mcp.idempotency import close_idempotency_store
+from observability.metrics import MetricsMiddleware, register_collector, render_metrics, CONTENT_TYPE
+from observability.tracing import TracingMiddleware
 
 # Configure logging
 logging.basicConfig(
@@ -26,12 +36,32 @@ async def lifespan(app: FastAPI):
     """Application lifespan - startup and shutdown events."""
     # Startup
     yield
+    # Shutdown - stop the execution sync and close its store
+    try:
+        await close_execution_sync()
+    except Exception as e:
+        print(f"Error closing execution store: {e}")
     # Shutdown - close HTTP client
     try:
         client = get_mcp_client()
         await client.close()
     except Exception as e:
         print(f"Error closing MCP client: {e}")
+    # Shutdown - close pooled n8n clients
+    try:
+        await close_client_pool()
+    except Exception as e:
+        print(f"Error closing n8n client pool: {e}")
+    # Shutdown - close the session store
+    try:
+        close_session_service()
+    except Exception as e:
+        print(f"Error closing session store: {e}")
+    # Shutdown - close the idempotency store
+    try:
+        close_idempotency_store()
+    except Exception as e:
+        print(f"Error closing idempotency store: {e}")
 
 
 app = FastAPI(
@@ -60,20 +90,68 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
+
 app.include_router(router)
 
 
+def _cache_metrics():
+    """Hit/miss counters of the caches, read at scrape time."""
+    lookups = []
+    ratios = []
+    tool_cache = get_mcp_client().cache_stats()
+    if tool_cache.get("enabled"):
+        for result in ("memory_hits", "disk_hits", "misses"):
+            lookups.append(("flowgent_cache_lookups_total", {"cache": "mcp_tools", "result": result}, tool_cache[result]))
+        ratios.append(("flowgent_cache_hit_ratio", {"cache": "mcp_tools"}, tool_cache["hit_ratio"]))
+    
+    caches = {
+        "node_info": (NODE_INFO_CACHE.stats, ("hits", "coalesced"), ("misses",)),
+        "workflows": (get_workflow_cache().stats, ("fresh_hits", "revalidated_hits"), ("misses",)),
+        "workflow_validation": (get_workflow_validator().stats(), ("hits", "coalesced"), ("misses",)),
+    }
+    for name, (stats, hit_fields, miss_fields) in caches.items():
+        for result in hit_fields + miss_fields:
+            lookups.append(("flowgent_cache_lookups_total", {"cache": name, "result": result}, stats[result]))
+        hits = sum(stats[f] for f in hit_fields)
+        total = hits + sum(stats[f] for f in miss_fields)
+        ratios.append(("flowgent_cache_hit_ratio", {"cache": name}, round(hits / total, 4) if total else 0.0))
+    
+    return [
+        ("flowgent_cache_lookups_total", "counter", "Cache lookups by cache and result", lookups),
+        ("flowgent_cache_hit_ratio", "gauge", "Share of cache lookups served without loading", ratios),
+    ]
+
+
+register_collector(_cache_metrics)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics."""
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
+
+
 @app.get("/health", response_model=HealthCheck)
 async def health():
-    """Health check endpoint."""
+    """Health check endpoint, including circuit breaker state per upstream."""
     try:
         logger.info("Health check requested")
         connected = await get_mcp_client().check_connection()
         logger.info(f"MCP connection status: {connected}")
-        return HealthCheck(status="healthy", version="2.0.0", mcp_connected=connected)
+        upstreams = breaker_states()
+        # A user's unreachable n8n instance doesn't make the backend unhealthy
+        mcp_open = upstreams.get(MCP_BREAKER, {}).get("state") == OPEN
+        return HealthCheck(
+            status="degraded" if mcp_open else "healthy",
+            version="2.0.0",
+            mcp_connected=connected,
+            upstreams=upstreams
+        )
     except Exception as e:
         logger.error(f"Health check error: {e}", exc_info=True)
-        return HealthCheck(status="degraded", version="2.0.0", mcp_connected=False)
+        return HealthCheck(status="degraded", version="2.0.0", mcp_connected=False, upstreams=breaker_states())
 
 
 @app.get("/")
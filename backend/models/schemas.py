@@ -12,12 +12,14 @@ class ChatMessage(BaseModel):
     message: str
     context: Optional[Dict[str, Any]] = None
     n8n_config: Optional[N8nConfig] = None
+    debug: bool = False  # include a timing breakdown in the response
 
 
 class ChatResponse(BaseModel):
     response: str
     workflow_data: Optional[Dict[str, Any]] = None
     action: Optional[str] = None
+    timings: Optional[Dict[str, Any]] = None
 
 
 class WorkflowListItem(BaseModel):
@@ -62,6 +64,13 @@ class UpdateWorkflowRequest(BaseModel):
     n8n_config: Optional[N8nConfig] = None
 
 
+class PatchWorkflowRequest(BaseModel):
+    """Node-level patch operations for an existing workflow (see n8n_mcp.workflow_patch)."""
+    operations: List[Dict[str, Any]]
+    expected_updated_at: Optional[str] = None
+    n8n_config: Optional[N8nConfig] = None
+
+
 class ExecutionRequest(BaseModel):
     workflow_id: str
     input_data: Optional[Dict[str, Any]] = None
@@ -75,6 +84,7 @@ class ExecutionResponse(BaseModel):
     error: Optional[Any] = None
     started_at: Optional[str] = Field(None, alias="startedAt")
     finished_at: Optional[str] = Field(None, alias="finishedAt")
+    status: Optional[str] = None  # n8n execution status, e.g. "running" or "success"
     
     class Config:
         populate_by_name = True
@@ -94,3 +104,4 @@ class HealthCheck(BaseModel):
     status: str
     version: str
     mcp_connected: bool
+    upstreams: Dict[str, Any] = {}
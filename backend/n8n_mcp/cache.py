@@ -0,0 +1,317 @@
+"""Caching for read-only MCP tool results.
+
+Two tiers: an in-memory LRU for hot entries and an optional SQLite file that
+survives restarts. Entries expire per tool, since node docs only change on
+n8n releases while template searches go stale sooner.
+"""
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple, Callable, Awaitable
+
+from n8n_mcp.env import env_int
+
+logger = logging.getLogger(__name__)
+
+# Sentinel for a cache miss (None can be a legitimate cached value)
+MISS = object()
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Read-only MCP tools that are safe to cache, with their default TTLs (seconds)
+DEFAULT_TOOL_TTLS: Dict[str, float] = {
+    "get_node": 7 * DAY,
+    "tools_documentation": 7 * DAY,
+    "search_nodes": DAY,
+    "get_template": DAY,
+    "search_templates": 6 * HOUR,
+}
+
+
+def cache_key(tool_name: str, arguments: Optional[Dict[str, Any]]) -> str:
+    """Stable key for a tool call - argument order does not matter."""
+    args = json.dumps(arguments or {}, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{tool_name}:{hashlib.sha256(args.encode('utf-8')).hexdigest()}"
+
+
+class LRUCache:
+    """In-memory LRU with a per-entry expiry time."""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._data[key] = (time.time() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SqliteCacheTier:
+    """Persistent cache tier backed by a single SQLite file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tool_cache ("
+            " key TEXT PRIMARY KEY, tool TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Tuple[Any, float]:
+        """Return (value, expires_at), or (MISS, 0) if absent or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM tool_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return MISS, 0.0
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, tool_name: str, value: Any, expires_at: float) -> None:
+        payload = json.dumps(value, default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tool_cache (key, tool, value, expires_at) VALUES (?, ?, ?, ?)",
+                (key, tool_name, payload, expires_at)
+            )
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM tool_cache WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+            return cur.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM tool_cache")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def is_cacheable_result(result: Any) -> bool:
+    """Don't cache empty or error-shaped tool results."""
+    if result is None:
+        return False
+    if isinstance(result, dict):
+        if "error" in result or result.get("success") is False or result.get("isError"):
+            return False
+    return True
+
+
+class ToolResultCache:
+    """Memory LRU + SQLite cache for read-only MCP tool results, with hit/miss counters."""
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        db_path: Optional[str] = None,
+        ttls: Optional[Dict[str, float]] = None
+    ):
+        self.ttls = dict(DEFAULT_TOOL_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.memory = LRUCache(max_entries)
+        self.disk: Optional[SqliteCacheTier] = None
+        if db_path:
+            try:
+                self.disk = SqliteCacheTier(db_path)
+                self.disk.purge_expired()
+            except Exception as e:
+                logger.warning(f"MCP cache: disabling SQLite tier at {db_path}: {e}")
+                self.disk = None
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def is_cacheable(self, tool_name: str) -> bool:
+        return tool_name in self.ttls
+
+    def _count(self, tool_name: str, field: str) -> None:
+        counters = self._stats.setdefault(tool_name, {"memory_hits": 0, "disk_hits": 0, "misses": 0})
+        counters[field] += 1
+
+    async def get(self, tool_name: str, arguments: Optional[Dict[str, Any]] = None) -> Any:
+        """Cached result for a tool call, or the `MISS` sentinel."""
+        key = cache_key(tool_name, arguments)
+        value = self.memory.get(key, MISS)
+        if value is not MISS:
+            self._count(tool_name, "memory_hits")
+            return value
+
+        if self.disk is not None:
+            try:
+                value, expires_at = await asyncio.to_thread(self.disk.get, key)
+            except Exception as e:
+                logger.warning(f"MCP cache read failed for {tool_name}: {e}")
+                value, expires_at = MISS, 0.0
+            if value is not MISS:
+                # Promote to memory for the rest of its lifetime
+                self.memory.set(key, value, expires_at - time.time())
+                self._count(tool_name, "disk_hits")
+                return value
+
+        self._count(tool_name, "misses")
+        return MISS
+
+    async def set(self, tool_name: str, arguments: Optional[Dict[str, Any]], value: Any) -> None:
+        """Store a tool result if it looks like a successful one."""
+        if not self.is_cacheable(tool_name) or not is_cacheable_result(value):
+            return
+        ttl = self.ttls[tool_name]
+        key = cache_key(tool_name, arguments)
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.set, key, tool_name, value, time.time() + ttl)
+            except Exception as e:
+                logger.warning(f"MCP cache write failed for {tool_name}: {e}")
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters, overall and per tool."""
+        totals = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        for counters in self._stats.values():
+            for field, count in counters.items():
+                totals[field] += count
+        lookups = sum(totals.values())
+        hits = totals["memory_hits"] + totals["disk_hits"]
+        return {
+            **totals,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "per_tool": {tool: dict(c) for tool, c in self._stats.items()},
+        }
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+            self.disk = None
+
+
+class SingleFlightCache:
+    """Bounded TTL cache that coalesces concurrent loads of the same key.
+
+    Loaders return `(value, negative)`. Negative results (fallbacks after an
+    upstream failure) are kept only for `negative_ttl` so a transient outage
+    does not poison an entry. While a key is loading, every other request for
+    it awaits the same load instead of starting its own.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = DAY, negative_ttl: float = 30.0):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries = LRUCache(max_entries)
+        self._pinned: Dict[str, Any] = {}
+        self._inflight: Dict[str, "asyncio.Task"] = {}
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "loads": 0}
+
+    def pin(self, key: str, value: Any) -> None:
+        """Store a value that never expires or gets evicted (e.g. seeded entries)."""
+        self._pinned[key] = value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._pinned:
+            return self._pinned[key]
+        return self._entries.get(key, default)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, MISS) is not MISS
+
+    def __len__(self) -> int:
+        return len(self._pinned) + len(self._entries)
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Tuple[Any, bool]]]) -> Any:
+        """Return the cached value, or load it once for all concurrent callers."""
+        value = self.get(key, MISS)
+        if value is not MISS:
+            self.stats["hits"] += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["misses"] += 1
+            task = asyncio.ensure_future(self._load(key, loader))
+            # Retrieve the exception even if every waiter was cancelled
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[key] = task
+        # Shield so one cancelled request does not cancel the load for the others
+        return await asyncio.shield(task)
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Tuple[Any, bool]]]) -> Any:
+        try:
+            self.stats["loads"] += 1
+            value, negative = await loader()
+            self._entries.set(key, value, self.negative_ttl if negative else self.ttl)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def create_tool_cache_from_env() -> Optional[ToolResultCache]:
+    """Build the MCP tool cache from environment settings, or None if disabled.
+
+    N8N_MCP_CACHE=0 disables caching, N8N_MCP_CACHE_SIZE bounds the memory tier,
+    N8N_MCP_CACHE_PATH sets the SQLite file ("" keeps the cache memory-only) and
+    N8N_MCP_CACHE_TTL_<TOOL> overrides a tool's TTL in seconds.
+    """
+    if os.getenv("N8N_MCP_CACHE", "1").lower() in ("0", "false", "no", "off"):
+        return None
+    max_entries = env_int("N8N_MCP_CACHE_SIZE", 512)
+    db_path = os.getenv("N8N_MCP_CACHE_PATH", os.path.join(".cache", "mcp_tool_cache.sqlite3"))
+
+    ttls = {}
+    for tool_name in DEFAULT_TOOL_TTLS:
+        override = os.getenv(f"N8N_MCP_CACHE_TTL_{tool_name.upper()}")
+        if override:
+            try:
+                ttls[tool_name] = float(override)
+            except ValueError:
+                logger.warning(f"Ignoring invalid TTL override for {tool_name}: {override}")
+    return ToolResultCache(max_entries=max_entries, db_path=db_path or None, ttls=ttls)
@@ -0,0 +1,162 @@
+"""Registry of long-lived pooled HTTP clients keyed by n8n instance."""
+import os
+import time
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Optional, Dict, Tuple
+import httpx
+
+from n8n_mcp.env import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+
+def _http2_available() -> bool:
+    """HTTP/2 support in httpx needs the optional `h2` package."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def instance_key(instance_url: str, api_key: str) -> Tuple[str, str]:
+    """Key for an n8n instance + credential pair. The API key is only stored hashed."""
+    key_hash = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+    return (instance_url.rstrip("/"), key_hash)
+
+
+@dataclass
+class _PooledClient:
+    client: httpx.AsyncClient
+    last_used: float
+    loop: asyncio.AbstractEventLoop
+
+
+class N8nClientPool:
+    """Holds one keep-alive `httpx.AsyncClient` per (instance_url, hashed api_key).
+
+    Clients that have not been used for `idle_timeout` seconds are closed and
+    dropped the next time the pool is touched.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
+        http2: Optional[bool] = None,
+    ):
+        self.timeout = timeout if timeout is not None else env_float("N8N_HTTP_TIMEOUT", 30.0)
+        self.max_connections = max_connections if max_connections is not None else env_int("N8N_HTTP_MAX_CONNECTIONS", 20)
+        self.max_keepalive_connections = (
+            max_keepalive_connections if max_keepalive_connections is not None
+            else env_int("N8N_HTTP_MAX_KEEPALIVE", 10)
+        )
+        self.keepalive_expiry = keepalive_expiry if keepalive_expiry is not None else env_float("N8N_HTTP_KEEPALIVE_EXPIRY", 30.0)
+        self.idle_timeout = idle_timeout if idle_timeout is not None else env_float("N8N_HTTP_IDLE_TIMEOUT", 300.0)
+
+        if http2 is None:
+            http2 = os.getenv("N8N_HTTP2", "").lower() in ("1", "true", "yes")
+        if http2 and not _http2_available():
+            logger.warning("N8N_HTTP2 requested but the 'h2' package is not installed - using HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+
+        self._clients: Dict[Tuple[str, str], _PooledClient] = {}
+        self._lock = asyncio.Lock()
+
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=self.timeout,
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+        )
+
+    async def get(self, instance_url: str, api_key: str) -> httpx.AsyncClient:
+        """Get (or create) the pooled client for an n8n instance."""
+        key = instance_key(instance_url, api_key)
+        now = time.monotonic()
+        async with self._lock:
+            await self._evict_idle(now)
+            loop = asyncio.get_running_loop()
+            entry = self._clients.get(key)
+            # Connections are bound to the loop that opened them
+            if entry is None or entry.client.is_closed or entry.loop is not loop:
+                if entry is not None and not entry.client.is_closed:
+                    await self._close_entry(key, entry)
+                logger.info(f"Opening pooled HTTP client for {key[0]}")
+                entry = _PooledClient(client=self._new_client(), last_used=now, loop=loop)
+                self._clients[key] = entry
+            entry.last_used = now
+            return entry.client
+
+    async def _evict_idle(self, now: float) -> None:
+        """Close clients idle for longer than `idle_timeout`. Caller holds the lock."""
+        if self.idle_timeout <= 0:
+            return
+        expired = [k for k, e in self._clients.items() if now - e.last_used > self.idle_timeout]
+        for key in expired:
+            entry = self._clients.pop(key)
+            logger.info(f"Closing idle HTTP client for {key[0]}")
+            await self._close_entry(key, entry)
+
+    @staticmethod
+    async def _close_entry(key: Tuple[str, str], entry: _PooledClient) -> None:
+        """Close a pooled client on the loop that owns its connections.
+
+        A client from another loop that is still running is closed there
+        without waiting for it; one whose loop has stopped can only be closed
+        from here, which may fail for connections that loop left open.
+        """
+        try:
+            if entry.loop is not asyncio.get_running_loop() and entry.loop.is_running():
+                future = asyncio.run_coroutine_threadsafe(entry.client.aclose(), entry.loop)
+                future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            else:
+                await entry.client.aclose()
+        except Exception as e:
+            logger.warning(f"Error closing pooled client for {key[0]}: {e}")
+
+    async def evict_idle(self) -> None:
+        """Close clients that have been idle for too long."""
+        async with self._lock:
+            await self._evict_idle(time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    async def close(self) -> None:
+        """Close every pooled client."""
+        async with self._lock:
+            clients = list(self._clients.items())
+            self._clients.clear()
+        for key, entry in clients:
+            await self._close_entry(key, entry)
+
+
+_pool: Optional[N8nClientPool] = None
+
+
+def get_client_pool() -> N8nClientPool:
+    """Get singleton client pool."""
+    global _pool
+    if _pool is None:
+        _pool = N8nClientPool()
+    return _pool
+
+
+async def close_client_pool() -> None:
+    """Close all pooled n8n clients (called on app shutdown)."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
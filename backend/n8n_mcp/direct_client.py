@@ -1,11 +1,25 @@
 """Direct n8n API Client - uses user-provided credentials."""
+import time
 import httpx
 import logging
 import json
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, AsyncIterator, Tuple
+from n8n_mcp.client_pool import get_client_pool, instance_key
+from n8n_mcp.env import env_float, env_int
+from n8n_mcp.resilience import call_with_resilience, N8N_BREAKER_PREFIX
+from n8n_mcp.workflow_cache import get_workflow_cache
+from n8n_mcp.workflow_patch import apply_workflow_patch, WorkflowConflictError
+from observability.metrics import N8N_REQUEST_DURATION, endpoint_template, outcome_of
+from observability.tracing import start_span, finish, KIND_CLIENT
 
 logger = logging.getLogger(__name__)
 
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE"}
+
+# n8n's public API caps page size at 250
+MAX_PAGE_SIZE = 250
+DEFAULT_PAGE_SIZE = max(min(env_int("N8N_PAGE_SIZE", 100), MAX_PAGE_SIZE), 1)
+
 
 class DirectN8nClient:
     """Client for direct n8n API calls using user-provided credentials."""
@@ -27,38 +41,119 @@ class DirectN8nClient:
             "X-N8N-API-KEY": api_key,
             "Content-Type": "application/json"
         }
+        # One circuit breaker per n8n instance; overall budget per call, including retries
+        self.upstream = f"{N8N_BREAKER_PREFIX}{self.instance_url}"
+        self.deadline = env_float("N8N_DEADLINE_SECONDS", 30.0)
+        self.cache_key = instance_key(self.instance_url, api_key)
     
     async def _request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
-        """Make HTTP request to n8n API."""
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            url = f"{self.base_url}{endpoint}"
-            logger.debug(f"n8n API: {method} {url}")
-            
-            logger.info(f"DirectClient requesting: {method} {url}")
-            
-            try:
-                response = await client.request(
-                    method, url, headers=self.headers, **kwargs
-                )
-                response.raise_for_status()
-                result = response.json()
-                logger.debug(f"n8n API response: {response.status_code}")
-                return result
-            except httpx.HTTPStatusError as e:
-                logger.error(f"n8n API error {e.response.status_code}: {e.response.text[:200]}")
-                raise
-            except Exception as e:
-                logger.error(f"n8n API request failed: {e}", exc_info=True)
-                raise
+        """Make HTTP request to n8n API, with retries for idempotent methods and circuit breaking."""
+        url = f"{self.base_url}{endpoint}"
+        logger.debug(f"n8n API: {method} {url}")
+        
+        logger.info(f"DirectClient requesting: {method} {url}")
+        
+        async def send() -> Dict[str, Any]:
+            client = await get_client_pool().get(self.instance_url, self.api_key)
+            response = await client.request(
+                method, url, headers=self.headers, **kwargs
+            )
+            response.raise_for_status()
+            logger.debug(f"n8n API response: {response.status_code}")
+            return response.json()
+        
+        template = endpoint_template(endpoint)
+        n8n_span = start_span(
+            f"n8n {method.upper()} {template}", category="n8n", kind=KIND_CLIENT,
+            **{"http.method": method.upper(), "http.url": url}
+        )
+        started = time.perf_counter()
+        error: Optional[BaseException] = None
+        try:
+            return await call_with_resilience(
+                self.upstream,
+                send,
+                idempotent=method.upper() in IDEMPOTENT_METHODS,
+                deadline=self.deadline
+            )
+        except httpx.HTTPStatusError as e:
+            error = e
+            logger.error(f"n8n API error {e.response.status_code}: {e.response.text[:200]}")
+            raise
+        except Exception as e:
+            error = e
+            logger.error(f"n8n API request failed: {e}", exc_info=True)
+            raise
+        finally:
+            N8N_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                method=method.upper(),
+                endpoint=template,
+                outcome=outcome_of(error)
+            )
+            finish(n8n_span, error)
     
-    async def list_workflows(self) -> List[Dict[str, Any]]:
-        """List all workflows."""
-        result = await self._request("GET", "/workflows")
-        return result.get("data", result) if isinstance(result, dict) else result
+    async def iter_workflow_pages(
+        self,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """Yield (workflows, next_cursor) page by page, following n8n's nextCursor.
+        
+        With `limit`, the last page is shrunk so the final cursor resumes exactly
+        after the last workflow returned.
+        """
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+        fetched = 0
+        while True:
+            size = page_size if limit is None else min(page_size, limit - fetched)
+            if size <= 0:
+                return
+            params: Dict[str, Any] = {"limit": size}
+            if cursor:
+                params["cursor"] = cursor
+            result = await self._request("GET", "/workflows", params=params)
+            if not isinstance(result, dict):
+                yield result, None
+                return
+            page = result.get("data", [])
+            cursor = result.get("nextCursor")
+            get_workflow_cache().observe_listing(self.cache_key, page)
+            fetched += len(page)
+            yield page, cursor
+            if not cursor or not page:
+                return
+    
+    async def iter_workflows(
+        self,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield workflows one at a time across all pages."""
+        async for page, _ in self.iter_workflow_pages(page_size, cursor, limit):
+            for workflow in page:
+                yield workflow
+    
+    async def list_workflows(self, page_size: int = DEFAULT_PAGE_SIZE) -> List[Dict[str, Any]]:
+        """List all workflows (every page)."""
+        return [workflow async for workflow in self.iter_workflows(page_size)]
     
-    async def get_workflow(self, workflow_id: str) -> Dict[str, Any]:
-        """Get a specific workflow."""
-        return await self._request("GET", f"/workflows/{workflow_id}")
+    async def get_workflow(self, workflow_id: str, use_cache: bool = True) -> Dict[str, Any]:
+        """Get a specific workflow.
+        
+        Served from the snapshot cache while it is known to match n8n's `updatedAt`.
+        """
+        cache = get_workflow_cache()
+        if use_cache:
+            cached = cache.get(self.cache_key, workflow_id)
+            if cached is not None:
+                logger.debug(f"Workflow {workflow_id} served from snapshot cache")
+                return cached
+        workflow = await self._request("GET", f"/workflows/{workflow_id}")
+        cache.store(self.cache_key, workflow)
+        return workflow
     
     async def create_workflow(self, name: str, nodes: List[Dict], connections: Dict) -> Dict[str, Any]:
         """Create a new workflow."""
@@ -72,7 +167,9 @@ class DirectN8nClient:
         logger.debug(f"Workflow payload: {json.dumps(workflow_data, indent=2)}")
         
         try:
-            return await self._request("POST", "/workflows", json=workflow_data)
+            created = await self._request("POST", "/workflows", json=workflow_data)
+            get_workflow_cache().store(self.cache_key, created)
+            return created
         except Exception as e:
             logger.error(f"Failed to create workflow: {e}")
             logger.error(f"Payload was: {json.dumps(workflow_data)}")
@@ -110,7 +207,44 @@ class DirectN8nClient:
             workflow_data["settings"] = current["settings"]
         
         logger.info(f"Updating workflow {workflow_id} with data: name={workflow_data.get('name')}, nodes={len(workflow_data.get('nodes', []))}")
-        return await self._request("PUT", f"/workflows/{workflow_id}", json=workflow_data)
+        return await self._put_workflow(workflow_id, workflow_data)
+    
+    async def patch_workflow(
+        self,
+        workflow_id: str,
+        operations: List[Dict[str, Any]],
+        expected_updated_at: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Apply node-level patch operations (see n8n_mcp.workflow_patch).
+        
+        The base is always re-read from n8n, never taken from the snapshot
+        cache: the whole workflow is PUT back, so a stale base would undo
+        edits made in the n8n editor since. With `expected_updated_at`,
+        WorkflowConflictError is raised if the workflow has changed since
+        that version.
+        """
+        base = await self.get_workflow(workflow_id, use_cache=False)
+        if expected_updated_at is not None and base.get("updatedAt") != expected_updated_at:
+            raise WorkflowConflictError(workflow_id, expected_updated_at, base.get("updatedAt"))
+        
+        patched = apply_workflow_patch(base, operations)
+        workflow_data = {
+            "name": patched.get("name", "Untitled"),
+            "nodes": patched["nodes"],
+            "connections": patched["connections"],
+            "settings": patched.get("settings", {})
+        }
+        logger.info(f"Patching workflow {workflow_id} with {len(operations)} operations")
+        return await self._put_workflow(workflow_id, workflow_data)
+    
+    async def _put_workflow(self, workflow_id: str, workflow_data: Dict[str, Any]) -> Dict[str, Any]:
+        """PUT a full workflow body and refresh its snapshot."""
+        # n8n's public API has no PATCH, so patches are sent as a full PUT too
+        cache = get_workflow_cache()
+        cache.invalidate(self.cache_key, workflow_id)
+        updated = await self._request("PUT", f"/workflows/{workflow_id}", json=workflow_data)
+        cache.store(self.cache_key, updated)
+        return updated
     
     async def execute_workflow(self, workflow_id: str, input_data: Optional[Dict] = None) -> Dict[str, Any]:
         """Execute a workflow."""
@@ -131,6 +265,30 @@ class DirectN8nClient:
             logger.warning(f"Execute endpoint failed, trying run endpoint: {e}")
             return await self._request("POST", f"/workflows/{workflow_id}/run", json=input_data or {})
     
+    async def iter_execution_pages(
+        self,
+        workflow_id: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None
+    ) -> AsyncIterator[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """Yield (executions, next_cursor) page by page, newest first."""
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+        while True:
+            params: Dict[str, Any] = {"limit": page_size}
+            if workflow_id:
+                params["workflowId"] = workflow_id
+            if cursor:
+                params["cursor"] = cursor
+            result = await self._request("GET", "/executions", params=params)
+            if not isinstance(result, dict):
+                yield result, None
+                return
+            page = result.get("data", [])
+            cursor = result.get("nextCursor")
+            yield page, cursor
+            if not cursor or not page:
+                return
+    
     async def list_executions(self, workflow_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """List execution history."""
         params = {}
@@ -139,6 +297,12 @@ class DirectN8nClient:
         result = await self._request("GET", "/executions", params=params)
         return result.get("data", result) if isinstance(result, dict) else result
     
+    async def get_execution(self, execution_id: str, include_data: bool = False) -> Dict[str, Any]:
+        """Get one execution; without `include_data` only its status and timestamps."""
+        return await self._request(
+            "GET", f"/executions/{execution_id}", params={"includeData": "true" if include_data else "false"}
+        )
+    
     async def check_connection(self) -> bool:
         """Check if n8n API is accessible."""
         try:
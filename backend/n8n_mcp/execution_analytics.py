@@ -0,0 +1,227 @@
+"""Per-workflow execution statistics over the local execution store.
+
+An instance's executions are loaded once into NumPy columns (workflow code,
+failed/finished flags, start time, duration) and kept until the store
+changes. Each summary is then a handful of vectorized passes: `bincount` for
+counts, failures and time buckets, and one sort by (workflow, duration) for
+the nearest-rank percentiles of every workflow at once.
+"""
+import math
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from n8n_mcp.execution_store import ExecutionStore
+
+FAILED_STATUSES = ("error", "crashed")
+PERCENTILES = (0.50, 0.95, 0.99)
+MAX_BUCKETS = 1000
+DEFAULT_BUCKET_SECONDS = 3600.0
+
+
+@dataclass
+class ExecutionColumns:
+    """One row per execution; `workflow` indexes into `workflow_ids`."""
+    workflow_ids: np.ndarray   # unique workflow ids (str objects)
+    workflow: np.ndarray       # int64 codes
+    finished: np.ndarray       # bool
+    failed: np.ndarray         # bool
+    started: np.ndarray        # float64 epoch seconds, NaN if unknown
+    duration: np.ndarray       # float64 milliseconds, NaN while running
+
+    def __len__(self) -> int:
+        return len(self.workflow)
+
+
+def build_columns(rows: List[Tuple[Any, ...]]) -> ExecutionColumns:
+    """Columns from ExecutionStore.columns() rows."""
+    if not rows:
+        empty = np.empty(0)
+        return ExecutionColumns(np.empty(0, dtype=object), np.empty(0, dtype=np.int64),
+                                empty.astype(bool), empty.astype(bool), empty, empty)
+    workflow, status, finished, started, duration = zip(*rows)
+    # Factorize with a dict; np.unique would sort the Python strings
+    index: Dict[str, int] = {}
+    codes = np.fromiter((index.setdefault(w or "", len(index)) for w in workflow), np.int64, count=len(rows))
+    return ExecutionColumns(
+        workflow_ids=np.array(list(index), dtype=object),
+        workflow=codes,
+        finished=np.array(finished, dtype=bool),
+        failed=np.fromiter((s in FAILED_STATUSES for s in status), bool, count=len(rows)),
+        started=np.array(started, dtype=np.float64),
+        duration=np.array(duration, dtype=np.float64),
+    )
+
+
+def grouped_percentiles(codes: np.ndarray, values: np.ndarray, groups: int, quantiles=PERCENTILES) -> np.ndarray:
+    """Nearest-rank quantiles of `values` per group code; shape (groups, len(quantiles)), NaN for empty groups."""
+    result = np.full((groups, len(quantiles)), np.nan)
+    if len(values) == 0:
+        return result
+    # Sort by value, then stably by group: a radix sort when the codes fit in
+    # 16 bits, several times faster than lexsort on both keys
+    by_value = np.argsort(values)
+    group_dtype = np.uint16 if groups <= np.iinfo(np.uint16).max else np.int64
+    ordered = values[by_value[np.argsort(codes[by_value].astype(group_dtype), kind="stable")]]
+    sizes = np.bincount(codes, minlength=groups)
+    starts = np.cumsum(sizes) - sizes
+    present = sizes > 0
+    for column, q in enumerate(quantiles):
+        rank = np.maximum(np.ceil(q * sizes).astype(np.int64), 1)
+        result[present, column] = ordered[(starts + rank - 1)[present]]
+    return result
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _number(value: float, digits: int = 1) -> Optional[float]:
+    return None if math.isnan(value) else round(float(value), digits)
+
+
+def _bucket_width(started: np.ndarray, since: Optional[float], until: Optional[float]) -> float:
+    """Smallest whole number of hours that covers the window in MAX_BUCKETS buckets."""
+    if not len(started) and (since is None or until is None):
+        return DEFAULT_BUCKET_SECONDS
+    first = since if since is not None else started.min()
+    last = until if until is not None else started.max()
+    # Two buckets of slack: the window start is floored to a bucket boundary
+    # and, without `until`, the last execution gets a bucket of its own
+    hours = math.ceil(max(last - first, 0.0) / (MAX_BUCKETS - 2) / DEFAULT_BUCKET_SECONDS)
+    return DEFAULT_BUCKET_SECONDS * max(hours, 1)
+
+
+def summarize_executions(
+    columns: ExecutionColumns,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    workflow_id: Optional[str] = None,
+    bucket_seconds: Optional[float] = None
+) -> Dict[str, Any]:
+    """Counts, failure rate, duration percentiles and time buckets per workflow.
+
+    `since` is inclusive and `until` exclusive, both on the start time. The
+    failure rate is over finished executions. Without `bucket_seconds`,
+    buckets are hourly, widened by whole hours until the window fits in
+    MAX_BUCKETS. Raises ValueError if an explicit `bucket_seconds` would need
+    more than MAX_BUCKETS buckets.
+    """
+    mask = ~np.isnan(columns.started)
+    if since is not None:
+        mask &= columns.started >= since
+    if until is not None:
+        mask &= columns.started < until
+    if workflow_id:
+        matches = np.flatnonzero(columns.workflow_ids == str(workflow_id))
+        mask &= columns.workflow == (matches[0] if len(matches) else -1)
+
+    codes = columns.workflow[mask]
+    started = columns.started[mask]
+    finished = columns.finished[mask]
+    failed = columns.failed[mask]
+    duration = columns.duration[mask]
+    groups = len(columns.workflow_ids)
+
+    explicit = bucket_seconds is not None
+    if not explicit:
+        bucket_seconds = _bucket_width(started, since, until)
+    if len(started):
+        start = math.floor((since if since is not None else started.min()) / bucket_seconds) * bucket_seconds
+        end = until if until is not None else started.max() + bucket_seconds
+    else:
+        start = since if since is not None else 0.0
+        end = until if until is not None else start
+    buckets = max(int(math.ceil((end - start) / bucket_seconds)), 1 if len(started) else 0)
+    if buckets > MAX_BUCKETS and explicit:
+        raise ValueError(f"{buckets} buckets of {bucket_seconds:g}s requested; at most {MAX_BUCKETS}")
+
+    executions = np.bincount(codes, minlength=groups)
+    finished_counts = np.bincount(codes[finished], minlength=groups)
+    failures = np.bincount(codes[failed], minlength=groups)
+    timed = finished & ~np.isnan(duration)
+    timed_codes, timed_durations = codes[timed], duration[timed]
+    timed_counts = np.bincount(timed_codes, minlength=groups)
+    percentiles = grouped_percentiles(timed_codes, timed_durations, groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.bincount(timed_codes, weights=timed_durations, minlength=groups) / timed_counts
+        failure_rates = failures / finished_counts
+
+    bucket_index = np.minimum(((started - start) // bucket_seconds).astype(np.int64), max(buckets - 1, 0))
+    flat = codes * buckets + bucket_index
+    histogram = np.bincount(flat, minlength=groups * buckets).reshape(groups, buckets)
+    failure_histogram = np.bincount(flat[failed], minlength=groups * buckets).reshape(groups, buckets)
+
+    overall = grouped_percentiles(np.zeros(len(timed_durations), dtype=np.int64), timed_durations, 1)[0]
+    total_finished = int(finished.sum())
+    workflows = []
+    for code in np.argsort(-executions, kind="stable"):
+        if executions[code] == 0:
+            break
+        workflows.append({
+            "workflow_id": columns.workflow_ids[code] or None,
+            "executions": int(executions[code]),
+            "finished": int(finished_counts[code]),
+            "failed": int(failures[code]),
+            "failure_rate": _number(failure_rates[code], 4),
+            "duration_ms": {
+                "p50": _number(percentiles[code, 0]),
+                "p95": _number(percentiles[code, 1]),
+                "p99": _number(percentiles[code, 2]),
+                "mean": _number(means[code]),
+            },
+            "buckets": {"executions": histogram[code].tolist(), "failed": failure_histogram[code].tolist()},
+        })
+
+    return {
+        "since": _iso(start) if buckets else None,
+        "until": _iso(start + buckets * bucket_seconds) if buckets else None,
+        "bucket_seconds": bucket_seconds,
+        "bucket_starts": [_iso(start + i * bucket_seconds) for i in range(buckets)],
+        "totals": {
+            "executions": int(len(codes)),
+            "finished": total_finished,
+            "failed": int(failed.sum()),
+            "failure_rate": round(int(failed.sum()) / total_finished, 4) if total_finished else None,
+            "duration_ms": {"p50": _number(overall[0]), "p95": _number(overall[1]), "p99": _number(overall[2])},
+        },
+        "workflows": workflows,
+    }
+
+
+class ExecutionAnalytics:
+    """Caches each instance's columns until the store reports a change."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._columns: Dict[str, Tuple[Any, ExecutionColumns]] = {}
+        self.loads = 0
+
+    def columns(self, store: ExecutionStore, instance: str) -> ExecutionColumns:
+        version = (id(store), store.version(instance))
+        with self._lock:
+            cached = self._columns.get(instance)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        columns = build_columns(store.columns(instance))
+        self.loads += 1
+        with self._lock:
+            self._columns[instance] = (version, columns)
+        return columns
+
+    def summary(self, store: ExecutionStore, instance: str, **filters: Any) -> Dict[str, Any]:
+        return summarize_executions(self.columns(store, instance), **filters)
+
+
+_analytics: Optional[ExecutionAnalytics] = None
+
+
+def get_execution_analytics() -> ExecutionAnalytics:
+    """Get singleton execution analytics."""
+    global _analytics
+    if _analytics is None:
+        _analytics = ExecutionAnalytics()
+    return _analytics
@@ -0,0 +1,397 @@
+"""Local SQLite mirror of n8n execution history.
+
+`/api/executions` is answered from here instead of proxying n8n's first page.
+Executions are synced per instance into one SQLite file (WAL mode), indexed by
+workflow, status and start time:
+
+- The first sync backfills the newest `backfill` executions. Later syncs walk
+  n8n's newest-first pages only until they reach the highest id already
+  stored, so a sync with nothing new costs one small request.
+- Executions stored while still running are re-read with `get_execution` until
+  they finish, at most `refresh_limit` per sync.
+- A background task re-syncs every instance used in the last `idle_seconds`
+  every `interval` seconds. Rows that started more than `retain_days` ago are
+  purged.
+"""
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from n8n_mcp.env import env_float, env_int
+from n8n_mcp.execution_watch import is_finished
+
+logger = logging.getLogger(__name__)
+
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    """Epoch seconds for an ISO 8601 timestamp (n8n's `...Z` format) or a number; None if unparseable."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _id_num(execution_id: Any) -> int:
+    """n8n execution ids are increasing integers (sent as strings)."""
+    try:
+        return int(execution_id)
+    except (TypeError, ValueError):
+        return 0
+
+
+class ExecutionStore:
+    """Executions of several n8n instances, keyed by (instance, id)."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._revisions: Dict[str, int] = {}
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS executions ("
+            " instance TEXT NOT NULL, id TEXT NOT NULL, id_num INTEGER NOT NULL,"
+            " workflow_id TEXT, status TEXT, mode TEXT, finished INTEGER NOT NULL,"
+            " started_ts REAL, stopped_ts REAL, duration_ms REAL, data TEXT NOT NULL,"
+            " PRIMARY KEY (instance, id));"
+            "CREATE INDEX IF NOT EXISTS executions_by_id ON executions (instance, id_num);"
+            "CREATE INDEX IF NOT EXISTS executions_by_workflow ON executions (instance, workflow_id, id_num);"
+            "CREATE INDEX IF NOT EXISTS executions_by_status ON executions (instance, status, id_num);"
+            "CREATE INDEX IF NOT EXISTS executions_by_start ON executions (instance, started_ts);"
+            "CREATE INDEX IF NOT EXISTS executions_unfinished ON executions (instance, id_num) WHERE finished = 0;"
+            "CREATE TABLE IF NOT EXISTS sync_state ("
+            " instance TEXT PRIMARY KEY, high_water INTEGER, last_synced REAL NOT NULL);"
+        )
+        self._conn.commit()
+
+    def _bump(self, instance: str) -> None:
+        self._revisions[instance] = self._revisions.get(instance, 0) + 1
+
+    def version(self, instance: str) -> Tuple[int, Optional[float]]:
+        """Changes whenever this process writes `instance`, or any process syncs it."""
+        return self._revisions.get(instance, 0), self.sync_state(instance)[1]
+
+    def upsert(self, instance: str, executions: Sequence[Dict[str, Any]]) -> int:
+        """Insert or replace executions as returned by n8n."""
+        rows = []
+        for execution in executions:
+            if not isinstance(execution, dict) or execution.get("id") is None:
+                continue
+            started = parse_timestamp(execution.get("startedAt"))
+            stopped = parse_timestamp(execution.get("stoppedAt"))
+            duration = (stopped - started) * 1000 if started is not None and stopped is not None else None
+            rows.append((
+                instance, str(execution["id"]), _id_num(execution["id"]),
+                str(execution["workflowId"]) if execution.get("workflowId") is not None else None,
+                execution.get("status"), execution.get("mode"), int(is_finished(execution)),
+                started, stopped, duration, json.dumps(execution, default=str)
+            ))
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO executions (instance, id, id_num, workflow_id, status, mode, finished,"
+                " started_ts, stopped_ts, duration_ms, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+            self._bump(instance)
+        return len(rows)
+
+    def delete(self, instance: str, execution_ids: Sequence[str]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM executions WHERE instance = ? AND id = ?", [(instance, i) for i in execution_ids]
+            )
+            self._conn.commit()
+            self._bump(instance)
+
+    def purge(self, instance: str, started_before: float) -> int:
+        """Drop executions that started before `started_before` (epoch seconds)."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM executions WHERE instance = ? AND started_ts < ?", (instance, started_before)
+            )
+            self._conn.commit()
+            if cursor.rowcount:
+                self._bump(instance)
+        return cursor.rowcount
+
+    def unfinished(self, instance: str, limit: int) -> List[str]:
+        """Ids of stored executions that were still running, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM executions WHERE instance = ? AND finished = 0 ORDER BY id_num DESC LIMIT ?",
+                (instance, limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def sync_state(self, instance: str) -> Tuple[Optional[int], Optional[float]]:
+        """(highest execution id seen, time of the last sync); both None before the first sync."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT high_water, last_synced FROM sync_state WHERE instance = ?", (instance,)
+            ).fetchone()
+        return (row[0], row[1]) if row else (None, None)
+
+    def mark_synced(self, instance: str, high_water: Optional[int]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (instance, high_water, last_synced) VALUES (?, ?, ?)",
+                (instance, high_water, time.time())
+            )
+            self._conn.commit()
+
+    def query(
+        self,
+        instance: str,
+        workflow_id: Optional[str] = None,
+        statuses: Optional[Sequence[str]] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Executions newest first, and the cursor for the next page (None on the last one).
+
+        `since` is inclusive and `until` exclusive, both on the start time.
+        Raises ValueError for a malformed cursor.
+        """
+        clauses = ["instance = ?"]
+        params: List[Any] = [instance]
+        if workflow_id:
+            clauses.append("workflow_id = ?")
+            params.append(str(workflow_id))
+        if statuses:
+            clauses.append(f"status IN ({', '.join('?' for _ in statuses)})")
+            params.extend(statuses)
+        if since is not None:
+            clauses.append("started_ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("started_ts < ?")
+            params.append(until)
+        if cursor:
+            clauses.append("id_num < ?")
+            params.append(int(cursor))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id_num, data FROM executions WHERE {' AND '.join(clauses)} ORDER BY id_num DESC LIMIT ?",
+                (*params, limit + 1)
+            ).fetchall()
+        next_cursor = str(rows[limit - 1][0]) if len(rows) > limit else None
+        return [json.loads(data) for _, data in rows[:limit]], next_cursor
+
+    def columns(self, instance: str) -> List[Tuple[Optional[str], Optional[str], int, Optional[float], Optional[float]]]:
+        """(workflow_id, status, finished, started_ts, duration_ms) of every stored execution, oldest first."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT workflow_id, status, finished, started_ts, duration_ms FROM executions"
+                " WHERE instance = ? ORDER BY started_ts", (instance,)
+            ).fetchall()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stored = self._conn.execute("SELECT COUNT(*) FROM executions").fetchone()[0]
+            instances = self._conn.execute("SELECT COUNT(*) FROM sync_state").fetchone()[0]
+        return {"stored_executions": stored, "synced_instances": instances}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ExecutionSync:
+    """Keeps an ExecutionStore in step with the n8n instances that use it.
+
+    `client` is anything with `iter_execution_pages()` yielding newest-first
+    (executions, next_cursor) pages and `get_execution(id)`: the direct n8n
+    client, or the MCP client with a single page.
+    """
+
+    def __init__(
+        self,
+        store: ExecutionStore,
+        interval: float = 30.0,
+        idle_seconds: float = 900.0,
+        backfill: int = 1000,
+        refresh_limit: int = 50,
+        retain_days: float = 30.0,
+        page_size: int = 100
+    ):
+        self.store = store
+        self.interval = interval
+        self.idle_seconds = idle_seconds
+        self.backfill = backfill
+        self.refresh_limit = refresh_limit
+        self.retain_days = retain_days
+        self.page_size = page_size
+        self.syncs = 0
+        self.fetched = 0
+        self._clients: Dict[str, Any] = {}
+        self._last_used: Dict[str, float] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        # Tasks from a previous event loop (tests, reloads) can never finish
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._running.clear()
+            self._task = None
+        return loop
+
+    async def ensure(self, instance: str, client: Any, fresh: bool = False) -> None:
+        """Register `instance` for background syncing and make its stored history usable.
+
+        Waits for a sync on first use, when the last sync is older than two
+        intervals (or the background task is disabled), and when `fresh`.
+        """
+        loop = self._bind_loop()
+        self._clients[instance] = client
+        self._last_used[instance] = time.monotonic()
+        if self.interval > 0 and (self._task is None or self._task.done()):
+            self._task = loop.create_task(self._run())
+        _, last_synced = await asyncio.to_thread(self.store.sync_state, instance)
+        if fresh or last_synced is None or self.interval <= 0 or time.time() - last_synced > 2 * self.interval:
+            await self.sync(instance)
+
+    async def sync(self, instance: str) -> int:
+        """Sync one registered instance now; concurrent callers share one sync. Returns new executions."""
+        loop = self._bind_loop()
+        task = self._running.get(instance)
+        if task is None or task.done():
+            task = loop.create_task(self._sync(instance, self._clients[instance]))
+            self._running[instance] = task
+        # A cancelled request must not cancel the sync others are waiting on
+        return await asyncio.shield(task)
+
+    async def _sync(self, instance: str, client: Any) -> int:
+        high_water, _ = await asyncio.to_thread(self.store.sync_state, instance)
+        new: List[Dict[str, Any]] = []
+        newest = high_water or 0
+        pages = client.iter_execution_pages(page_size=self.page_size)
+        try:
+            async for page, _ in pages:
+                reached = False
+                for execution in page:
+                    number = _id_num(execution.get("id"))
+                    if high_water is not None and number <= high_water:
+                        reached = True  # older pages hold nothing new
+                        continue
+                    new.append(execution)
+                    newest = max(newest, number)
+                if reached or (high_water is None and len(new) >= self.backfill):
+                    break
+        finally:
+            await pages.aclose()
+        if high_water is None:
+            new = new[:self.backfill]
+        # Writes and commits run in a worker thread, off the event loop
+        await asyncio.to_thread(self.store.upsert, instance, new)
+
+        fetched = {str(execution.get("id")) for execution in new}
+        unfinished = await asyncio.to_thread(self.store.unfinished, instance, self.refresh_limit)
+        stale = [i for i in unfinished if i not in fetched]
+        if stale:
+            results = await asyncio.gather(*(client.get_execution(i) for i in stale), return_exceptions=True)
+            gone = [i for i, result in zip(stale, results) if isinstance(result, Exception) and "404" in str(result)]
+            for i, result in zip(stale, results):
+                if isinstance(result, Exception) and i not in gone:
+                    logger.warning(f"Could not refresh execution {i}: {result}")
+            await asyncio.to_thread(self.store.upsert, instance, [r for r in results if isinstance(r, dict)])
+            if gone:
+                await asyncio.to_thread(self.store.delete, instance, gone)
+
+        if self.retain_days > 0:
+            await asyncio.to_thread(self.store.purge, instance, time.time() - self.retain_days * 86400)
+        await asyncio.to_thread(self.store.mark_synced, instance, newest or high_water)
+        self.syncs += 1
+        self.fetched += len(new)
+        logger.info(f"Execution sync: {len(new)} new, {len(stale)} refreshed")
+        return len(new)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            for instance in list(self._clients):
+                if now - self._last_used[instance] > self.idle_seconds:
+                    del self._clients[instance], self._last_used[instance]
+                    continue
+                try:
+                    await self.sync(instance)
+                except Exception as e:
+                    logger.warning(f"Background execution sync failed: {e}")
+            if not self._clients:
+                return  # nothing left to sync; the next request restarts the task
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.store.stats(),
+            "active_instances": len(self._clients),
+            "syncs": self.syncs,
+            "fetched": self.fetched,
+        }
+
+    async def close(self) -> None:
+        tasks = [t for t in [self._task, *self._running.values()] if t is not None and not t.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.store.close()
+
+
+_sync: Optional[ExecutionSync] = None
+
+
+def get_execution_sync() -> ExecutionSync:
+    """Get singleton execution sync.
+
+    The store lives in EXECUTION_DB_PATH. EXECUTION_SYNC_INTERVAL_SECONDS sets
+    the background sync period (0 syncs on every request instead),
+    EXECUTION_SYNC_IDLE_SECONDS when an unused instance stops being synced,
+    EXECUTION_SYNC_BACKFILL how many executions the first sync fetches and
+    EXECUTION_RETAIN_DAYS how long executions are kept.
+    """
+    global _sync
+    if _sync is None:
+        _sync = ExecutionSync(
+            ExecutionStore(os.getenv("EXECUTION_DB_PATH", os.path.join(".cache", "executions.sqlite3"))),
+            interval=env_float("EXECUTION_SYNC_INTERVAL_SECONDS", 30.0),
+            idle_seconds=env_float("EXECUTION_SYNC_IDLE_SECONDS", 900.0),
+            backfill=env_int("EXECUTION_SYNC_BACKFILL", 1000),
+            retain_days=env_float("EXECUTION_RETAIN_DAYS", 30.0),
+        )
+    return _sync
+
+
+async def close_execution_sync() -> None:
+    """Stop background syncing and close the store."""
+    global _sync
+    if _sync is not None:
+        await _sync.close()
+        _sync = None
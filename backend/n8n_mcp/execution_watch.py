@@ -0,0 +1,212 @@
+"""Shared status pollers for running executions.
+
+Everyone waiting on an execution - long-poll requests, SSE streams - subscribes
+to a single poller per (instance, execution id) instead of polling n8n
+themselves. The poller starts at `min_interval`, backs off towards
+`max_interval` while the status stays the same, drops back to the minimum when
+it changes, and stops once the execution has finished or nobody is watching.
+Finished results are kept for `retain_seconds`, so a late watcher gets them
+without another request.
+"""
+import asyncio
+import logging
+from typing import Optional, Dict, Any, AsyncIterator, Awaitable, Callable, Hashable, Tuple
+
+from n8n_mcp.env import env_float
+
+logger = logging.getLogger(__name__)
+
+Fetch = Callable[[], Awaitable[Dict[str, Any]]]
+
+TERMINAL_STATUSES = {"success", "error", "crashed", "canceled", "cancelled"}
+
+
+def is_finished(execution: Dict[str, Any]) -> bool:
+    """Whether an n8n execution has reached a final state ("waiting" is not final)."""
+    status = execution.get("status")
+    if status:
+        return status in TERMINAL_STATUSES
+    return bool(execution.get("finished") or execution.get("stoppedAt"))
+
+
+class ExecutionPoll:
+    """One upstream poller and the latest state it has seen."""
+
+    def __init__(self, fetch: Fetch, min_interval: float, max_interval: float, backoff: float, max_errors: int):
+        self.fetch = fetch
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.max_errors = max_errors
+        self.state: Optional[Dict[str, Any]] = None
+        self.error: Optional[Exception] = None
+        self.done = False
+        self.version = 0
+        self.watchers = 0
+        self.polls = 0
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    def _publish(self) -> None:
+        self.version += 1
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def run(self) -> None:
+        interval = self.min_interval
+        errors = 0
+        while True:
+            try:
+                execution = await self.fetch()
+                self.polls += 1
+                errors = 0
+            except Exception as e:
+                errors += 1
+                logger.warning(f"Execution poll failed ({errors}/{self.max_errors}): {e}")
+                if errors >= self.max_errors:
+                    self.error = e
+                    self.done = True
+                    self._publish()
+                    return
+                interval = min(interval * self.backoff, self.max_interval)
+            else:
+                changed = self.state is None or execution.get("status") != self.state.get("status")
+                self.state = execution
+                if is_finished(execution):
+                    self.done = True
+                    self._publish()
+                    return
+                if changed:
+                    interval = self.min_interval
+                    self._publish()
+                else:
+                    interval = min(interval * self.backoff, self.max_interval)
+
+            if self.watchers == 0:
+                return  # everyone left; a new watcher starts a new poller
+            await asyncio.sleep(interval)
+
+    async def wait_for_change(self, seen_version: int, timeout: float) -> bool:
+        """Wait until there is a state newer than `seen_version`; False on timeout."""
+        if self.version > seen_version:
+            return True
+        changed = self._changed
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+class ExecutionWatcher:
+    """Registry of shared execution pollers."""
+
+    def __init__(
+        self,
+        min_interval: float = 0.5,
+        max_interval: float = 5.0,
+        backoff: float = 1.5,
+        max_errors: int = 3,
+        retain_seconds: float = 30.0
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.max_errors = max_errors
+        self.retain_seconds = retain_seconds
+        self._polls: Dict[Hashable, ExecutionPoll] = {}
+
+    def _acquire(self, key: Hashable, fetch: Fetch) -> ExecutionPoll:
+        poll = self._polls.get(key)
+        if poll is None or (poll.task is not None and poll.task.done() and not poll.done):
+            poll = ExecutionPoll(fetch, self.min_interval, self.max_interval, self.backoff, self.max_errors)
+            poll.task = asyncio.get_running_loop().create_task(poll.run())
+            poll.task.add_done_callback(lambda _, key=key, poll=poll: self._poll_stopped(key, poll))
+            self._polls[key] = poll
+        poll.watchers += 1
+        return poll
+
+    def _poll_stopped(self, key: Hashable, poll: ExecutionPoll) -> None:
+        if self._polls.get(key) is not poll:
+            return
+        if poll.done and poll.error is None and self.retain_seconds > 0:
+            asyncio.get_running_loop().call_later(self.retain_seconds, self._forget, key, poll)
+        else:
+            self._forget(key, poll)
+
+    def _forget(self, key: Hashable, poll: ExecutionPoll) -> None:
+        if self._polls.get(key) is poll:
+            del self._polls[key]
+
+    async def wait(self, key: Hashable, fetch: Fetch, timeout: float) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Wait up to `timeout` seconds for the execution to finish.
+
+        Returns (latest state, finished). The state is None if the first poll
+        has not answered yet. Raises the poller's error if polling failed.
+        """
+        poll = self._acquire(key, fetch)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        try:
+            while not poll.done:
+                remaining = deadline - loop.time()
+                if remaining <= 0 or not await poll.wait_for_change(poll.version, remaining):
+                    break
+            if poll.error is not None:
+                raise poll.error
+            return poll.state, poll.done
+        finally:
+            poll.watchers -= 1
+
+    async def watch(
+        self, key: Hashable, fetch: Fetch, timeout: float, heartbeat: float = 15.0
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yield each new state until the execution finishes or `timeout` passes.
+
+        Yields None after `heartbeat` seconds without a change, so callers can
+        keep idle connections alive. Raises the poller's error if polling failed.
+        """
+        poll = self._acquire(key, fetch)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        seen = 0
+        try:
+            while True:
+                if poll.version > seen:
+                    seen = poll.version
+                    if poll.error is not None:
+                        raise poll.error
+                    yield poll.state
+                if poll.done:
+                    return
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return
+                if not await poll.wait_for_change(seen, min(heartbeat, remaining)) and loop.time() < deadline:
+                    yield None
+        finally:
+            poll.watchers -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        active = [p for p in self._polls.values() if not p.done]
+        return {
+            "active_polls": len(active),
+            "watchers": sum(p.watchers for p in self._polls.values()),
+            "retained_results": len(self._polls) - len(active),
+        }
+
+
+_watcher: Optional[ExecutionWatcher] = None
+
+
+def get_execution_watcher() -> ExecutionWatcher:
+    """Get singleton execution watcher."""
+    global _watcher
+    if _watcher is None:
+        _watcher = ExecutionWatcher(
+            min_interval=env_float("EXECUTION_POLL_MIN_SECONDS", 0.5),
+            max_interval=env_float("EXECUTION_POLL_MAX_SECONDS", 5.0),
+            backoff=env_float("EXECUTION_POLL_BACKOFF", 1.5),
+            retain_seconds=env_float("EXECUTION_RESULT_RETAIN_SECONDS", 30.0),
+        )
+    return _watcher
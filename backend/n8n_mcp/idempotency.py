@@ -0,0 +1,204 @@
+"""Idempotent workflow creation.
+
+A create that times out may still have happened upstream, so retrying it
+blindly makes a duplicate, and the model sometimes calls create_workflow twice
+with the same JSON. Each create therefore runs under a key: the caller's
+idempotency key, or else a canonical hash of name, nodes and connections.
+Outcomes are stored per n8n instance and API key in SQLite:
+
+- A replay of a completed key returns the stored result without calling n8n.
+- A request arriving while the same key is in flight in this process waits for
+  that call instead of starting its own.
+- Failed calls are not stored, so they can be retried. That includes calls
+  that return an error-shaped result (isError, success: false or an
+  "error" field) instead of raising; those raise IdempotentOperationFailed.
+- Reusing an explicit key with a different body raises IdempotencyConflict.
+
+Explicit keys are remembered for `key_ttl` seconds, content hashes only for
+`content_window`, so creating the same workflow again on purpose later still
+works.
+"""
+import os
+import json
+import time
+import asyncio
+import hashlib
+import sqlite3
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from n8n_mcp.cache import is_cacheable_result
+from n8n_mcp.env import env_float
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyConflict(Exception):
+    """An idempotency key was reused for a different request."""
+
+
+class IdempotentOperationFailed(Exception):
+    """The operation returned an error result; it was not stored."""
+
+    def __init__(self, result: Any):
+        self.result = result
+        if isinstance(result, dict):
+            message = result.get("error") or result.get("message") or result.get("text")
+        else:
+            message = None
+        super().__init__(str(message or result or "Operation returned no result"))
+
+
+def request_fingerprint(name: str, nodes: List[Dict[str, Any]], connections: Dict[str, Any]) -> str:
+    """Hash of a create request, independent of key order."""
+    canonical = json.dumps({"name": name, "nodes": nodes, "connections": connections},
+                           sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    """Stored outcomes keyed by (scope, key); scope is the n8n instance and API key."""
+
+    def __init__(self, db_path: str, key_ttl: float = 24 * 3600.0, content_window: float = 300.0):
+        self.db_path = db_path
+        self.key_ttl = key_ttl
+        self.content_window = content_window
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS outcomes ("
+            " scope TEXT NOT NULL, key TEXT NOT NULL, fingerprint TEXT NOT NULL,"
+            " result TEXT NOT NULL, created REAL NOT NULL, expires REAL NOT NULL,"
+            " PRIMARY KEY (scope, key));"
+            "CREATE INDEX IF NOT EXISTS outcomes_by_expiry ON outcomes (expires);"
+        )
+        self._conn.commit()
+        self._inflight: Dict[Tuple[str, str], Tuple[str, "asyncio.Task"]] = {}
+        self.stats = {"executed": 0, "replayed": 0, "coalesced": 0, "conflicts": 0}
+
+    def get(self, scope: str, key: str) -> Optional[Tuple[str, Any]]:
+        """(fingerprint, result) of an unexpired outcome, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint, result FROM outcomes WHERE scope = ? AND key = ? AND expires > ?",
+                (scope, key, time.time())
+            ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def put(self, scope: str, key: str, fingerprint: str, result: Any, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO outcomes (scope, key, fingerprint, result, created, expires)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (scope, key, fingerprint, json.dumps(result, default=str), now, now + ttl)
+            )
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM outcomes WHERE expires <= ?", (time.time(),))
+            self._conn.commit()
+            return cursor.rowcount
+
+    async def run(
+        self,
+        scope: str,
+        key: Optional[str],
+        fingerprint: str,
+        operation: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """Run `operation` once per key; returns (result, replayed)."""
+        ttl = self.key_ttl if key else self.content_window
+        if ttl <= 0:
+            self.stats["executed"] += 1
+            return await operation(), False
+        slot = (scope, f"key:{key}" if key else f"content:{fingerprint}")
+
+        inflight = self._inflight.get(slot)
+        if inflight is not None:
+            self._check(key, inflight[0], fingerprint)
+            self.stats["coalesced"] += 1
+            return (await asyncio.shield(inflight[1]))[0], True
+
+        # The stored-outcome lookup happens inside the task, so requests that
+        # arrive while it is off in a worker thread coalesce onto it too
+        task = asyncio.ensure_future(self._execute(slot, key, fingerprint, operation, ttl))
+        # Retrieve the exception even if every waiter was cancelled
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._inflight[slot] = (fingerprint, task)
+        # Shield so a caller that gives up does not abort the create for the others
+        return await asyncio.shield(task)
+
+    def _check(self, key: Optional[str], stored: str, fingerprint: str) -> None:
+        if stored != fingerprint:
+            self.stats["conflicts"] += 1
+            raise IdempotencyConflict(f"Idempotency key '{key}' was already used for a different request")
+
+    async def _execute(
+        self,
+        slot: Tuple[str, str],
+        key: Optional[str],
+        fingerprint: str,
+        operation: Callable[[], Awaitable[Any]],
+        ttl: float
+    ) -> Tuple[Any, bool]:
+        try:
+            # SQLite reads and commits run in a worker thread, off the event loop
+            stored = await asyncio.to_thread(self.get, *slot)
+            if stored is not None:
+                self._check(key, stored[0], fingerprint)
+                self.stats["replayed"] += 1
+                logger.info(f"Replaying stored outcome for {slot[1][:24]}")
+                return stored[1], True
+
+            self.stats["executed"] += 1
+            result = await operation()
+            if not is_cacheable_result(result):
+                raise IdempotentOperationFailed(result)
+            try:
+                await asyncio.to_thread(self.put, slot[0], slot[1], fingerprint, result, ttl)
+            except Exception as e:
+                logger.warning(f"Could not store idempotent outcome: {e}")
+            return result, False
+        finally:
+            self._inflight.pop(slot, None)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[IdempotencyStore] = None
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    """Get singleton idempotency store.
+
+    Outcomes live in IDEMPOTENCY_DB_PATH. IDEMPOTENCY_KEY_TTL_SECONDS sets how
+    long explicit keys are remembered and IDEMPOTENCY_CONTENT_WINDOW_SECONDS
+    the window for requests without one (0 turns content dedup off).
+    """
+    global _store
+    if _store is None:
+        _store = IdempotencyStore(
+            os.getenv("IDEMPOTENCY_DB_PATH", os.path.join(".cache", "idempotency.sqlite3")),
+            key_ttl=env_float("IDEMPOTENCY_KEY_TTL_SECONDS", 24 * 3600),
+            content_window=env_float("IDEMPOTENCY_CONTENT_WINDOW_SECONDS", 300),
+        )
+        _store.purge_expired()
+    return _store
+
+
+def close_idempotency_store() -> None:
+    """Close the store (on shutdown)."""
+    global _store
+    if _store is not None:
+        _store.close()
+        _store = None
@@ -1,23 +1,61 @@
 """n8n MCP Client using HTTP POST-based MCP protocol with session management."""
 import os
 import json
+import time
+import asyncio
+import inspect
 import logging
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Callable, Set, Tuple
 import httpx
+from n8n_mcp.cache import ToolResultCache, create_tool_cache_from_env, MISS
+from n8n_mcp.env import env_float
+from n8n_mcp.node_catalog import get_node_catalog, node_catalog_mode, merge_search_results
+from n8n_mcp.sse import SSEParser, SSEEvent, looks_like_sse
+from n8n_mcp.resilience import call_with_resilience, MCP_BREAKER
+from n8n_mcp.workflow_patch import WorkflowConflictError
+from observability.metrics import MCP_REQUEST_DURATION, outcome_of
+from observability.tracing import start_span, finish, KIND_CLIENT
 
 logger = logging.getLogger(__name__)
 
+# Receives the params of `notifications/progress` messages
+ProgressCallback = Callable[[Dict[str, Any]], Any]
+
+
+MCP_UPSTREAM = MCP_BREAKER
+
+# Tools that only read, so retrying them after a transient failure is safe
+IDEMPOTENT_TOOLS = {
+    "get_node", "search_nodes", "search_templates", "get_template", "tools_documentation",
+    "validate_workflow", "n8n_list_workflows", "n8n_get_workflow", "n8n_health_check",
+}
+
+
+def _is_idempotent_tool(tool_name: str, arguments: Optional[Dict[str, Any]]) -> bool:
+    if tool_name == "n8n_executions":
+        return (arguments or {}).get("action", "list") in ("list", "get")
+    return tool_name in IDEMPOTENT_TOOLS
+
+
+class _BatchRejected(Exception):
+    """The MCP server does not accept JSON-RPC batch requests."""
+
 
 class N8nMcpClient:
     """n8n MCP Client with proper session ID management."""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[ToolResultCache] = None):
         self.mcp_url = os.getenv("N8N_MCP_URL") or os.getenv("N8N_MCP_SERVER_URL") or "https://api.n8n-mcp.com/mcp"
         self.api_key = os.getenv("N8N_MCP_API_KEY", "")
+        # Overall budget per call, including retries
+        self.deadline = env_float("N8N_MCP_DEADLINE_SECONDS", 60.0)
         self._client: Optional[httpx.AsyncClient] = None
         self._request_id = 0
         self._initialized = False
         self._session_id: Optional[str] = None  # MCP session ID from server
+        self._batch_supported: Optional[bool] = None  # learned on first batch call
+        # Read-only tool results (node docs, searches, templates) are cached
+        self._cache: Optional[ToolResultCache] = cache if cache is not None else create_tool_cache_from_env()
     
     def _get_client(self) -> httpx.AsyncClient:
         """Get or create HTTP client."""
@@ -41,25 +79,30 @@ class N8nMcpClient:
         self._request_id += 1
         return self._request_id
 
-    async def _call_mcp(self, method: str, params: Dict = None) -> Any:
-        """Make an MCP JSON-RPC call with session management."""
-        client = self._get_client()
-        
-        payload = {
-            "jsonrpc": "2.0",
-            "id": self._next_id(),
-            "method": method,
-            "params": params or {}
-        }
+    async def _post_jsonrpc(
+        self,
+        payload: Any,
+        request_ids: Set[Any],
+        on_progress: Optional[ProgressCallback] = None
+    ) -> Dict[Any, Dict[str, Any]]:
+        """POST a JSON-RPC message (or batch) and collect the responses by id.
         
-        logger.debug(f"MCP call: {method}")
+        Event-stream responses are parsed incrementally as bytes arrive and reading
+        stops once every id in `request_ids` has been answered. Progress
+        notifications are passed to `on_progress` (sync or async callable).
+        Responses without an id (e.g. parse errors) are returned under None.
+        """
+        client = self._get_client()
+        responses: Dict[Any, Dict[str, Any]] = {}
         
-        try:
-            response = await client.post(
-                self.mcp_url, 
-                json=payload, 
-                headers=self._get_headers()
-            )
+        async with client.stream(
+            "POST",
+            self.mcp_url,
+            json=payload,
+            headers=self._get_headers()
+        ) as response:
+            if response.is_error:
+                await response.aread()
             response.raise_for_status()
             
             # Extract session ID from response headers
@@ -68,20 +111,99 @@ class N8nMcpClient:
                 self._session_id = session_id
                 logger.debug(f"Session ID updated: {session_id[:50]}...")
             
-            # Parse SSE response format: "event: message\ndata: {...}\n"
-            text = response.text.strip()
-            result = None
+            if "text/event-stream" in response.headers.get("content-type", ""):
+                parser = SSEParser()
+                async for chunk in response.aiter_bytes():
+                    await self._collect_sse_responses(parser.feed(chunk), responses, on_progress)
+                    if request_ids <= responses.keys():
+                        return responses
+                await self._collect_sse_responses(parser.flush(), responses, on_progress)
+                return responses
             
-            for line in text.split("\n"):
-                line = line.strip()
-                if line.startswith("data:"):
-                    json_str = line[5:].strip()
-                    if json_str:
-                        result = json.loads(json_str)
-                        break
+            body = await response.aread()
+        
+        if looks_like_sse(body):
+            parser = SSEParser()
+            await self._collect_sse_responses(parser.feed(body) + parser.flush(), responses, on_progress)
+        elif body.strip():
+            self._collect_message(json.loads(body), responses)
+        return responses
+
+    def _collect_message(self, message: Any, responses: Dict[Any, Dict[str, Any]]) -> Optional[str]:
+        """Store JSON-RPC responses (single or batch) by id; return a notification's method."""
+        if isinstance(message, list):
+            for item in message:
+                self._collect_message(item, responses)
+            return None
+        if not isinstance(message, dict):
+            return None
+        if "result" in message or "error" in message:
+            responses[message.get("id")] = message
+            return None
+        return message.get("method")
+
+    async def _collect_sse_responses(
+        self,
+        events: List[SSEEvent],
+        responses: Dict[Any, Dict[str, Any]],
+        on_progress: Optional[ProgressCallback]
+    ) -> None:
+        """Collect responses carried by SSE events and dispatch notifications."""
+        for event in events:
+            try:
+                message = event.json()
+            except json.JSONDecodeError:
+                logger.debug(f"Ignoring non-JSON SSE event: {event.data[:100]}")
+                continue
             
+            method = self._collect_message(message, responses)
+            if method == "notifications/progress":
+                logger.debug(f"MCP progress: {message.get('params')}")
+                if on_progress is not None:
+                    outcome = on_progress(message.get("params") or {})
+                    if inspect.isawaitable(outcome):
+                        await outcome
+            elif method:
+                logger.debug(f"MCP notification: {method}")
+
+    async def _call_mcp(
+        self,
+        method: str,
+        params: Dict = None,
+        on_progress: Optional[ProgressCallback] = None,
+        idempotent: bool = True
+    ) -> Any:
+        """Make an MCP JSON-RPC call with session management, retries and circuit breaking."""
+        request_id = self._next_id()
+        
+        params = dict(params or {})
+        if on_progress is not None:
+            # Ask the server to report progress against this request
+            params["_meta"] = {**params.get("_meta", {}), "progressToken": request_id}
+        
+        payload = {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "method": method,
+            "params": params
+        }
+        
+        logger.debug(f"MCP call: {method}")
+        
+        tool = params.get("name", "") if method == "tools/call" else ""
+        mcp_span = start_span(f"mcp {method} {tool}".rstrip(), category="mcp", kind=KIND_CLIENT, method=method, tool=tool)
+        started = time.perf_counter()
+        error: Optional[BaseException] = None
+        try:
+            responses = await call_with_resilience(
+                MCP_UPSTREAM,
+                lambda: self._post_jsonrpc(payload, {request_id}, on_progress),
+                idempotent=idempotent,
+                deadline=self.deadline
+            )
+            result = responses.get(request_id) or responses.get(None)
             if result is None:
-                result = json.loads(text) if text else {}
+                raise Exception(f"MCP stream ended without a response to {method}")
             
             if "error" in result:
                 logger.error(f"MCP error: {result['error']}")
@@ -89,11 +211,18 @@ class N8nMcpClient:
             
             return result.get("result")
         except httpx.HTTPStatusError as e:
+            error = e
             logger.error(f"HTTP {e.response.status_code}: {e.response.text[:200]}")
             raise
         except Exception as e:
+            error = e
             logger.error(f"MCP call failed: {e}")
             raise
+        finally:
+            MCP_REQUEST_DURATION.observe(
+                time.perf_counter() - started, method=method, tool=tool, outcome=outcome_of(error)
+            )
+            finish(mcp_span, error)
 
     async def initialize(self) -> bool:
         """Initialize the MCP connection and get session ID."""
@@ -138,7 +267,37 @@ class N8nMcpClient:
             logger.error(f"Failed to list tools: {e}")
             return []
 
-    async def call_tool(self, tool_name: str, arguments: Dict[str, Any] = None) -> Any:
+    async def call_tool(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any] = None,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> Any:
+        """Call an MCP tool, serving read-only tools from cache when possible."""
+        if self._cache is None or not self._cache.is_cacheable(tool_name):
+            return await self._call_tool_uncached(tool_name, arguments, on_progress)
+        
+        cached = await self._cache.get(tool_name, arguments)
+        if cached is not MISS:
+            logger.debug(f"MCP cache hit: {tool_name}")
+            return cached
+        
+        result = await self._call_tool_uncached(tool_name, arguments, on_progress)
+        await self._cache.set(tool_name, arguments, result)
+        return result
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the tool result cache."""
+        if self._cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._cache.stats()}
+
+    async def _call_tool_uncached(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any] = None,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> Any:
         """Call an MCP tool."""
         try:
             if not self._initialized:
@@ -151,39 +310,221 @@ class N8nMcpClient:
             result = await self._call_mcp("tools/call", {
                 "name": tool_name,
                 "arguments": arguments or {}
-            })
+            }, on_progress=on_progress, idempotent=_is_idempotent_tool(tool_name, arguments))
             
-            # Parse content from MCP response
-            if result and "content" in result:
-                contents = []
-                for item in result["content"]:
-                    if isinstance(item, dict) and "text" in item:
-                        contents.append(item["text"])
-                if contents:
+            return self._parse_tool_result(tool_name, result)
+        except Exception as e:
+            logger.error(f"Tool call failed ({tool_name}): {e}", exc_info=True)
+            raise
+
+    def _parse_tool_result(self, tool_name: str, result: Any) -> Any:
+        """Parse content from an MCP tools/call result.
+
+        Results the server flagged with isError keep the flag (as a dict), so
+        they are never cached.
+        """
+        parsed = self._parse_tool_content(tool_name, result)
+        if isinstance(result, dict) and result.get("isError"):
+            if not isinstance(parsed, dict):
+                parsed = {"text": parsed if isinstance(parsed, str) else json.dumps(parsed, default=str)}
+            return {**parsed, "isError": True}
+        return parsed
+
+    def _parse_tool_content(self, tool_name: str, result: Any) -> Any:
+        if result and "content" in result:
+            contents = []
+            for item in result["content"]:
+                if isinstance(item, dict) and "text" in item:
+                    contents.append(item["text"])
+            if contents:
+                try:
+                    parsed = json.loads(contents[0])
+                    logger.debug(f"Tool {tool_name} returned parsed JSON")
+                    return parsed
+                except json.JSONDecodeError:
+                    logger.debug(f"Tool {tool_name} returned text (not JSON)")
+                    return {"text": "\n".join(contents)}
+        
+        logger.debug(f"Tool {tool_name} returned raw result")
+        return result
+
+    async def call_tools_batch(
+        self,
+        calls: List[Tuple[str, Optional[Dict[str, Any]]]],
+        max_concurrency: int = 8
+    ) -> List[Dict[str, Any]]:
+        """Call several MCP tools in one round trip.
+        
+        Sends a JSON-RPC batch array; if the server rejects batches, falls back to
+        concurrent pipelined requests (and stops trying batches). Cached results
+        are served without touching the network. Returns one item per call, in
+        input order: {"name", "result"} on success or {"name", "error"}; a
+        failed batch request becomes an error on each of its items.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(calls)
+        pending: List[int] = []
+        for index, (tool_name, arguments) in enumerate(calls):
+            if self._cache is not None and self._cache.is_cacheable(tool_name):
+                cached = await self._cache.get(tool_name, arguments)
+                if cached is not MISS:
+                    results[index] = {"name": tool_name, "result": cached}
+                    continue
+            pending.append(index)
+        
+        if not pending:
+            return results
+        
+        if not self._initialized:
+            if not await self.initialize():
+                error = "MCP initialization failed - cannot call tools"
+                for index in pending:
+                    results[index] = {"name": calls[index][0], "error": error}
+                return results
+        
+        batched = False
+        if self._batch_supported is not False and len(pending) > 1:
+            try:
+                await self._send_tools_batch(calls, pending, results)
+                self._batch_supported = True
+                batched = True
+            except _BatchRejected as e:
+                logger.info(f"MCP server rejected JSON-RPC batch ({e}) - using concurrent requests")
+                self._batch_supported = False
+            except Exception as e:
+                # 5xx, transport error, timeout or open breaker: single calls would
+                # fail the same way, so report it per item and keep the cache hits
+                logger.warning(f"MCP batch call failed: {e}")
+                for index in pending:
+                    results[index] = {"name": calls[index][0], "error": str(e)}
+                batched = True
+        
+        if not batched:
+            semaphore = asyncio.Semaphore(max_concurrency)
+            
+            async def run_one(index: int) -> None:
+                tool_name, arguments = calls[index]
+                async with semaphore:
                     try:
-                        parsed = json.loads(contents[0])
-                        logger.debug(f"Tool {tool_name} returned parsed JSON")
-                        return parsed
-                    except json.JSONDecodeError:
-                        logger.debug(f"Tool {tool_name} returned text (not JSON)")
-                        return {"text": "\n".join(contents)}
+                        result = await self._call_tool_uncached(tool_name, arguments)
+                        results[index] = {"name": tool_name, "result": result}
+                    except Exception as e:
+                        results[index] = {"name": tool_name, "error": str(e)}
             
-            logger.debug(f"Tool {tool_name} returned raw result")
-            return result
+            await asyncio.gather(*(run_one(index) for index in pending))
+        
+        if self._cache is not None:
+            for index in pending:
+                item = results[index]
+                if "result" in item:
+                    await self._cache.set(item["name"], calls[index][1], item["result"])
+        return results
+
+    async def _send_tools_batch(
+        self,
+        calls: List[Tuple[str, Optional[Dict[str, Any]]]],
+        pending: List[int],
+        results: List[Optional[Dict[str, Any]]]
+    ) -> None:
+        """Send pending tool calls as one JSON-RPC batch and fill `results` by id."""
+        ids = {}
+        payload = []
+        for index in pending:
+            tool_name, arguments = calls[index]
+            request_id = self._next_id()
+            ids[request_id] = index
+            payload.append({
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "method": "tools/call",
+                "params": {"name": tool_name, "arguments": arguments or {}}
+            })
+        
+        logger.debug(f"MCP batch call: {len(payload)} tools")
+        idempotent = all(_is_idempotent_tool(calls[index][0], calls[index][1]) for index in pending)
+        batch_span = start_span("mcp batch", category="mcp", kind=KIND_CLIENT, calls=len(payload))
+        started = time.perf_counter()
+        error: Optional[BaseException] = None
+        try:
+            responses = await call_with_resilience(
+                MCP_UPSTREAM,
+                lambda: self._post_jsonrpc(payload, set(ids)),
+                idempotent=idempotent,
+                deadline=self.deadline
+            )
+        except httpx.HTTPStatusError as e:
+            error = e
+            if 400 <= e.response.status_code < 500 and e.response.status_code not in (401, 403, 429):
+                raise _BatchRejected(f"HTTP {e.response.status_code}")
+            raise
         except Exception as e:
-            logger.error(f"Tool call failed ({tool_name}): {e}", exc_info=True)
+            error = e
             raise
+        finally:
+            MCP_REQUEST_DURATION.observe(
+                time.perf_counter() - started, method="batch", tool="", outcome=outcome_of(error)
+            )
+            finish(batch_span, error)
+        
+        if not ids.keys() & responses.keys():
+            # A lone id-less error (e.g. "Invalid Request") means batches are unsupported
+            raise _BatchRejected(str(responses.get(None, {}).get("error", "no responses")))
+        
+        for request_id, index in ids.items():
+            tool_name = calls[index][0]
+            message = responses.get(request_id)
+            if message is None:
+                results[index] = {"name": tool_name, "error": "No response from MCP server"}
+            elif "error" in message:
+                error = message["error"]
+                results[index] = {
+                    "name": tool_name,
+                    "error": error.get("message", str(error)) if isinstance(error, dict) else str(error)
+                }
+            else:
+                results[index] = {"name": tool_name, "result": self._parse_tool_result(tool_name, message.get("result"))}
 
     # ========== Core MCP Tools ==========
 
-    async def search_nodes(self, query: str, source: str = None, include_examples: bool = False) -> Dict[str, Any]:
-        """Search n8n nodes."""
+    async def search_nodes(
+        self,
+        query: str,
+        source: str = None,
+        include_examples: bool = False,
+        limit: Optional[int] = None,
+        remote: bool = False
+    ) -> Dict[str, Any]:
+        """Search n8n nodes, answering from the local catalog when the query names a node.
+
+        Otherwise MCP is asked, and local matches the registry didn't return
+        are appended to its results.
+        """
+        local = None
+        # The local catalog has no examples or source filter - those always go remote
+        if not remote and not source and not include_examples:
+            catalog = get_node_catalog()
+            if catalog is not None:
+                local = catalog.search(query, limit=limit or 20)
+                if local["exact"] or node_catalog_mode() == "local":
+                    logger.debug(f"search_nodes '{query}' answered from local catalog")
+                    return local
+        
         args = {"query": query}
         if source:
             args["source"] = source
         if include_examples:
             args["includeExamples"] = True
-        return await self.call_tool("search_nodes", args)
+        if limit:
+            args["limit"] = limit
+        try:
+            result = await self.call_tool("search_nodes", args)
+        except Exception as e:
+            if not local or not local["results"]:
+                raise
+            logger.warning(f"search_nodes '{query}' failed remotely, using local catalog: {e}")
+            return local
+        if local and local["results"] and isinstance(result, dict) and isinstance(result.get("results"), list):
+            result = merge_search_results(result, local, limit or 20)
+        return result
 
     async def get_node(self, node_type: str, mode: str = "docs", detail: str = "standard") -> Dict[str, Any]:
         """Get node information."""
@@ -271,6 +612,29 @@ class N8nMcpClient:
         
         return await self.call_tool("n8n_update_workflow", tool_args)
 
+    async def patch_workflow(
+        self,
+        workflow_id: str,
+        operations: List[Dict[str, Any]],
+        expected_updated_at: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Apply node-level patch operations with n8n_update_partial_workflow.
+
+        With `expected_updated_at`, raises WorkflowConflictError if the workflow
+        has changed since that version.
+        """
+        if expected_updated_at is not None:
+            current = await self.get_workflow(workflow_id, mode="minimal")
+            if not current or "updatedAt" not in current:
+                current = await self.get_workflow(workflow_id)
+            actual = (current or {}).get("updatedAt")
+            if actual != expected_updated_at:
+                raise WorkflowConflictError(workflow_id, expected_updated_at, actual)
+        return await self.call_tool("n8n_update_partial_workflow", {
+            "id": workflow_id,
+            "operations": operations
+        })
+
     async def execute_workflow(self, workflow_id: str, input_data: Optional[Dict] = None) -> Dict[str, Any]:
         """Execute/test a workflow."""
         args = {"workflowId": workflow_id}
@@ -305,10 +669,23 @@ class N8nMcpClient:
             logger.warning(f"list_executions failed: {e}")
             return []
 
+    async def iter_execution_pages(self, workflow_id: Optional[str] = None, page_size: int = 100, cursor: Optional[str] = None):
+        """Yield (executions, None) once; the MCP tool has no cursor paging."""
+        yield await self.list_executions(workflow_id), None
+
+    async def get_execution(self, execution_id: str) -> Dict[str, Any]:
+        """Get one execution's status."""
+        result = await self.call_tool("n8n_executions", {"action": "get", "id": execution_id, "mode": "summary"})
+        if isinstance(result, dict) and "status" not in result and isinstance(result.get("data"), dict):
+            return result["data"]
+        return result
+
     async def close(self):
-        """Close HTTP client."""
+        """Close HTTP client and the tool cache."""
         if self._client:
             await self._client.aclose()
+        if self._cache is not None:
+            self._cache.close()
 
 
 # Singleton instance with lock for thread safety
@@ -0,0 +1,307 @@
+"""Local n8n node catalog with an in-memory inverted index.
+
+Answers `search_nodes` without a round trip to the MCP server. Nodes come from
+the bundled snapshot in `data/node_catalog.json` or an MCP dump file, and are
+ranked with BM25 over node type, display name, description and operations.
+Query terms that are not in the vocabulary are expanded by prefix, then by
+trigram similarity, so partial and misspelled queries still match.
+"""
+import os
+import re
+import json
+import math
+import bisect
+import logging
+from collections import defaultdict
+from typing import Optional, Dict, List, Any, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+BUNDLED_CATALOG_PATH = os.path.join(os.path.dirname(__file__), "data", "node_catalog.json")
+
+# Field weights for the BM25 term frequencies
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "displayName": 3.0,
+    "operations": 1.5,
+    "category": 1.0,
+    "description": 1.0,
+}
+BM25_K1 = 1.2
+BM25_B = 0.75
+PREFIX_PENALTY = 0.8
+FUZZY_MIN_SIMILARITY = 0.4
+# Shorter query terms ("a", "s3") never make a search exact
+EXACT_MIN_TERM_LENGTH = 3
+
+_TOKEN_RE = re.compile(r"[A-Za-z0-9]+")
+_CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens; camelCase words also yield their parts (httpRequest -> http, request)."""
+    tokens = []
+    for word in _TOKEN_RE.findall(text or ""):
+        lower = word.lower()
+        tokens.append(lower)
+        if any(c.isupper() for c in word[1:]):
+            tokens.extend(p.lower() for p in _CAMEL_RE.findall(word))
+    return tokens
+
+
+def _phrase(text: str) -> str:
+    """'Google Sheets' -> 'google sheets', for whole-name comparison."""
+    return " ".join(word.lower() for word in _TOKEN_RE.findall(text or ""))
+
+
+def _trigrams(term: str) -> set:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _short_type(node_type: str) -> str:
+    """'n8n-nodes-base.httpRequest' -> 'httpRequest'."""
+    return node_type.rsplit(".", 1)[-1]
+
+
+def _normalize_node(raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Normalize a node from a snapshot or MCP dump into the search_nodes result shape."""
+    workflow_type = raw.get("workflowNodeType") or raw.get("nodeType") or raw.get("type")
+    if not workflow_type:
+        return None
+    # MCP uses "nodes-base.x" internally and "n8n-nodes-base.x" in workflows
+    if workflow_type.startswith("nodes-base."):
+        workflow_type = f"n8n-{workflow_type}"
+    package = raw.get("package") or workflow_type.rsplit(".", 1)[0]
+
+    operations = []
+    for op in raw.get("operations") or []:
+        if isinstance(op, dict):
+            op = op.get("name") or op.get("action") or op.get("value") or ""
+        if op:
+            operations.append(str(op))
+
+    return {
+        "nodeType": workflow_type.replace("n8n-nodes-base.", "nodes-base.", 1),
+        "workflowNodeType": workflow_type,
+        "displayName": raw.get("displayName") or _short_type(workflow_type),
+        "description": raw.get("description") or "",
+        "category": raw.get("category") or "",
+        "package": package,
+        "operations": operations,
+    }
+
+
+class NodeCatalog:
+    """Inverted index over n8n node metadata with BM25 ranking and fuzzy matching."""
+
+    def __init__(self, nodes: Iterable[Dict[str, Any]]):
+        self.nodes: List[Dict[str, Any]] = []
+        seen = set()
+        for raw in nodes:
+            node = _normalize_node(raw)
+            if node and node["workflowNodeType"] not in seen:
+                seen.add(node["workflowNodeType"])
+                self.nodes.append(node)
+        self._build_index()
+
+    def _build_index(self) -> None:
+        self._postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        self._doc_lengths: List[float] = []
+        self._name_words: Dict[str, set] = defaultdict(set)
+        self._full_names = set()
+        for doc_id, node in enumerate(self.nodes):
+            fields = {
+                "name": _short_type(node["workflowNodeType"]),
+                "displayName": node["displayName"],
+                "operations": " ".join(node["operations"]),
+                "category": node["category"],
+                "description": node["description"],
+            }
+            for text in (fields["name"], fields["displayName"]):
+                self._full_names.add(_phrase(text))
+                for word in tokenize(text):
+                    self._name_words[word].add(doc_id)
+            weighted_tf: Dict[str, float] = defaultdict(float)
+            for field, text in fields.items():
+                for token in tokenize(text):
+                    weighted_tf[token] += FIELD_WEIGHTS[field]
+            self._doc_lengths.append(sum(weighted_tf.values()))
+            for term, tf in weighted_tf.items():
+                self._postings[term].append((doc_id, tf))
+
+        count = len(self.nodes)
+        self._avg_length = (sum(self._doc_lengths) / count) if count else 0.0
+        self._idf = {
+            term: math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+        self._vocabulary = sorted(self._postings)
+        self._trigram_index: Dict[str, List[str]] = defaultdict(list)
+        for term in self._vocabulary:
+            for gram in _trigrams(term):
+                self._trigram_index[gram].append(term)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def _prefix_terms(self, prefix: str, limit: int = 20) -> List[str]:
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        terms = []
+        for term in self._vocabulary[start:start + limit]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def _fuzzy_terms(self, term: str, limit: int = 5) -> List[Tuple[str, float]]:
+        grams = _trigrams(term)
+        overlap: Dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for candidate in self._trigram_index.get(gram, ()):
+                overlap[candidate] += 1
+        scored = []
+        for candidate, shared in overlap.items():
+            similarity = shared / (len(grams) + len(_trigrams(candidate)) - shared)
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                scored.append((candidate, similarity))
+        scored.sort(key=lambda item: -item[1])
+        return scored[:limit]
+
+    def _expand(self, term: str) -> List[Tuple[str, float]]:
+        """Index terms to score for a query term, with weights: exact, else prefixes, else fuzzy."""
+        if term in self._postings:
+            return [(term, 1.0)]
+        if len(term) >= 2:
+            prefixed = self._prefix_terms(term)
+            if prefixed:
+                return [(t, PREFIX_PENALTY) for t in prefixed]
+        if len(term) >= 3:
+            return self._fuzzy_terms(term)
+        return []
+
+    def _names_node(self, query: str, terms: List[str]) -> bool:
+        """Whether the query picks out one node: its full type or display name, or
+        words (of at least EXACT_MIN_TERM_LENGTH characters) that each appear in
+        the type or display name of exactly one node.
+
+        Prefixes and words shared by a family ("google", "email") don't count:
+        the snapshot only holds some of those nodes.
+        """
+        if _phrase(query) in self._full_names:
+            return True
+        terms = [t for t in terms if len(t) >= EXACT_MIN_TERM_LENGTH]
+        return bool(terms) and all(len(self._name_words.get(t, ())) == 1 for t in terms)
+
+    def search(self, query: str, limit: int = 20) -> Dict[str, Any]:
+        """Ranked search. `exact` is True when the query names a single node (see _names_node).
+
+        Anything else (a prefix, a word shared by several nodes, a match in a
+        description or a fuzzy one) can't tell whether the snapshot holds
+        every relevant node, so it is not exact.
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        terms = list(dict.fromkeys(tokenize(query)))
+        for term in terms:
+            for index_term, weight in self._expand(term):
+                idf = self._idf[index_term]
+                for doc_id, tf in self._postings[index_term]:
+                    norm = 1 - BM25_B + BM25_B * self._doc_lengths[doc_id] / (self._avg_length or 1)
+                    scores[doc_id] += weight * idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], self.nodes[item[0]]["displayName"]))
+        results = [
+            {**self.nodes[doc_id], "score": round(score, 4)}
+            for doc_id, score in ranked[:limit]
+        ]
+        return {
+            "query": query,
+            "results": results,
+            "totalCount": len(ranked),
+            "exact": bool(results) and self._names_node(query, terms),
+            "source": "local",
+        }
+
+    @classmethod
+    def from_file(cls, path: str) -> "NodeCatalog":
+        """Load a bundled snapshot or an MCP dump (a list of nodes, or {"nodes"|"results": [...]})."""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get("nodes") or data.get("results") or []
+        return cls(data)
+
+    def save(self, path: str) -> None:
+        """Write the catalog in the snapshot format."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "nodes": self.nodes}, f, indent=1)
+
+
+def merge_search_results(remote: Dict[str, Any], local: Dict[str, Any], limit: int) -> Dict[str, Any]:
+    """MCP's results first, then local matches it didn't return, up to `limit`."""
+    def key(node: Dict[str, Any]) -> Any:
+        normalized = _normalize_node(node) if isinstance(node, dict) else None
+        return normalized["workflowNodeType"] if normalized else id(node)
+
+    results = list(remote["results"])
+    seen = {key(node) for node in results}
+    added = 0
+    for node in local["results"]:
+        if len(results) >= limit:
+            break
+        if key(node) not in seen:
+            seen.add(key(node))
+            results.append(node)
+            added += 1
+    if not added:
+        return remote
+    total = remote.get("totalCount")
+    return {
+        **remote,
+        "results": results,
+        "totalCount": (total if isinstance(total, int) else len(remote["results"])) + added,
+        "source": "mcp+local",
+    }
+
+
+async def build_catalog_from_mcp(client, queries: Iterable[str]) -> NodeCatalog:
+    """Build a catalog by dumping remote `search_nodes` results for a set of queries."""
+    nodes = []
+    for query in queries:
+        try:
+            result = await client.search_nodes(query, remote=True)
+        except Exception as e:
+            logger.warning(f"Catalog dump: search for '{query}' failed: {e}")
+            continue
+        if isinstance(result, dict):
+            nodes.extend(result.get("results") or [])
+    return NodeCatalog(nodes)
+
+
+_catalog: Optional[NodeCatalog] = None
+
+
+def get_node_catalog() -> Optional[NodeCatalog]:
+    """Get the singleton catalog, or None if disabled or unavailable.
+
+    N8N_NODE_CATALOG=off disables local search; N8N_NODE_CATALOG_PATH points to
+    an MCP dump to use instead of the bundled snapshot.
+    """
+    global _catalog
+    if node_catalog_mode() == "off":
+        return None
+    if _catalog is None:
+        path = os.getenv("N8N_NODE_CATALOG_PATH") or BUNDLED_CATALOG_PATH
+        try:
+            _catalog = NodeCatalog.from_file(path)
+            logger.info(f"Loaded local node catalog with {len(_catalog)} nodes from {path}")
+        except Exception as e:
+            logger.warning(f"Local node catalog unavailable ({path}): {e}")
+            return None
+    return _catalog
+
+
+def node_catalog_mode() -> str:
+    """'auto' (local first, remote if nothing matches), 'local' (never remote) or 'off'."""
+    mode = os.getenv("N8N_NODE_CATALOG", "auto").lower()
+    return mode if mode in ("auto", "local", "off") else "auto"
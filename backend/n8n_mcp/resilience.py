@@ -0,0 +1,255 @@
+"""Retry, deadline and circuit breaker handling for upstream calls (MCP server, n8n instances).
+
+Every upstream gets a named `CircuitBreaker`. After `failure_threshold`
+consecutive failures the breaker opens and calls fail immediately with
+`CircuitOpenError` instead of waiting for a timeout; after `reset_timeout` one
+probe call is let through to decide whether to close it again.
+
+`call_with_resilience` retries idempotent calls on transient errors with
+jittered exponential backoff (honoring `Retry-After`), all within one overall
+deadline per call.
+"""
+import time
+import random
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Any, Callable, Awaitable, TypeVar, FrozenSet
+import httpx
+
+from n8n_mcp.env import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the upstream while its circuit breaker is open."""
+
+
+@dataclass
+class RetryPolicy:
+    """Jittered exponential backoff for transient failures."""
+    max_attempts: int = field(default_factory=lambda: env_int("UPSTREAM_RETRY_ATTEMPTS", 3))
+    base_delay: float = 0.25
+    max_delay: float = 8.0
+    retry_statuses: FrozenSet[int] = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+    def backoff(self, attempt: int) -> float:
+        """'Full jitter' delay before retry number `attempt` (1-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one upstream."""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.total_failures = 0
+        self.total_rejections = 0
+        self.last_used = time.monotonic()
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        """Whether a call may go through right now."""
+        self.last_used = time.monotonic()
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        self.total_rejections += 1
+        return False
+
+    def record_success(self) -> None:
+        if self.state != CLOSED:
+            logger.info(f"Circuit breaker '{self.name}' closed")
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self.total_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning(
+                    f"Circuit breaker '{self.name}' opened after {self.consecutive_failures} consecutive failures"
+                )
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def abandon_probe(self) -> None:
+        """A probe was cancelled before it finished - let the next call probe instead."""
+        if self.state == HALF_OPEN:
+            self._probe_in_flight = False
+
+    def retry_in(self) -> float:
+        """Seconds until an open breaker lets a probe through."""
+        if self.state != OPEN or self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "total_failures": self.total_failures,
+            "rejected_calls": self.total_rejections,
+            "retry_in_seconds": round(self.retry_in(), 1),
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+# Per-instance breakers are named "n8n:<url>"; they are dropped once idle
+N8N_BREAKER_PREFIX = "n8n:"
+MCP_BREAKER = "mcp"
+
+
+def _evict_idle_breakers() -> None:
+    idle_seconds = env_float("UPSTREAM_BREAKER_IDLE_SECONDS", 900.0)
+    now = time.monotonic()
+    for name in [n for n, b in _breakers.items()
+                 if n.startswith(N8N_BREAKER_PREFIX) and now - b.last_used > idle_seconds]:
+        del _breakers[name]
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Get (or create) the circuit breaker for an upstream."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        _evict_idle_breakers()
+        breaker = CircuitBreaker(
+            name,
+            failure_threshold=env_int("UPSTREAM_BREAKER_THRESHOLD", 5),
+            reset_timeout=env_float("UPSTREAM_BREAKER_RESET_SECONDS", 30.0),
+        )
+        _breakers[name] = breaker
+    return breaker
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Breaker state for the unauthenticated /health endpoint.
+
+    The MCP breaker is reported in full. n8n instances are users' own, so
+    their URLs are not listed; only how many breakers exist and are open.
+    """
+    _evict_idle_breakers()
+    n8n = [b for name, b in _breakers.items() if name.startswith(N8N_BREAKER_PREFIX)]
+    states = {"n8n": {"instances": len(n8n), "open": sum(1 for b in n8n if b.state == OPEN)}}
+    if MCP_BREAKER in _breakers:
+        states[MCP_BREAKER] = _breakers[MCP_BREAKER].snapshot()
+    return states
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code
+    return None
+
+
+def is_upstream_failure(exc: BaseException) -> bool:
+    """Errors that say the upstream is unhealthy (as opposed to a bad request)."""
+    if isinstance(exc, (httpx.TransportError, asyncio.TimeoutError)):
+        return True
+    status = _status_code(exc)
+    return status is not None and (status >= 500 or status == 429)
+
+
+def is_retryable(exc: BaseException, policy: RetryPolicy, idempotent: bool) -> bool:
+    """Whether another attempt could succeed and is safe to make."""
+    if isinstance(exc, httpx.ConnectError):
+        return True  # the request never reached the server, so even writes are safe
+    if not idempotent:
+        return False
+    if isinstance(exc, (httpx.TransportError, asyncio.TimeoutError)):
+        return True
+    status = _status_code(exc)
+    return status is not None and status in policy.retry_statuses
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) from a failed response."""
+    if not isinstance(exc, httpx.HTTPStatusError):
+        return None
+    value = exc.response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+async def call_with_resilience(
+    upstream: str,
+    call: Callable[[], Awaitable[T]],
+    *,
+    idempotent: bool,
+    deadline: float,
+    policy: Optional[RetryPolicy] = None
+) -> T:
+    """Run `call` through the upstream's circuit breaker, retrying transient failures.
+
+    `deadline` bounds the whole operation, including retries and backoff.
+    """
+    policy = policy or RetryPolicy()
+    breaker = get_breaker(upstream)
+    started = time.monotonic()
+    attempt = 0
+
+    while True:
+        if not breaker.allow():
+            raise CircuitOpenError(
+                f"{upstream} is unavailable (circuit open, retry in {breaker.retry_in():.0f}s)"
+            )
+        attempt += 1
+        remaining = deadline - (time.monotonic() - started)
+        try:
+            result = await asyncio.wait_for(call(), timeout=max(remaining, 0.001))
+        except asyncio.CancelledError:
+            breaker.abandon_probe()
+            raise
+        except Exception as exc:
+            if is_upstream_failure(exc):
+                breaker.record_failure()
+            else:
+                breaker.record_success()  # the upstream answered; the request was bad
+
+            if attempt >= policy.max_attempts or not is_retryable(exc, policy, idempotent):
+                raise
+            delay = retry_after_seconds(exc)
+            if delay is None:
+                delay = policy.backoff(attempt)
+            if time.monotonic() - started + delay >= deadline:
+                logger.warning(f"{upstream}: no deadline budget left for retry after {type(exc).__name__}")
+                raise
+            logger.warning(
+                f"{upstream}: attempt {attempt} failed ({type(exc).__name__}: {exc}), retrying in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+            continue
+
+        breaker.record_success()
+        return result
@@ -0,0 +1,115 @@
+"""Incremental Server-Sent Events parser for streamed MCP responses."""
+import re
+import json
+from dataclasses import dataclass
+from typing import Optional, List, Any
+
+_EOL = re.compile(rb"\r\n|\r|\n")
+
+
+@dataclass
+class SSEEvent:
+    """One dispatched SSE event."""
+    event: str = "message"
+    data: str = ""
+    id: Optional[str] = None
+    retry: Optional[int] = None
+
+    def json(self) -> Any:
+        return json.loads(self.data)
+
+
+class SSEParser:
+    """Parses an SSE byte stream as chunks arrive.
+
+    Follows the WHATWG event-stream rules: lines end in LF, CR or CRLF, a blank
+    line dispatches the event, multiple `data:` lines are joined with newlines
+    and lines starting with `:` are comments. Only the current partial line and
+    the current event's data are held in memory.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._scan_from = 0
+        self._data_lines: List[str] = []
+        self._event_type: Optional[str] = None
+        self._last_id: Optional[str] = None
+        self._retry: Optional[int] = None
+
+    def feed(self, chunk: bytes) -> List[SSEEvent]:
+        """Add bytes; return the events completed by them."""
+        buffer = self._buffer
+        buffer.extend(chunk)
+        events = []
+        start = 0
+        # The kept tail has no line break (bar a trailing CR), so don't rescan it
+        pos = self._scan_from
+        while True:
+            match = _EOL.search(buffer, pos)
+            if match is None:
+                break
+            if match.group() == b"\r" and match.end() == len(buffer):
+                break  # a CR at the end may be the first half of CRLF
+            event = self._process_line(buffer[start:match.start()].decode("utf-8", errors="replace"))
+            if event is not None:
+                events.append(event)
+            start = pos = match.end()
+        del buffer[:start]
+        self._scan_from = max(len(buffer) - 1, 0)
+        return events
+
+    def flush(self) -> List[SSEEvent]:
+        """End of stream: process any trailing line and dispatch a pending event."""
+        events = []
+        if self._buffer:
+            line = self._buffer.decode("utf-8", errors="replace").rstrip("\r")
+            self._buffer.clear()
+            self._scan_from = 0
+            event = self._process_line(line)
+            if event is not None:
+                events.append(event)
+        event = self._dispatch()
+        if event is not None:
+            events.append(event)
+        return events
+
+    def _process_line(self, line: str) -> Optional[SSEEvent]:
+        if line == "":
+            return self._dispatch()
+        if line.startswith(":"):
+            return None
+
+        field, sep, value = line.partition(":")
+        if sep and value.startswith(" "):
+            value = value[1:]
+        if field == "data":
+            self._data_lines.append(value)
+        elif field == "event":
+            self._event_type = value
+        elif field == "id":
+            if "\0" not in value:
+                self._last_id = value
+        elif field == "retry":
+            if value.isdigit():
+                self._retry = int(value)
+        return None
+
+    def _dispatch(self) -> Optional[SSEEvent]:
+        if not self._data_lines:
+            self._event_type = None
+            return None
+        event = SSEEvent(
+            event=self._event_type or "message",
+            data="\n".join(self._data_lines),
+            id=self._last_id,
+            retry=self._retry,
+        )
+        self._data_lines = []
+        self._event_type = None
+        return event
+
+
+def looks_like_sse(body: bytes) -> bool:
+    """Heuristic for servers that send an event stream without the right content type."""
+    head = body.lstrip()[:16]
+    return head.startswith((b"event:", b"data:", b"id:", b":"))
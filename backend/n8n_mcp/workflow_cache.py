@@ -0,0 +1,156 @@
+"""Per-instance snapshot cache for full workflow bodies.
+
+A snapshot is served without any request while it is younger than
+`fresh_ttl` (an agent turn often fetches the same workflow several times in a
+row). After that it is revalidated against the `updatedAt` timestamps seen in
+recent workflow listings, which the dashboard fetches anyway. Only when neither
+applies is the workflow fetched again. Our own create/update calls replace the
+snapshot.
+
+Everything is bounded by LRU: the instances tracked, the snapshots per
+instance and the listing index per instance (whose entries also lapse after
+`index_ttl`).
+"""
+import copy
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Iterable, Tuple
+
+from n8n_mcp.env import env_float, env_int
+
+InstanceKey = Tuple[str, str]
+
+
+@dataclass
+class WorkflowSnapshot:
+    body: Dict[str, Any]
+    updated_at: Optional[str]
+    fetched_at: float
+
+
+@dataclass
+class _InstanceCache:
+    snapshots: "OrderedDict[str, WorkflowSnapshot]" = field(default_factory=OrderedDict)
+    # workflow id -> (updatedAt, when it was seen), oldest sighting first
+    index: "OrderedDict[str, Tuple[Optional[str], float]]" = field(default_factory=OrderedDict)
+
+
+class WorkflowSnapshotCache:
+    """Workflow bodies per n8n instance, validated by `updatedAt`."""
+
+    def __init__(
+        self,
+        fresh_ttl: float = 10.0,
+        index_ttl: float = 60.0,
+        max_per_instance: int = 256,
+        max_index_per_instance: int = 5000,
+        max_instances: int = 64
+    ):
+        self.fresh_ttl = fresh_ttl
+        self.index_ttl = index_ttl
+        self.max_per_instance = max_per_instance
+        self.max_index_per_instance = max_index_per_instance
+        self.max_instances = max_instances
+        self._instances: "OrderedDict[InstanceKey, _InstanceCache]" = OrderedDict()
+        self.stats = {"fresh_hits": 0, "revalidated_hits": 0, "misses": 0}
+
+    def _instance(self, instance: InstanceKey, create: bool = False) -> Optional[_InstanceCache]:
+        """The instance's entry, marked as recently used; evicts the least recently used instances."""
+        entry = self._instances.get(instance)
+        if entry is None:
+            if not create:
+                return None
+            entry = self._instances[instance] = _InstanceCache()
+            while len(self._instances) > self.max_instances:
+                self._instances.popitem(last=False)
+        self._instances.move_to_end(instance)
+        return entry
+
+    def _see(self, entry: _InstanceCache, workflow_id: str, updated_at: Optional[str], now: float) -> None:
+        entry.index[workflow_id] = (updated_at, now)
+        entry.index.move_to_end(workflow_id)
+        # Sightings are kept in time order, so expired ones are at the front
+        while entry.index and (
+            len(entry.index) > self.max_index_per_instance
+            or now - next(iter(entry.index.values()))[1] > self.index_ttl
+        ):
+            entry.index.popitem(last=False)
+
+    def get(self, instance: InstanceKey, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """A copy of the cached workflow if it is still known to be current, else None."""
+        entry = self._instance(instance)
+        snapshot = entry.snapshots.get(str(workflow_id)) if entry else None
+        if snapshot is None:
+            self.stats["misses"] += 1
+            return None
+
+        now = time.monotonic()
+        if now - snapshot.fetched_at <= self.fresh_ttl:
+            self.stats["fresh_hits"] += 1
+        else:
+            seen = entry.index.get(str(workflow_id))
+            if seen is None or now - seen[1] > self.index_ttl or seen[0] != snapshot.updated_at:
+                self.stats["misses"] += 1
+                return None
+            self.stats["revalidated_hits"] += 1
+
+        entry.snapshots.move_to_end(str(workflow_id))
+        # Callers may modify what they get back
+        return copy.deepcopy(snapshot.body)
+
+    def store(self, instance: InstanceKey, workflow: Dict[str, Any]) -> None:
+        """Remember a full workflow body we just fetched or wrote."""
+        workflow_id = workflow.get("id") if isinstance(workflow, dict) else None
+        if not workflow_id:
+            return
+        entry = self._instance(instance, create=True)
+        now = time.monotonic()
+        entry.snapshots[str(workflow_id)] = WorkflowSnapshot(
+            body=copy.deepcopy(workflow),
+            updated_at=workflow.get("updatedAt"),
+            fetched_at=now
+        )
+        entry.snapshots.move_to_end(str(workflow_id))
+        while len(entry.snapshots) > self.max_per_instance:
+            entry.snapshots.popitem(last=False)
+        self._see(entry, str(workflow_id), workflow.get("updatedAt"), now)
+
+    def observe_listing(self, instance: InstanceKey, workflows: Iterable[Dict[str, Any]]) -> None:
+        """Record the `updatedAt` of workflows seen in a list response."""
+        entry = self._instance(instance, create=True)
+        now = time.monotonic()
+        for workflow in workflows:
+            if isinstance(workflow, dict) and workflow.get("id"):
+                self._see(entry, str(workflow["id"]), workflow.get("updatedAt"), now)
+
+    def invalidate(self, instance: InstanceKey, workflow_id: str) -> None:
+        entry = self._instances.get(instance)
+        if entry:
+            entry.snapshots.pop(str(workflow_id), None)
+            entry.index.pop(str(workflow_id), None)
+
+    def clear(self) -> None:
+        self._instances.clear()
+
+
+_cache: Optional[WorkflowSnapshotCache] = None
+
+
+def get_workflow_cache() -> WorkflowSnapshotCache:
+    """Get singleton workflow snapshot cache.
+
+    WORKFLOW_CACHE_SIZE bounds the snapshots per instance,
+    WORKFLOW_CACHE_INDEX_SIZE the listing entries per instance and
+    WORKFLOW_CACHE_INSTANCES the instances (n8n URL + API key) tracked.
+    """
+    global _cache
+    if _cache is None:
+        _cache = WorkflowSnapshotCache(
+            fresh_ttl=env_float("WORKFLOW_CACHE_FRESH_SECONDS", 10.0),
+            index_ttl=env_float("WORKFLOW_CACHE_INDEX_SECONDS", 60.0),
+            max_per_instance=env_int("WORKFLOW_CACHE_SIZE", 256),
+            max_index_per_instance=env_int("WORKFLOW_CACHE_INDEX_SIZE", 5000),
+            max_instances=env_int("WORKFLOW_CACHE_INSTANCES", 64),
+        )
+    return _cache
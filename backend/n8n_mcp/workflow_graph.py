@@ -0,0 +1,364 @@
+"""Indexed graph view of an n8n workflow's nodes and connections.
+
+n8n stores connections as nested dicts keyed by source node name, with one
+list per output of the source node (an If node has two, a Switch one per
+rule):
+
+    {"If": {"main": [[{"node": "Send", "type": "main", "index": 0}],   # output 0 (true)
+                     [{"node": "Log", "type": "main", "index": 0}]]}}   # output 1 (false)
+
+`WorkflowGraph` walks that structure once into numbered nodes and an edge
+list with per-node in/out edge indexes, so topological order, cycle detection,
+reachability and trigger/orphan checks are all linear in nodes + edges.
+`auto_connect` fills in connections the model left out, following branches
+and attaching AI sub-nodes to their agent.
+"""
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+MAIN = "main"
+
+STICKY_NOTE = "n8n-nodes-base.stickyNote"
+LANGCHAIN_PREFIX = "@n8n/n8n-nodes-langchain."
+
+# Triggers whose type name doesn't end in "Trigger"
+TRIGGER_TYPES = {
+    "n8n-nodes-base.webhook", "n8n-nodes-base.emailReadImap", "n8n-nodes-base.start",
+    "n8n-nodes-base.cron", "n8n-nodes-base.interval", "n8n-nodes-base.formTrigger",
+}
+
+# AI sub-nodes plug into an agent or chain through a typed connection
+SUB_NODE_CONNECTIONS = (
+    ("lm", "ai_languageModel"),
+    ("memory", "ai_memory"),
+    ("tool", "ai_tool"),
+    ("outputParser", "ai_outputParser"),
+    ("embeddings", "ai_embedding"),
+    ("document", "ai_document"),
+    ("textSplitter", "ai_textSplitter"),
+    ("retriever", "ai_retriever"),
+    ("vectorStore", "ai_vectorStore"),
+)
+
+
+class Edge(NamedTuple):
+    source: int
+    target: int
+    type: str = MAIN
+    output: int = 0   # output index on the source node
+    input: int = 0    # input index on the target node
+
+
+def _short_type(node: Dict[str, Any]) -> str:
+    return str(node.get("type") or "").rsplit(".", 1)[-1]
+
+
+def is_sticky_note(node: Dict[str, Any]) -> bool:
+    return node.get("type") == STICKY_NOTE
+
+
+def is_trigger(node: Dict[str, Any]) -> bool:
+    node_type = str(node.get("type") or "")
+    return node_type in TRIGGER_TYPES or node_type.lower().endswith("trigger")
+
+
+def sub_node_connection_type(node: Dict[str, Any]) -> Optional[str]:
+    """The ai_* connection type of an AI sub-node (model, memory, tool, ...), else None."""
+    if not str(node.get("type") or "").startswith(LANGCHAIN_PREFIX) or is_trigger(node):
+        return None
+    short = _short_type(node)
+    for prefix, connection_type in SUB_NODE_CONNECTIONS:
+        if short.startswith(prefix) and short[len(prefix):len(prefix) + 1].isupper():
+            return connection_type
+    return None
+
+
+def is_ai_root(node: Dict[str, Any]) -> bool:
+    """An agent or chain that sub-nodes attach to."""
+    node_type = str(node.get("type") or "")
+    return node_type.startswith(LANGCHAIN_PREFIX) and not is_trigger(node) and sub_node_connection_type(node) is None
+
+
+def branch_outputs(node: Dict[str, Any]) -> int:
+    """Number of main outputs that start separate branches (1 for ordinary nodes)."""
+    short = _short_type(node)
+    if short == "if":
+        return 2
+    if short == "switch":
+        rules = (node.get("parameters") or {}).get("rules") or {}
+        values = rules.get("values") or rules.get("rules") if isinstance(rules, dict) else None
+        return max(len(values) if isinstance(values, list) else 0, 2)
+    return 1
+
+
+def merge_inputs(node: Dict[str, Any]) -> int:
+    """Number of inputs of a Merge node, 0 for other nodes."""
+    if _short_type(node) != "merge":
+        return 0
+    try:
+        return max(int((node.get("parameters") or {}).get("numberInputs", 2)), 2)
+    except (TypeError, ValueError):
+        return 2
+
+
+class WorkflowGraph:
+    """Nodes numbered in list order, with edges indexed by source and target."""
+
+    def __init__(self, nodes: Iterable[Dict[str, Any]], connections: Optional[Dict[str, Any]] = None):
+        self.nodes: List[Dict[str, Any]] = [n for n in nodes or [] if isinstance(n, dict)]
+        self.names: List[Optional[str]] = [n.get("name") for n in self.nodes]
+        self.index: Dict[str, int] = {}
+        self.duplicate_names: List[str] = []
+        for i, name in enumerate(self.names):
+            if name in self.index:
+                self.duplicate_names.append(name)
+            elif name is not None:
+                self.index[name] = i
+        self.ids: Dict[str, int] = {n["id"]: i for i, n in enumerate(self.nodes) if n.get("id") is not None}
+
+        self.edges: List[Edge] = []
+        self.out_edges: List[List[int]] = [[] for _ in self.nodes]
+        self.in_edges: List[List[int]] = [[] for _ in self.nodes]
+        # (source name, target name) pairs that refer to nodes that don't exist
+        self.dangling: List[Tuple[Any, Any]] = []
+        # Source node names whose connection entries are not in n8n's format
+        self.malformed: List[Any] = []
+        for source_name, outputs in (connections or {}).items():
+            if not isinstance(outputs, dict):
+                self.malformed.append(source_name)
+                continue
+            source = self.index.get(source_name)
+            for connection_type, branches in outputs.items():
+                if not isinstance(branches, list):
+                    self.malformed.append(source_name)
+                    continue
+                for output, branch in enumerate(branches):
+                    if branch is None:
+                        continue  # n8n writes null for an unused output
+                    if not isinstance(branch, list):
+                        self.malformed.append(source_name)
+                        continue
+                    for link in branch:
+                        if not isinstance(link, dict) or not isinstance(link.get("node"), str):
+                            self.malformed.append(source_name)
+                            continue
+                        target = self.index.get(link.get("node"))
+                        if source is None or target is None:
+                            self.dangling.append((source_name, link.get("node")))
+                            continue
+                        self.add_edge(Edge(
+                            source, target, link.get("type") or connection_type, output, link.get("index") or 0
+                        ))
+
+    @classmethod
+    def from_workflow(cls, workflow: Dict[str, Any]) -> "WorkflowGraph":
+        return cls(workflow.get("nodes") or [], workflow.get("connections") or {})
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def add_edge(self, edge: Edge) -> None:
+        self.out_edges[edge.source].append(len(self.edges))
+        self.in_edges[edge.target].append(len(self.edges))
+        self.edges.append(edge)
+
+    def connect(self, source: int, target: int, connection_type: str = MAIN, output: int = 0, input: int = 0) -> None:
+        self.add_edge(Edge(source, target, connection_type, output, input))
+
+    # ---------- neighbourhood ----------
+
+    def successors(self, node: int, connection_type: Optional[str] = MAIN) -> List[int]:
+        """Targets of `node`'s edges of `connection_type` (None for any type)."""
+        return [self.edges[e].target for e in self.out_edges[node]
+                if connection_type is None or self.edges[e].type == connection_type]
+
+    def predecessors(self, node: int, connection_type: Optional[str] = MAIN) -> List[int]:
+        return [self.edges[e].source for e in self.in_edges[node]
+                if connection_type is None or self.edges[e].type == connection_type]
+
+    def outputs(self, node: int, connection_type: str = MAIN) -> Dict[int, List[int]]:
+        """Targets per output index, e.g. {0: [true branch], 1: [false branch]} for an If node."""
+        result: Dict[int, List[int]] = {}
+        for e in self.out_edges[node]:
+            edge = self.edges[e]
+            if edge.type == connection_type:
+                result.setdefault(edge.output, []).append(edge.target)
+        return result
+
+    # ---------- analysis ----------
+
+    def topological_order(self, connection_type: str = MAIN) -> List[int]:
+        """Nodes in dependency order (Kahn's algorithm; sources in list order).
+
+        Nodes on a cycle, and everything downstream of one, are left out;
+        compare the length with len(graph) to detect that.
+        """
+        indegree = [len(self.predecessors(i, connection_type)) for i in range(len(self.nodes))]
+        ready = deque(i for i, degree in enumerate(indegree) if degree == 0)
+        order: List[int] = []
+        while ready:
+            node = ready.popleft()
+            order.append(node)
+            for target in self.successors(node, connection_type):
+                indegree[target] -= 1
+                if indegree[target] == 0:
+                    ready.append(target)
+        return order
+
+    def cycles(self, connection_type: str = MAIN) -> List[List[int]]:
+        """Strongly connected components that form a loop (Tarjan's algorithm, iterative)."""
+        count = len(self.nodes)
+        index = [-1] * count
+        low = [0] * count
+        on_stack = [False] * count
+        stack: List[int] = []
+        found: List[List[int]] = []
+        counter = 0
+        for root in range(count):
+            if index[root] != -1:
+                continue
+            work = [(root, iter(self.successors(root, connection_type)))]
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            while work:
+                node, children = work[-1]
+                advanced = False
+                for child in children:
+                    if index[child] == -1:
+                        index[child] = low[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack[child] = True
+                        work.append((child, iter(self.successors(child, connection_type))))
+                        advanced = True
+                        break
+                    if on_stack[child]:
+                        low[node] = min(low[node], index[child])
+                if advanced:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in self.successors(node, connection_type):
+                        found.append(sorted(component))
+        return found
+
+    def reachable(self, starts: Iterable[int], connection_type: Optional[str] = MAIN) -> Set[int]:
+        """Nodes reachable from `starts` (included) along edges of `connection_type`."""
+        seen = set(starts)
+        frontier = list(seen)
+        while frontier:
+            node = frontier.pop()
+            for target in self.successors(node, connection_type):
+                if target not in seen:
+                    seen.add(target)
+                    frontier.append(target)
+        return seen
+
+    def triggers(self) -> List[int]:
+        return [i for i, node in enumerate(self.nodes) if is_trigger(node)]
+
+    def orphans(self) -> List[int]:
+        """Nodes with no connections at all in a workflow of more than one node (sticky notes aside)."""
+        flow = [i for i, node in enumerate(self.nodes) if not is_sticky_note(node)]
+        if len(flow) < 2:
+            return []
+        return [i for i in flow if not self.in_edges[i] and not self.out_edges[i]]
+
+    def unreachable(self) -> List[int]:
+        """Flow nodes no trigger leads to; empty when the workflow has no trigger."""
+        triggers = self.triggers()
+        if not triggers:
+            return []
+        reached = self.reachable(triggers)
+        # An AI sub-node counts as reached when the node it plugs into is
+        for i, node in enumerate(self.nodes):
+            if i not in reached and sub_node_connection_type(node) and any(t in reached for t in self.successors(i, None)):
+                reached.add(i)
+        return [i for i, node in enumerate(self.nodes) if i not in reached and not is_sticky_note(node)]
+
+    def name_of(self, nodes: Iterable[int]) -> List[Optional[str]]:
+        return [self.names[i] for i in nodes]
+
+    # ---------- output ----------
+
+    def to_connections(self) -> Dict[str, Any]:
+        """The edges in n8n's nested connections format."""
+        connections: Dict[str, Any] = {}
+        for edge in self.edges:
+            branches = connections.setdefault(self.names[edge.source], {}).setdefault(edge.type, [])
+            while len(branches) <= edge.output:
+                branches.append([])
+            branches[edge.output].append({"node": self.names[edge.target], "type": edge.type, "index": edge.input})
+        return connections
+
+
+def auto_connect(nodes: List[Dict[str, Any]], connections: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Fill in the connections of nodes the model left unconnected, in list order.
+
+    Existing connections between known nodes are kept. A flow node with no
+    incoming main connection is wired to the open output before it:
+
+    - after an If or Switch node, the following nodes take its outputs in turn
+      (true, false, ...), each starting a branch;
+    - a Merge node joins the most recent open branches on its inputs;
+    - any other node continues the most recent branch.
+
+    AI sub-nodes (models, memory, tools, parsers, ...) are attached to the
+    nearest agent or chain node, preceding ones first, with their ai_* type.
+    """
+    graph = WorkflowGraph(nodes, connections)
+    tails: List[Tuple[int, int]] = []     # open (node, output) ends of branches
+    pending: List[Tuple[int, int]] = []   # outputs of the last If/Switch not yet used
+    roots = [i for i, node in enumerate(graph.nodes) if is_ai_root(node)]
+    sub_nodes: List[Tuple[int, str]] = []
+
+    for i, node in enumerate(graph.nodes):
+        if is_sticky_note(node) or graph.names[i] is None:
+            continue
+        connection_type = sub_node_connection_type(node)
+        if connection_type:
+            sub_nodes.append((i, connection_type))
+            continue
+
+        if not is_trigger(node) and not graph.predecessors(i):
+            inputs = merge_inputs(node)
+            if inputs and len(tails) > 1:
+                joined, tails = tails[-inputs:], tails[:-inputs]
+                for input_index, (source, output) in enumerate(joined):
+                    graph.connect(source, i, MAIN, output, input_index)
+            elif pending:
+                source, output = pending.pop(0)
+                graph.connect(source, i, MAIN, output)
+            elif tails:
+                source, output = tails.pop()
+                graph.connect(source, i, MAIN, output)
+
+        if graph.successors(i):
+            continue  # already wired onwards by the model
+        outputs = branch_outputs(node)
+        if outputs > 1:
+            pending = [(i, output) for output in range(outputs)]
+        else:
+            tails.append((i, 0))
+
+    for i, connection_type in sub_nodes:
+        if graph.out_edges[i] or not roots:
+            continue
+        position = bisect_left(roots, i)
+        root = roots[position - 1] if position else roots[0]
+        graph.connect(i, root, connection_type)
+
+    return graph.to_connections()
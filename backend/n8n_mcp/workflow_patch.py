@@ -0,0 +1,214 @@
+"""Node-level patch operations for n8n workflows.
+
+The operation format is the one n8n-mcp's `n8n_update_partial_workflow` tool
+accepts, so the same list can be applied locally (direct n8n client) or sent to
+the MCP server as is:
+
+    {"type": "addNode", "node": {...}}
+    {"type": "removeNode", "nodeName": "HTTP Request"}
+    {"type": "updateNode", "nodeName": "HTTP Request", "updates": {"parameters.url": "https://..."}}
+    {"type": "renameNode", "nodeName": "HTTP Request", "newName": "Fetch Leads"}
+    {"type": "moveNode", "nodeName": "Set", "position": [400, 300]}
+    {"type": "enableNode" | "disableNode", "nodeName": "Set"}
+    {"type": "addConnection", "source": "Webhook", "target": "Set"}
+    {"type": "removeConnection", "source": "Webhook", "target": "Set"}
+    {"type": "updateName", "name": "New workflow name"}
+    {"type": "updateSettings", "settings": {"timezone": "UTC"}}
+
+Nodes are addressed by `nodeName` or `nodeId`. Connections take optional
+`sourceOutput`/`targetInput` (default "main") and `sourceIndex`/`targetIndex`
+(default 0).
+"""
+import copy
+from typing import Optional, Dict, List, Any
+
+
+class WorkflowPatchError(ValueError):
+    """An operation is malformed or refers to something that does not exist."""
+
+
+class WorkflowConflictError(Exception):
+    """The workflow changed since the version the patch was based on."""
+
+    def __init__(self, workflow_id: str, expected: Optional[str], actual: Optional[str]):
+        super().__init__(
+            f"Workflow {workflow_id} was modified (expected updatedAt {expected}, found {actual})"
+        )
+        self.workflow_id = workflow_id
+        self.expected = expected
+        self.actual = actual
+
+
+def _find_node(workflow: Dict[str, Any], op: Dict[str, Any]) -> Dict[str, Any]:
+    node_id = op.get("nodeId")
+    node_name = op.get("nodeName")
+    if node_id is None and node_name is None:
+        raise WorkflowPatchError(f"{op.get('type')}: nodeName or nodeId is required")
+    for node in workflow["nodes"]:
+        if (node_id is not None and node.get("id") == node_id) or (node_name is not None and node.get("name") == node_name):
+            return node
+    raise WorkflowPatchError(f"{op.get('type')}: node {node_name or node_id!r} not found")
+
+
+def _node_names(workflow: Dict[str, Any]) -> set:
+    return {node.get("name") for node in workflow["nodes"]}
+
+
+def _set_path(target: Dict[str, Any], path: str, value: Any) -> None:
+    """Set a dot-separated path, creating intermediate objects."""
+    keys = path.split(".")
+    for key in keys[:-1]:
+        child = target.get(key)
+        if not isinstance(child, dict):
+            child = target[key] = {}
+        target = child
+    target[keys[-1]] = value
+
+
+def _rename_in_connections(connections: Dict[str, Any], old: str, new: str) -> None:
+    if old in connections:
+        connections[new] = connections.pop(old)
+    for outputs in connections.values():
+        for branches in outputs.values():
+            for branch in branches or []:
+                for link in branch or []:
+                    if link.get("node") == old:
+                        link["node"] = new
+
+
+def _drop_node_connections(connections: Dict[str, Any], name: str) -> None:
+    connections.pop(name, None)
+    for outputs in connections.values():
+        for branches in outputs.values():
+            for i, branch in enumerate(branches or []):
+                branches[i] = [link for link in branch or [] if link.get("node") != name]
+
+
+def _rename_node(workflow: Dict[str, Any], node: Dict[str, Any], new_name: str) -> None:
+    old_name = node.get("name")
+    if new_name == old_name:
+        return
+    if new_name in _node_names(workflow):
+        raise WorkflowPatchError(f"renameNode: a node named {new_name!r} already exists")
+    node["name"] = new_name
+    _rename_in_connections(workflow["connections"], old_name, new_name)
+
+
+def _connection_args(op: Dict[str, Any], workflow: Dict[str, Any]):
+    source, target = op.get("source"), op.get("target")
+    if not source or not target:
+        raise WorkflowPatchError(f"{op['type']}: source and target are required")
+    names = _node_names(workflow)
+    for name in (source, target):
+        if name not in names:
+            raise WorkflowPatchError(f"{op['type']}: node {name!r} not found")
+    indexes = []
+    for field in ("sourceIndex", "targetIndex"):
+        try:
+            index = int(op.get(field, 0))
+        except (TypeError, ValueError):
+            index = -1
+        if index < 0:
+            raise WorkflowPatchError(f"{op['type']}: {field} must be a non-negative integer, got {op.get(field)!r}")
+        indexes.append(index)
+    return (
+        source,
+        target,
+        op.get("sourceOutput", "main"),
+        op.get("targetInput", "main"),
+        *indexes,
+    )
+
+
+def _apply(workflow: Dict[str, Any], op: Dict[str, Any]) -> None:
+    kind = op.get("type")
+
+    if kind == "addNode":
+        node = op.get("node")
+        if not isinstance(node, dict) or not node.get("name") or not node.get("type"):
+            raise WorkflowPatchError("addNode: node with name and type is required")
+        if node["name"] in _node_names(workflow):
+            raise WorkflowPatchError(f"addNode: a node named {node['name']!r} already exists")
+        workflow["nodes"].append(copy.deepcopy(node))
+
+    elif kind == "removeNode":
+        node = _find_node(workflow, op)
+        workflow["nodes"].remove(node)
+        _drop_node_connections(workflow["connections"], node.get("name"))
+
+    elif kind == "updateNode":
+        node = _find_node(workflow, op)
+        updates = op.get("updates")
+        if not isinstance(updates, dict):
+            raise WorkflowPatchError("updateNode: updates object is required")
+        for path, value in updates.items():
+            if path == "name":
+                _rename_node(workflow, node, value)
+            else:
+                _set_path(node, path, copy.deepcopy(value))
+
+    elif kind == "renameNode":
+        if not op.get("newName"):
+            raise WorkflowPatchError("renameNode: newName is required")
+        _rename_node(workflow, _find_node(workflow, op), op["newName"])
+
+    elif kind == "moveNode":
+        _find_node(workflow, op)["position"] = list(op.get("position", [0, 0]))
+
+    elif kind in ("enableNode", "disableNode"):
+        node = _find_node(workflow, op)
+        if kind == "disableNode":
+            node["disabled"] = True
+        else:
+            node.pop("disabled", None)
+
+    elif kind == "addConnection":
+        source, target, output, input_type, source_index, target_index = _connection_args(op, workflow)
+        branches = workflow["connections"].setdefault(source, {}).setdefault(output, [])
+        while len(branches) <= source_index:
+            branches.append([])
+        link = {"node": target, "type": input_type, "index": target_index}
+        if link not in branches[source_index]:
+            branches[source_index].append(link)
+
+    elif kind == "removeConnection":
+        source, target, output, input_type, source_index, target_index = _connection_args(op, workflow)
+        branches = workflow["connections"].get(source, {}).get(output, [])
+        link = {"node": target, "type": input_type, "index": target_index}
+        if source_index >= len(branches) or link not in branches[source_index]:
+            if not op.get("ignoreErrors"):
+                raise WorkflowPatchError(f"removeConnection: no connection {source!r} -> {target!r}")
+            return
+        branches[source_index].remove(link)
+
+    elif kind == "updateName":
+        if not op.get("name"):
+            raise WorkflowPatchError("updateName: name is required")
+        workflow["name"] = op["name"]
+
+    elif kind == "updateSettings":
+        workflow.setdefault("settings", {}).update(op.get("settings") or {})
+
+    else:
+        raise WorkflowPatchError(f"Unknown patch operation type: {kind!r}")
+
+
+def apply_workflow_patch(workflow: Dict[str, Any], operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Apply `operations` in order to a copy of `workflow`.
+
+    Either every operation applies or `WorkflowPatchError` is raised and
+    nothing is returned; the input is never modified.
+    """
+    if not isinstance(operations, list):
+        raise WorkflowPatchError("operations must be a list")
+    patched = copy.deepcopy(workflow)
+    patched.setdefault("nodes", [])
+    patched.setdefault("connections", {})
+    for index, op in enumerate(operations):
+        if not isinstance(op, dict):
+            raise WorkflowPatchError(f"Operation {index} is not an object")
+        try:
+            _apply(patched, op)
+        except WorkflowPatchError as e:
+            raise WorkflowPatchError(f"Operation {index}: {e}") from None
+    return patched
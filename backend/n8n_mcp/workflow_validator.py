@@ -0,0 +1,176 @@
+"""Local workflow checks in front of the MCP `validate_workflow` tool.
+
+Structural problems (a node missing its id, typeVersion or position, a
+connection to a node that doesn't exist, two nodes with the same name) are
+caught here in one pass over the nodes and the compiled WorkflowGraph,
+without a round trip to n8n-mcp. Only workflows that pass go to the remote
+validator. Results are cached by a canonical hash of the workflow's content,
+so validating the same JSON again, which the agent does often within a turn,
+costs a hash.
+"""
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from n8n_mcp.cache import SingleFlightCache
+from n8n_mcp.env import env_float, env_int
+from n8n_mcp.workflow_graph import WorkflowGraph, is_sticky_note
+
+ERROR = "error"
+WARNING = "warning"
+
+# Field -> accepted types, for every node n8n will store
+REQUIRED_NODE_FIELDS = {
+    "id": (str,),
+    "name": (str,),
+    "type": (str,),
+    "typeVersion": (int, float),
+    "position": (list,),
+}
+
+
+def _issue(severity: str, code: str, message: str, node: Optional[str] = None) -> Dict[str, Any]:
+    issue = {"severity": severity, "code": code, "message": message}
+    if node is not None:
+        issue["node"] = node
+    return issue
+
+
+def _check_node(position: int, node: Any) -> List[Dict[str, Any]]:
+    if not isinstance(node, dict):
+        return [_issue(ERROR, "invalid_node", f"nodes[{position}] is not an object")]
+    label = node.get("name") if isinstance(node.get("name"), str) and node.get("name") else f"nodes[{position}]"
+    issues = []
+    for field, types in REQUIRED_NODE_FIELDS.items():
+        value = node.get(field)
+        if value is None:
+            issues.append(_issue(ERROR, "missing_field", f"{label} has no '{field}'", label))
+        elif not isinstance(value, types) or isinstance(value, bool) or value == "":
+            issues.append(_issue(ERROR, "invalid_field", f"{label} has an invalid '{field}': {value!r}", label))
+    coordinates = node.get("position")
+    if isinstance(coordinates, list) and (
+        len(coordinates) != 2 or not all(isinstance(c, (int, float)) and not isinstance(c, bool) for c in coordinates)
+    ):
+        issues.append(_issue(ERROR, "invalid_field", f"{label} position must be [x, y]", label))
+    if "parameters" not in node:
+        if not is_sticky_note(node):
+            issues.append(_issue(WARNING, "missing_field", f"{label} has no 'parameters'", label))
+    elif not isinstance(node["parameters"], dict):
+        issues.append(_issue(ERROR, "invalid_field", f"{label} parameters must be an object", label))
+    return issues
+
+
+def check_workflow(workflow: Any) -> List[Dict[str, Any]]:
+    """Schema and graph checks; returns issues with severity "error" or "warning".
+
+    Errors are problems n8n would reject or silently drop: bad node fields,
+    duplicate names or ids, malformed or dangling connections. Warnings are
+    legal but suspicious: no trigger, cycles, nodes nothing leads to.
+    """
+    if not isinstance(workflow, dict):
+        return [_issue(ERROR, "invalid_workflow", "Workflow must be an object with 'nodes' and 'connections'")]
+    nodes = workflow.get("nodes")
+    connections = workflow.get("connections", {})
+    if not isinstance(nodes, list):
+        return [_issue(ERROR, "invalid_workflow", "'nodes' must be a list")]
+    if not isinstance(connections, dict):
+        return [_issue(ERROR, "invalid_workflow", "'connections' must be an object")]
+
+    issues = []
+    for position, node in enumerate(nodes):
+        issues.extend(_check_node(position, node))
+
+    graph = WorkflowGraph([n for n in nodes if isinstance(n, dict)], connections)
+    for name in graph.duplicate_names:
+        issues.append(_issue(ERROR, "duplicate_name", f"More than one node is named '{name}'", name))
+    seen_ids = set()
+    for node in graph.nodes:
+        node_id = node.get("id")
+        if isinstance(node_id, str) and node_id:
+            if node_id in seen_ids:
+                issues.append(_issue(ERROR, "duplicate_id", f"Node id '{node_id}' is used more than once", node.get("name")))
+            seen_ids.add(node_id)
+    for source in dict.fromkeys(graph.malformed):
+        issues.append(_issue(ERROR, "invalid_connection", f"Connections of '{source}' are not in n8n's format", source))
+    for source, target in graph.dangling:
+        if source not in graph.index:
+            issues.append(_issue(ERROR, "dangling_connection", f"Connection from unknown node '{source}'", source))
+        else:
+            issues.append(_issue(ERROR, "dangling_connection", f"'{source}' connects to unknown node '{target}'", source))
+
+    if graph.names and not graph.triggers():
+        issues.append(_issue(WARNING, "no_trigger", "Workflow has no trigger node"))
+    for cycle in graph.cycles():
+        names = graph.name_of(cycle)
+        issues.append(_issue(WARNING, "cycle", f"Nodes form a loop: {' -> '.join(names)}", names[0]))
+    orphans = graph.orphans()
+    for name in graph.name_of(orphans):
+        issues.append(_issue(WARNING, "orphan_node", f"'{name}' is not connected", name))
+    orphans = set(orphans)
+    for index in graph.unreachable():
+        if index not in orphans:
+            name = graph.names[index]
+            issues.append(_issue(WARNING, "unreachable_node", f"'{name}' is not reachable from a trigger", name))
+    return issues
+
+
+def content_hash(workflow: Any) -> str:
+    """Hash of what validation depends on: nodes, connections and settings, key order ignored."""
+    if isinstance(workflow, dict):
+        workflow = {k: workflow[k] for k in ("nodes", "connections", "settings") if k in workflow}
+    canonical = json.dumps(workflow, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class WorkflowValidator:
+    """Local checks first, then the remote validator; both cached by content hash."""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 600.0):
+        # Remote errors are returned but not kept (negative_ttl=0)
+        self.cache = SingleFlightCache(max_entries=max_entries, ttl=ttl, negative_ttl=0)
+        self.local_rejections = 0
+
+    async def validate(self, workflow: Any, remote: Callable[[Any], Awaitable[Any]]) -> Any:
+        """Validation result for `workflow`; `remote` is only called if the local checks pass.
+
+        A local rejection looks like the remote result: {"valid": False,
+        "errors": [...], "warnings": [...]} plus "source": "local". Local
+        warnings are added to a remote dict result as "localWarnings".
+        Exceptions from `remote` propagate; they and error results (isError)
+        are not cached.
+        """
+        return await self.cache.get_or_load(content_hash(workflow), lambda: self._validate(workflow, remote))
+
+    async def _validate(self, workflow: Any, remote: Callable[[Any], Awaitable[Any]]):
+        issues = check_workflow(workflow)
+        errors = [i for i in issues if i["severity"] == ERROR]
+        warnings = [i for i in issues if i["severity"] == WARNING]
+        if errors:
+            self.local_rejections += 1
+            return {"valid": False, "source": "local", "errors": errors, "warnings": warnings}, False
+        result = await remote(workflow)
+        failed = not isinstance(result, dict) or bool(result.get("isError")) or "error" in result
+        if warnings and isinstance(result, dict):
+            result = {**result, "localWarnings": warnings}
+        return result, failed
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.cache.stats, "local_rejections": self.local_rejections, "entries": len(self.cache)}
+
+
+_validator: Optional[WorkflowValidator] = None
+
+
+def get_workflow_validator() -> WorkflowValidator:
+    """Get singleton workflow validator.
+
+    WORKFLOW_VALIDATION_CACHE_SIZE bounds the cached results and
+    WORKFLOW_VALIDATION_CACHE_TTL sets how long they are kept (seconds).
+    """
+    global _validator
+    if _validator is None:
+        _validator = WorkflowValidator(
+            max_entries=env_int("WORKFLOW_VALIDATION_CACHE_SIZE", 256),
+            ttl=env_float("WORKFLOW_VALIDATION_CACHE_TTL", 600),
+        )
+    return _validator
@@ -0,0 +1 @@
+# Observability (metrics, tracing) for Flowgent
@@ -0,0 +1,386 @@
+"""Prometheus metrics without extra dependencies.
+
+Implements the counter, gauge and histogram types we need and renders them in
+the Prometheus text exposition format (version 0.0.4) for `/metrics`.
+Collectors registered with `register_collector` are called at scrape time for
+values owned by other components, such as cache hit counters.
+"""
+import re
+import time
+import functools
+import threading
+import contextvars
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from observability.tracing import span
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Suits both fast cache-served calls and slow LLM turns
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.label_names, key))
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            return [(f"{self.name}_total", self._labels(k), v) for k, v in self._values.items()]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            return [(self.name, self._labels(k), v) for k, v in self._values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # key -> (per-bucket counts, sum, count)
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels: Any) -> int:
+        series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def samples(self) -> List[Sample]:
+        samples = []
+        with self._lock:
+            for key, (counts, total, count) in self._series.items():
+                labels = self._labels(key)
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+                samples.append((f"{self.name}_bucket", {**labels, "le": "+Inf"}, count))
+                samples.append((f"{self.name}_sum", labels, total))
+                samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+
+class Registry:
+    """Metrics plus scrape-time collectors, rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]) -> None:
+        """`collector()` yields (name, kind, help, samples) families at scrape time."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        # The text format names a counter family after its `_total` sample
+        families = [
+            (f"{m.name}_total" if m.kind == "counter" else m.name, m.kind, m.documentation, m.samples())
+            for m in self._metrics.values()
+        ]
+        for collector in self._collectors:
+            try:
+                families.extend(collector())
+            except Exception:
+                # A broken collector must not take the whole endpoint down
+                continue
+        lines = []
+        for name, kind, documentation, samples in families:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def register_collector(collector: Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]) -> None:
+    REGISTRY.register_collector(collector)
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
+
+# ========== Service metrics ==========
+
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "flowgent_http_request_duration_seconds",
+    "HTTP request duration by route template, until the response body is sent",
+    ("method", "route", "status"),
+))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "flowgent_http_requests_in_flight",
+    "HTTP requests currently being served",
+))
+TOOL_DURATION = REGISTRY.register(Histogram(
+    "flowgent_tool_duration_seconds",
+    "Agent tool call duration by tool and result status",
+    ("tool", "status"),
+))
+TOOLS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "flowgent_tools_in_flight",
+    "Agent tool calls currently running",
+))
+MCP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "flowgent_mcp_request_duration_seconds",
+    "MCP request duration (including retries) by JSON-RPC method and tool",
+    ("method", "tool", "outcome"),
+))
+N8N_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "flowgent_n8n_request_duration_seconds",
+    "n8n REST API call duration (including retries) by endpoint template",
+    ("method", "endpoint", "outcome"),
+))
+LLM_CALLS = REGISTRY.register(Counter(
+    "flowgent_llm_calls",
+    "LLM responses received by model and outcome",
+    ("model", "outcome"),
+))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "flowgent_llm_tokens",
+    "LLM tokens by model and direction",
+    ("model", "direction"),
+))
+CHAT_TURNS = REGISTRY.register(Counter(
+    "flowgent_chat_turns",
+    "Chat turns handled, by mode",
+    ("mode",),
+))
+LLM_CALLS_PER_TURN = REGISTRY.register(Histogram(
+    "flowgent_llm_calls_per_turn",
+    "LLM calls needed to answer one chat message",
+    (),
+    buckets=(1, 2, 3, 4, 6, 8, 12, 16, 24),
+))
+
+_ID_SEGMENT = re.compile(r"/(workflows|executions|credentials|tags|users|projects)/[^/?]+")
+
+
+def endpoint_template(endpoint: str) -> str:
+    """`/workflows/123/activate` -> `/workflows/{id}/activate`, to keep label cardinality bounded."""
+    return _ID_SEGMENT.sub(lambda m: f"/{m.group(1)}/{{id}}", endpoint.split("?", 1)[0])
+
+
+def outcome_of(exc: Optional[BaseException]) -> str:
+    if exc is None:
+        return "success"
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    return f"http_{status}" if status else type(exc).__name__
+
+
+# ========== LLM calls per chat turn ==========
+
+_turn_llm_calls: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar("turn_llm_calls", default=None)
+
+
+class chat_turn:
+    """Context manager around one chat turn: counts the turn and its LLM calls."""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self._token = None
+
+    def __enter__(self):
+        self._token = _turn_llm_calls.set([0])
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        calls = (_turn_llm_calls.get() or [0])[0]
+        try:
+            _turn_llm_calls.reset(self._token)
+        except ValueError:
+            pass  # an abandoned stream closed from another context
+        CHAT_TURNS.inc(mode=self.mode)
+        if calls:
+            LLM_CALLS_PER_TURN.observe(calls)
+        return False
+
+
+def record_llm_response(model: str, llm_response: Any) -> None:
+    """Count one LLM response (ADK after_model_callback)."""
+    if getattr(llm_response, "partial", False):
+        return
+    outcome = "error" if getattr(llm_response, "error_code", None) else "success"
+    LLM_CALLS.inc(model=model, outcome=outcome)
+    usage = getattr(llm_response, "usage_metadata", None)
+    if usage is not None:
+        LLM_TOKENS.inc(getattr(usage, "prompt_token_count", 0) or 0, model=model, direction="prompt")
+        LLM_TOKENS.inc(getattr(usage, "candidates_token_count", 0) or 0, model=model, direction="completion")
+    calls = _turn_llm_calls.get()
+    if calls is not None:
+        calls[0] += 1
+
+
+# ========== Instrumentation helpers ==========
+
+def instrument_tool(func: Callable) -> Callable:
+    """Time (and trace) an async agent tool. The wrapper keeps the name, docstring and signature ADK reads."""
+    tool_name = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        status = "exception"
+        TOOLS_IN_FLIGHT.inc()
+        try:
+            with span(f"tool {tool_name}", category="tool", tool=tool_name) as tool_span:
+                result = await func(*args, **kwargs)
+                status = result.get("status", "success") if isinstance(result, dict) else "success"
+                tool_span.set(status=status)
+                return result
+        finally:
+            TOOLS_IN_FLIGHT.dec()
+            TOOL_DURATION.observe(time.perf_counter() - started, tool=tool_name, status=status)
+
+    return wrapper
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each request until its last body chunk is sent.
+
+    Streaming responses (SSE, NDJSON) are therefore timed to completion, not to
+    their first byte. Requests are labelled with the matched route template.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_holder = {"status": 500}
+        finished = False
+
+        def observe():
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                method=scope.get("method", ""),
+                route=template,
+                status=str(status_holder["status"]),
+            )
+
+        async def send_wrapper(message):
+            nonlocal finished
+            if message["type"] == "http.response.start":
+                status_holder["status"] = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False) and not finished:
+                finished = True
+                observe()
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            if not finished:
+                finished = True
+                observe()
@@ -0,0 +1,327 @@
+"""Lightweight request tracing.
+
+Spans are tracked in a context variable, so everything a request does - the
+chat turn, each LLM step, each tool call and each upstream HTTP call - is
+recorded under that request's trace without passing anything around. When the
+root span ends, the trace is exported as OTLP/JSON (`ExportTraceServiceRequest`):
+
+- TRACE_EXPORT=file appends one JSON document per trace to TRACE_EXPORT_PATH
+- TRACE_EXPORT=otlp POSTs it to TRACE_EXPORT_URL (an OTLP/HTTP collector)
+
+Spans are recorded even with export off; `timing_breakdown` uses them for the
+opt-in timings in ChatResponse.
+"""
+import os
+import json
+import time
+import asyncio
+import secrets
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "flowgent-backend"
+
+# OTLP span kinds
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+
+# Spans kept per trace; later ones are counted but dropped
+MAX_SPANS_PER_TRACE = 2000
+
+
+@dataclass
+class Span:
+    name: str
+    trace: "Trace"
+    span_id: str
+    parent_id: Optional[str]
+    category: Optional[str] = None
+    kind: int = KIND_INTERNAL
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    error: Optional[str] = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        self.trace.record(self)
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+
+class Trace:
+    """Finished spans of one trace."""
+
+    def __init__(self):
+        self.trace_id = secrets.token_hex(16)
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def record(self, span: Span) -> None:
+        with self._lock:
+            if len(self.spans) < MAX_SPANS_PER_TRACE:
+                self.spans.append(span)
+            else:
+                self.dropped += 1
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def start_span(name: str, category: Optional[str] = None, kind: int = KIND_INTERNAL, **attributes: Any) -> Optional[Span]:
+    """Start a child of the current span without making it current (for leaf spans).
+
+    Returns None outside a trace; `finish` accepts that.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return None
+    return Span(
+        name=name, trace=parent.trace, span_id=secrets.token_hex(8), parent_id=parent.span_id,
+        category=category, kind=kind, attributes=attributes
+    )
+
+
+def finish(span: Optional[Span], error: Optional[BaseException] = None) -> None:
+    if span is not None:
+        span.end(error)
+
+
+@contextmanager
+def span(name: str, category: Optional[str] = None, kind: int = KIND_INTERNAL, **attributes: Any) -> Iterator[Span]:
+    """Run a block as a span; starts a new trace if there is no current span."""
+    parent = _current_span.get()
+    trace = parent.trace if parent is not None else Trace()
+    current = Span(
+        name=name, trace=trace, span_id=secrets.token_hex(8),
+        parent_id=parent.span_id if parent is not None else None,
+        category=category, kind=kind, attributes=attributes
+    )
+    token = _current_span.set(current)
+    error = None
+    try:
+        yield current
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            pass  # closed from another context (an abandoned stream)
+        current.end(error)
+        if parent is None:
+            _close_open_llm_spans(trace)
+            export_trace(trace)
+
+
+# ========== LLM steps (ADK model callbacks) ==========
+
+_open_llm_spans: Dict[str, Span] = {}
+
+
+def llm_step_started(key: str, model: str) -> None:
+    """before_model_callback: open a span for this LLM call."""
+    llm_span = start_span(f"llm {model}", category="llm", kind=KIND_CLIENT, model=model)
+    if llm_span is not None:
+        _open_llm_spans[key] = llm_span
+
+
+def llm_step_finished(key: str, llm_response: Any = None, error: Optional[BaseException] = None) -> None:
+    """after_model_callback / on_model_error_callback: close the LLM span."""
+    if llm_response is not None and getattr(llm_response, "partial", False):
+        return
+    llm_span = _open_llm_spans.pop(key, None)
+    if llm_span is None:
+        return
+    usage = getattr(llm_response, "usage_metadata", None)
+    if usage is not None:
+        llm_span.set(
+            prompt_tokens=getattr(usage, "prompt_token_count", None) or 0,
+            completion_tokens=getattr(usage, "candidates_token_count", None) or 0,
+        )
+    llm_span.end(error)
+
+
+def _close_open_llm_spans(trace: "Trace") -> None:
+    """End LLM spans whose model call never reported back (e.g. a cancelled turn)."""
+    for key, llm_span in list(_open_llm_spans.items()):
+        if llm_span.trace is trace:
+            _open_llm_spans.pop(key, None)
+            llm_span.error = "LLM call did not complete"
+            llm_span.end()
+
+
+# ========== Timing breakdown ==========
+
+def timing_breakdown(root: Span, slowest: int = 5) -> Dict[str, Any]:
+    """Compact per-category timings for the spans under `root` (so far).
+
+    Categories nest (MCP calls happen inside tools) and can overlap when calls
+    run concurrently, so the numbers are time spent per category, not a
+    partition of the total.
+    """
+    children: Dict[Optional[str], List[Span]] = {}
+    for s in list(root.trace.spans):
+        children.setdefault(s.parent_id, []).append(s)
+
+    descendants: List[Span] = []
+    stack = [root.span_id]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            descendants.append(child)
+            stack.append(child.span_id)
+
+    breakdown: Dict[str, Any] = {"total_ms": round(root.duration_ms, 1)}
+    for category in ("llm", "tool", "mcp", "n8n"):
+        spans = [s for s in descendants if s.category == category]
+        breakdown[f"{category}_ms"] = round(sum(s.duration_ms for s in spans), 1)
+        breakdown[f"{category}_calls"] = len(spans)
+    breakdown["slowest"] = [
+        {"name": s.name, "ms": round(s.duration_ms, 1), **({"error": s.error} if s.error else {})}
+        for s in sorted(descendants, key=lambda s: s.duration_ms, reverse=True)[:slowest]
+    ]
+    breakdown["trace_id"] = root.trace.trace_id
+    return breakdown
+
+
+# ========== OTLP/JSON export ==========
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(trace: Trace) -> Dict[str, Any]:
+    """The trace as an OTLP/JSON ExportTraceServiceRequest."""
+    spans = []
+    for s in trace.spans:
+        attributes = dict(s.attributes)
+        if s.category:
+            attributes["flowgent.category"] = s.category
+        otlp_span = {
+            "traceId": trace.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": s.kind,
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items() if v is not None],
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+        }
+        if s.parent_id:
+            otlp_span["parentSpanId"] = s.parent_id
+        spans.append(otlp_span)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "flowgent"}, "spans": spans}],
+        }]
+    }
+
+
+_file_lock = threading.Lock()
+_pending_exports: set = set()
+
+
+def _export_file(payload: Dict[str, Any]) -> None:
+    path = os.getenv("TRACE_EXPORT_PATH", os.path.join(".cache", "traces.jsonl"))
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    line = json.dumps(payload, default=str, separators=(",", ":"))
+    with _file_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+async def _export_otlp(payload: Dict[str, Any]) -> None:
+    url = os.getenv("TRACE_EXPORT_URL", "http://localhost:4318/v1/traces")
+    try:
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            response = await client.post(url, json=payload)
+            response.raise_for_status()
+    except Exception as e:
+        logger.warning(f"Trace export to {url} failed: {e}")
+
+
+def export_trace(trace: Trace) -> None:
+    """Export a finished trace according to TRACE_EXPORT."""
+    mode = os.getenv("TRACE_EXPORT", "").lower()
+    if mode not in ("file", "otlp") or not trace.spans:
+        return
+    if trace.dropped:
+        logger.warning(f"Trace {trace.trace_id} dropped {trace.dropped} spans")
+    payload = to_otlp(trace)
+    if mode == "file":
+        try:
+            _export_file(payload)
+        except OSError as e:
+            logger.warning(f"Trace export to file failed: {e}")
+        return
+    try:
+        task = asyncio.get_running_loop().create_task(_export_otlp(payload))
+    except RuntimeError:
+        return  # no event loop to send from
+    _pending_exports.add(task)
+    task.add_done_callback(_pending_exports.discard)
+
+
+class TracingMiddleware:
+    """ASGI middleware opening the root span of each HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+        excluded = os.getenv("TRACE_EXCLUDE_PATHS", "/health,/metrics")
+        self.excluded = {p.strip() for p in excluded.split(",") if p.strip()}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") in self.excluded:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope.get("method", "")
+        status_holder = {"status": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder["status"] = message["status"]
+            await send(message)
+
+        with span(f"{method} {scope.get('path', '')}", kind=KIND_SERVER, **{"http.method": method}) as root:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    root.name = f"{method} {route}"
+                root.set(**{"http.route": route, "http.status_code": status_holder["status"]})
@@ -6,7 +6,7 @@ import asyncio
 import sys
 sys.path.insert(0, '/home/engine/project/backend')
 
-from agent.context import set_n8n_credentials, get_n8n_credentials, clear_n8n_credentials
+from agent.context import set_n8n_credentials, get_n8n_credentials, clear_n8n_credentials, request_context
 from agent.flowgent_agent import list_workflows, get_workflow, create_workflow, update_workflow, execute_workflow
 
 async def test_context():
@@ -49,6 +49,26 @@ async def test_agent_tools():
     clear_n8n_credentials()
     print("✓ Agent tools can access credentials context")
 
+def test_concurrent_requests_are_isolated():
+    """Concurrent requests on one event loop must not see each other's credentials."""
+    print("\nTesting request context isolation...")
+    
+    async def handle(instance_url: str, api_key: str):
+        with request_context(instance_url=instance_url, api_key=api_key):
+            await asyncio.sleep(0.01)  # let the other request run in between
+            creds = get_n8n_credentials()
+            assert creds["instance_url"] == instance_url, "Credentials leaked between requests"
+            assert creds["api_key"] == api_key, "Credentials leaked between requests"
+        assert get_n8n_credentials() is None, "Context should be restored after the request"
+    
+    async def run():
+        await asyncio.gather(*[
+            handle(f"https://user{i}.n8n.com", f"key-{i}") for i in range(20)
+        ])
+    
+    asyncio.run(run())
+    print("✓ Concurrent request contexts are isolated")
+
 if __name__ == "__main__":
     print("="*60)
     print("Flowgent Agent Context Tests")
@@ -57,6 +77,7 @@ if __name__ == "__main__":
     try:
         asyncio.run(test_context())
         asyncio.run(test_agent_tools())
+        test_concurrent_requests_are_isolated()
         
         print("\n" + "="*60)
         print("✓ All agent context tests passed!")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test the benchmark fakes and statistics
+"""
+import asyncio
+import json
+import os
+import sys
+
+from fastapi.testclient import TestClient
+
+from benchmarks.fake_mcp import create_fake_mcp_app
+from benchmarks.fake_n8n import create_fake_n8n_app
+from benchmarks.fixtures import FakeSettings
+from benchmarks.run import Scenario, measure, percentile
+from benchmarks.scripted_llm import ScriptedLlm
+from n8n_mcp.sse import SSEParser
+
+FAST = FakeSettings(n8n_latency_ms=0, mcp_latency_ms=0, jitter_ms=0, payload_kb=0.5, workflows=5, nodes_per_workflow=3)
+
+
+def test_percentiles_and_measure():
+    """Nearest-rank percentiles and a concurrent run with errors counted."""
+    print("Testing statistics...")
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 0.5) == 50 and percentile(values, 0.99) == 99 and percentile(values, 1.0) == 100
+    assert percentile([], 0.5) == 0.0
+
+    async def call(index):
+        await asyncio.sleep(0.001)
+        if index % 10 == 0:
+            raise RuntimeError("boom")
+
+    result = asyncio.run(measure(Scenario("demo", "routes", call), concurrency=4, requests=40))
+    assert result["requests"] == 40 and result["errors"] == 4
+    assert result["first_error"] == "RuntimeError: boom"
+    assert result["p50_ms"] >= 1 and result["throughput_rps"] > 0
+    print("✓ Statistics are computed per scenario and level")
+
+
+def test_fake_n8n_paginates():
+    """The fake n8n API pages workflows with cursors and requires an API key."""
+    print("\nTesting fake n8n...")
+    client = TestClient(create_fake_n8n_app(FAST))
+    headers = {"X-N8N-API-KEY": "key"}
+    assert client.get("/api/v1/workflows").status_code == 401
+    first = client.get("/api/v1/workflows", params={"limit": 3}, headers=headers).json()
+    second = client.get("/api/v1/workflows", params={"limit": 3, "cursor": first["nextCursor"]}, headers=headers).json()
+    assert [w["id"] for w in first["data"] + second["data"]] == ["1", "2", "3", "4", "5"]
+    assert second["nextCursor"] is None
+    workflow = client.get("/api/v1/workflows/2", headers=headers).json()
+    assert len(workflow["nodes"]) == 3 and len(workflow["nodes"][0]["parameters"]["notes"]) == 512
+    print("✓ Fake n8n serves paginated workflows")
+
+
+def test_fake_mcp_batches_over_sse():
+    """The fake MCP server answers batches in one SSE response, or rejects them."""
+    print("\nTesting fake MCP...")
+    batch = [
+        {"jsonrpc": "2.0", "id": i, "method": "tools/call",
+         "params": {"name": "get_node", "arguments": {"nodeType": "n8n-nodes-base.slack"}}}
+        for i in (1, 2)
+    ]
+    response = TestClient(create_fake_mcp_app(FAST)).post("/mcp", json=batch)
+    assert response.headers["content-type"].startswith("text/event-stream")
+    parser = SSEParser()
+    messages = [json.loads(event.data) for event in parser.feed(response.content) + parser.flush()]
+    assert [m["id"] for m in messages] == [1, 2]
+    doc = json.loads(messages[0]["result"]["content"][0]["text"])
+    assert doc["nodeType"] == "n8n-nodes-base.slack"
+
+    no_batch = FakeSettings(**{**FAST.to_dict(), "batch": False})
+    assert TestClient(create_fake_mcp_app(no_batch)).post("/mcp", json=batch).status_code == 400
+    print("✓ Fake MCP speaks JSON-RPC over SSE")
+
+
+def test_scripted_model_drives_agent():
+    """The scripted model runs tool calls through the real runner and tracks each session separately."""
+    print("\nTesting scripted model...")
+    from agent.flowgent_agent import chat_with_agent, reset_agent
+    from observability.metrics import TOOL_DURATION
+
+    llm = ScriptedLlm(script=[
+        [{"name": "validate_workflow_json", "args": {"workflow_json": "not json"}}],
+        "Checked.",
+    ])
+    previous_store = os.environ.get("SESSION_STORE")
+    os.environ["SESSION_STORE"] = "memory"
+    reset_agent(model=llm)
+    tool_errors_before = TOOL_DURATION.count(tool="validate_workflow_json", status="error")
+
+    async def run():
+        return await asyncio.gather(
+            chat_with_agent("first", "scripted-1"),
+            chat_with_agent("second", "scripted-2"),
+        ) + [await chat_with_agent("third", "scripted-1")]
+
+    try:
+        replies = asyncio.run(run())
+    finally:
+        reset_agent()
+        if previous_store is None:
+            del os.environ["SESSION_STORE"]
+        else:
+            os.environ["SESSION_STORE"] = previous_store
+    assert replies == ["Checked."] * 3, replies
+    assert llm.stats == {"llm_calls": 6, "tool_calls": 3, "tool_errors": 3}
+    assert TOOL_DURATION.count(tool="validate_workflow_json", status="error") == tool_errors_before + 3
+    print("✓ Scripted turns replay per session")
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Flowgent Benchmark Tests")
+    print("="*60 + "\n")
+
+    try:
+        test_percentiles_and_measure()
+        test_fake_n8n_paginates()
+        test_fake_mcp_batches_over_sse()
+        test_scripted_model_drives_agent()
+
+        print("\n" + "="*60)
+        print("✓ All benchmark tests passed!")
+        print("="*60)
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
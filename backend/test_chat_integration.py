@@ -5,7 +5,11 @@ Test chat endpoint with n8n credentials
 import sys
 sys.path.insert(0, '/home/engine/project/backend')
 
+import json
+
 from fastapi.testclient import TestClient
+
+import agent.flowgent_agent as flowgent_agent
 from main import app
 
 client = TestClient(app)
@@ -51,6 +55,43 @@ def test_chat_without_n8n_config():
     else:
         print(f"  Error: {response.text[:200]}")
 
+def test_chat_stream():
+    """Test streaming chat endpoint returns Server-Sent Events."""
+    print("\nTesting /api/chat/stream...")
+    
+    response = client.post("/api/chat/stream", json={
+        "message": "Hello",
+        "context": {"session_id": "test_stream_session"},
+        "n8n_config": None
+    })
+    
+    print(f"  Status: {response.status_code}")
+    assert response.status_code == 200, "Stream endpoint should return 200"
+    assert response.headers["content-type"].startswith("text/event-stream"), "Should be an SSE stream"
+    events = [line[7:] for line in response.text.splitlines() if line.startswith("event: ")]
+    print(f"  Events: {events}")
+    assert events and events[-1] in ("final", "error"), "Stream should end with final or error event"
+    print("✓ Chat stream completed")
+
+def test_chat_stream_reports_missing_api_key():
+    """A missing Gemini key gets the same setup guidance on /api/chat and /api/chat/stream."""
+    print("\nTesting API key errors...")
+
+    def no_key():
+        raise ValueError("GOOGLE_GENAI_API_KEY environment variable not set.")
+
+    original = flowgent_agent.get_runner
+    flowgent_agent.get_runner = no_key
+    try:
+        chat = client.post("/api/chat", json={"message": "Hello", "context": None, "n8n_config": None})
+        stream = client.post("/api/chat/stream", json={"message": "Hello", "context": None, "n8n_config": None})
+    finally:
+        flowgent_agent.get_runner = original
+    data = [json.loads(line[6:]) for line in stream.text.splitlines() if line.startswith("data: ")]
+    assert data[-1]["type"] == "error" and data[-1]["message"] == flowgent_agent.API_KEY_NOT_CONFIGURED
+    assert chat.json()["response"] == flowgent_agent.API_KEY_NOT_CONFIGURED
+    print("✓ Both chat paths explain how to configure the key")
+
 def test_workflows_with_headers():
     """Test workflows endpoint with n8n headers."""
     print("\nTesting /api/workflows with n8n headers...")
@@ -77,6 +118,8 @@ if __name__ == "__main__":
     try:
         test_chat_with_n8n_config()
         test_chat_without_n8n_config()
+        test_chat_stream()
+        test_chat_stream_reports_missing_api_key()
         test_workflows_with_headers()
         
         print("\n" + "="*60)
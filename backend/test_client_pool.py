@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test pooled n8n HTTP clients
+"""
+import asyncio
+import os
+import sys
+import threading
+
+from n8n_mcp.client_pool import N8nClientPool, instance_key
+from n8n_mcp.env import env_float, env_int
+
+
+def test_same_instance_reuses_client():
+    """Same instance + key shares one client; a different key gets its own."""
+    print("Testing client reuse...")
+
+    async def run():
+        pool = N8nClientPool(idle_timeout=300)
+        a = await pool.get("https://test.n8n.com/", "key-1")
+        b = await pool.get("https://test.n8n.com", "key-1")
+        c = await pool.get("https://test.n8n.com", "key-2")
+        assert a is b, "Same instance should reuse the pooled client"
+        assert a is not c, "Different API keys should not share a client"
+        assert len(pool) == 2
+        await pool.close()
+        assert a.is_closed and c.is_closed, "close() should close every client"
+
+    asyncio.run(run())
+    assert "key-1" not in instance_key("https://test.n8n.com", "key-1")[1], "API key must be hashed"
+    print("✓ Clients are reused per instance")
+
+
+def test_idle_clients_are_evicted():
+    """Clients idle past the timeout are closed on the next access."""
+    print("\nTesting idle eviction...")
+
+    async def run():
+        pool = N8nClientPool(idle_timeout=0.01)
+        a = await pool.get("https://one.n8n.com", "key")
+        await asyncio.sleep(0.05)
+        await pool.evict_idle()
+        assert a.is_closed, "Idle client should be closed"
+        assert len(pool) == 0
+        await pool.close()
+
+    asyncio.run(run())
+    print("✓ Idle clients are evicted")
+
+
+def test_client_from_another_loop_is_closed():
+    """Replacing a client opened on another loop closes the old one instead of leaking it."""
+    print("\nTesting loop changes...")
+    pool = N8nClientPool(idle_timeout=300)
+    stale = asyncio.run(pool.get("https://one.n8n.com", "key"))
+
+    background = asyncio.new_event_loop()
+    thread = threading.Thread(target=background.run_forever, daemon=True)
+    thread.start()
+    try:
+        running = asyncio.run_coroutine_threadsafe(pool.get("https://one.n8n.com", "key"), background).result(5)
+        assert running is not stale and stale.is_closed, "client of a stopped loop should be closed"
+
+        async def replace():
+            fresh = await pool.get("https://one.n8n.com", "key")
+            for _ in range(100):
+                if running.is_closed:
+                    break
+                await asyncio.sleep(0.01)
+            assert fresh is not running and running.is_closed, "client of a running loop should close on it"
+            assert len(pool) == 1
+            await pool.close()
+
+        asyncio.run(replace())
+    finally:
+        background.call_soon_threadsafe(background.stop)
+        thread.join(5)
+        background.close()
+    print("✓ Clients left on another loop are closed")
+
+
+def test_malformed_settings_fall_back_to_defaults():
+    """A bad numeric env value uses the default instead of raising."""
+    print("\nTesting env settings...")
+    os.environ.update(N8N_HTTP_TIMEOUT="soon", N8N_HTTP_MAX_CONNECTIONS="2.5")
+    try:
+        pool = N8nClientPool()
+        assert pool.timeout == 30.0 and pool.max_connections == 20
+        os.environ.update(N8N_HTTP_TIMEOUT="12.5", N8N_HTTP_MAX_CONNECTIONS="")
+        assert env_float("N8N_HTTP_TIMEOUT", 30.0) == 12.5 and env_int("N8N_HTTP_MAX_CONNECTIONS", 20) == 20
+    finally:
+        del os.environ["N8N_HTTP_TIMEOUT"], os.environ["N8N_HTTP_MAX_CONNECTIONS"]
+    print("✓ Malformed settings use the defaults")
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Flowgent Client Pool Tests")
+    print("="*60 + "\n")
+
+    try:
+        test_same_instance_reuses_client()
+        test_idle_clients_are_evicted()
+        test_client_from_another_loop_is_closed()
+        test_malformed_settings_fall_back_to_defaults()
+
+        print("\n" + "="*60)
+        print("✓ All client pool tests passed!")
+        print("="*60)
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
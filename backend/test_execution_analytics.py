@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test the columnar execution analytics and its route
+"""
+import os
+import random
+import sys
+import tempfile
+
+from fastapi.testclient import TestClient
+
+import api.routes as routes
+from benchmarks.run import percentile
+from main import app
+from n8n_mcp.execution_analytics import ExecutionAnalytics, build_columns, summarize_executions
+from n8n_mcp.execution_store import ExecutionStore, ExecutionSync
+from test_execution_store import FakeUpstream
+
+client = TestClient(app)
+HOUR = 3600.0
+
+
+def test_summary_matches_row_by_row():
+    """Per-workflow counts, failure rates, percentiles and buckets agree with a plain Python computation."""
+    print("Testing summary...")
+    rng = random.Random(3)
+    rows = []
+    for i in range(2000):
+        status = rng.choice(["success"] * 8 + ["error", "crashed", "running"])
+        duration = None if status == "running" else rng.expovariate(1 / 400)
+        rows.append((str(rng.randint(1, 7)), status, int(status != "running"), i * 10.0, duration))
+
+    summary = summarize_executions(build_columns(rows), since=1000.0, until=15000.0, bucket_seconds=HOUR)
+    assert len(summary["bucket_starts"]) == 5 and summary["since"] == "1970-01-01T00:00:00Z"
+    window = [r for r in rows if 1000 <= r[3] < 15000]
+    assert summary["totals"]["executions"] == len(window)
+    for item in summary["workflows"]:
+        mine = [r for r in window if r[0] == item["workflow_id"]]
+        finished = [r for r in mine if r[2]]
+        failed = [r for r in mine if r[1] in ("error", "crashed")]
+        durations = sorted(r[4] for r in finished)
+        assert item["executions"] == len(mine) and item["failed"] == len(failed)
+        assert item["failure_rate"] == round(len(failed) / len(finished), 4)
+        for key, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            assert item["duration_ms"][key] == round(percentile(durations, q), 1), (key, item)
+        assert item["buckets"]["executions"] == [sum(1 for r in mine if int(r[3] // HOUR) == b) for b in range(5)]
+    counts = [item["executions"] for item in summary["workflows"]]
+    assert counts == sorted(counts, reverse=True)
+
+    one = summarize_executions(build_columns(rows), workflow_id="3")
+    assert [item["workflow_id"] for item in one["workflows"]] == ["3"]
+    assert summarize_executions(build_columns(rows), workflow_id="missing")["workflows"] == []
+    empty = summarize_executions(build_columns([]))
+    assert empty["totals"]["executions"] == 0 and empty["bucket_starts"] == []
+
+    spread = [("1", "success", 1, day * 86400.0 + 1800, 10.0) for day in range(365)]
+    for since in (None, 0.0):
+        wide = summarize_executions(build_columns(spread), since=since)
+        assert wide["bucket_seconds"] == 9 * HOUR and len(wide["bucket_starts"]) <= 1000
+        assert sum(wide["workflows"][0]["buckets"]["executions"]) == 365
+    assert summarize_executions(build_columns(spread[:2]))["bucket_seconds"] == HOUR
+    print("✓ Vectorized summary matches the row-by-row one")
+
+
+def test_columns_cached_until_store_changes():
+    """Columns are loaded once per store version."""
+    print("\nTesting column cache...")
+    store = ExecutionStore(os.path.join(tempfile.mkdtemp(), "executions.sqlite3"))
+    store.upsert("a", [{"id": "1", "workflowId": "1", "status": "success", "finished": True,
+                        "startedAt": "2026-01-01T00:00:00Z", "stoppedAt": "2026-01-01T00:00:01Z"}])
+    analytics = ExecutionAnalytics()
+    assert analytics.summary(store, "a")["totals"]["duration_ms"]["p50"] == 1000.0
+    analytics.summary(store, "a", bucket_seconds=60)
+    assert analytics.loads == 1
+    store.upsert("a", [{"id": "2", "workflowId": "1", "status": "error", "finished": True,
+                        "startedAt": "2026-01-01T00:01:00Z", "stoppedAt": "2026-01-01T00:01:03Z"}])
+    assert analytics.summary(store, "a")["totals"]["failed"] == 1 and analytics.loads == 2
+    store.close()
+    print("✓ Columns are reused until the store changes")
+
+
+def test_route():
+    """The route syncs, summarizes and rejects explicit buckets that don't fit the window."""
+    print("\nTesting route...")
+    upstream = FakeUpstream([
+        {"id": str(i), "workflowId": "1" if i % 3 else "2", "status": "error" if i % 4 == 0 else "success",
+         "finished": True, "startedAt": f"2026-01-01T0{i % 6}:00:00Z", "stoppedAt": f"2026-01-01T0{i % 6}:00:0{i % 9}Z"}
+        for i in range(1, 13)
+    ])
+    sync = ExecutionSync(ExecutionStore(os.path.join(tempfile.mkdtemp(), "executions.sqlite3")), interval=0, retain_days=0)
+    original_client, original_sync = routes.get_mcp_client, routes.get_execution_sync
+    routes.get_mcp_client = lambda: upstream
+    routes.get_execution_sync = lambda: sync
+    try:
+        body = client.get("/api/analytics/executions").json()
+        assert body["totals"]["executions"] == 12 and body["totals"]["failed"] == 3
+        assert [w["workflow_id"] for w in body["workflows"]] == ["1", "2"]
+        assert len(body["bucket_starts"]) == 6 and sum(body["workflows"][0]["buckets"]["executions"]) == 8
+
+        response = client.get("/api/analytics/executions", params={"since": "2020-01-01T00:00:00Z", "bucket": 60})
+        assert response.status_code == 400
+        response = client.get("/api/analytics/executions", params={"since": "2020-01-01T00:00:00Z"})
+        assert response.status_code == 200 and len(response.json()["bucket_starts"]) <= 1000
+    finally:
+        routes.get_mcp_client, routes.get_execution_sync = original_client, original_sync
+        sync.store.close()
+    print("✓ Route summarizes the synced executions")
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Flowgent Execution Analytics Tests")
+    print("="*60 + "\n")
+
+    try:
+        test_summary_matches_row_by_row()
+        test_columns_cached_until_store_changes()
+        test_route()
+
+        print("\n" + "="*60)
+        print("✓ All execution analytics tests passed!")
+        print("="*60)
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
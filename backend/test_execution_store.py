@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test the local execution store, its delta sync and the /api/executions route
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+from fastapi.testclient import TestClient
+
+import api.routes as routes
+from main import app
+from n8n_mcp.execution_store import ExecutionStore, ExecutionSync, parse_timestamp
+
+client = TestClient(app)
+
+
+def _execution(number, workflow_id="1", status="success", minute=0):
+    started = f"2026-01-01T00:{minute:02d}:00.000Z"
+    return {
+        "id": str(number), "workflowId": workflow_id, "mode": "manual", "status": status,
+        "finished": status == "success", "startedAt": started,
+        "stoppedAt": None if status == "running" else f"2026-01-01T00:{minute:02d}:02.500Z",
+    }
+
+
+class FakeUpstream:
+    """Pages executions newest first and counts the requests made."""
+
+    def __init__(self, executions, page_size=3):
+        self.executions = list(executions)
+        self.page_size = page_size
+        self.page_requests = 0
+        self.refreshed = []
+
+    async def iter_execution_pages(self, workflow_id=None, page_size=100, cursor=None):
+        ordered = sorted(self.executions, key=lambda e: int(e["id"]), reverse=True)
+        for start in range(0, len(ordered), self.page_size):
+            self.page_requests += 1
+            yield ordered[start:start + self.page_size], None
+
+    async def get_execution(self, execution_id):
+        self.refreshed.append(execution_id)
+        for execution in self.executions:
+            if execution["id"] == execution_id:
+                return execution
+        raise Exception("Client error '404 Not Found'")
+
+
+def _store():
+    return ExecutionStore(os.path.join(tempfile.mkdtemp(), "executions.sqlite3"))
+
+
+def test_store_filters_and_pages():
+    """Queries filter by workflow, status and start time and page with a keyset cursor."""
+    print("Testing store queries...")
+    store = _store()
+    store.upsert("a", [_execution(i, workflow_id=str(i % 2), status="error" if i % 3 == 0 else "success", minute=i)
+                       for i in range(1, 11)])
+    store.upsert("b", [_execution(99)])
+
+    rows, cursor = store.query("a", limit=4)
+    assert [r["id"] for r in rows] == ["10", "9", "8", "7"] and cursor == "7"
+    rows, cursor = store.query("a", limit=4, cursor=cursor)
+    assert [r["id"] for r in rows] == ["6", "5", "4", "3"]
+    rows, cursor = store.query("a", limit=4, cursor=cursor)
+    assert [r["id"] for r in rows] == ["2", "1"] and cursor is None
+
+    assert [r["id"] for r in store.query("a", workflow_id="0")[0]] == ["10", "8", "6", "4", "2"]
+    assert [r["id"] for r in store.query("a", statuses=["error"])[0]] == ["9", "6", "3"]
+    since, until = parse_timestamp("2026-01-01T00:04:00Z"), parse_timestamp("2026-01-01T00:07:00Z")
+    assert [r["id"] for r in store.query("a", since=since, until=until)[0]] == ["6", "5", "4"]
+    assert store.stats()["stored_executions"] == 11
+    store.close()
+    print("✓ Filters and pagination are answered from indexes")
+
+
+def test_sync_fetches_only_new_executions():
+    """After the first sync, only pages newer than the stored high-water id are fetched."""
+    print("\nTesting delta sync...")
+    upstream = FakeUpstream([_execution(i, minute=i) for i in range(1, 9)] + [_execution(9, status="running", minute=9)])
+    sync = ExecutionSync(_store(), interval=0, backfill=5, retain_days=0)
+
+    async def run():
+        await sync.ensure("a", upstream)
+        assert [r["id"] for r in sync.store.query("a")[0]] == ["9", "8", "7", "6", "5"], "backfill is capped"
+        assert upstream.page_requests == 2
+
+        upstream.page_requests = 0
+        upstream.executions[-1] = _execution(9, minute=9)
+        upstream.executions.append(_execution(10, status="error", minute=10))
+        assert await sync.sync("a") == 1
+        assert upstream.page_requests == 1, "stops at the first page holding known executions"
+        assert upstream.refreshed == ["9"], "the running execution is refreshed"
+        rows = {r["id"]: r for r in sync.store.query("a")[0]}
+        assert rows["9"]["status"] == "success" and rows["10"]["status"] == "error"
+
+        upstream.page_requests = 0
+        assert await asyncio.gather(sync.sync("a"), sync.sync("a")) == [0, 0]
+        assert upstream.page_requests == 1, "concurrent syncs are shared"
+        await sync.close()
+
+    asyncio.run(run())
+    print("✓ Syncs are incremental and refresh running executions")
+
+
+def test_route_serves_from_store():
+    """/api/executions filters, pages through X-Next-Cursor and validates its parameters."""
+    print("\nTesting route...")
+    upstream = FakeUpstream([_execution(i, status="error" if i % 2 else "success", minute=i) for i in range(1, 8)])
+    sync = ExecutionSync(_store(), interval=0, retain_days=0)
+    original_client, original_sync = routes.get_mcp_client, routes.get_execution_sync
+    routes.get_mcp_client = lambda: upstream
+    routes.get_execution_sync = lambda: sync
+    try:
+        response = client.get("/api/executions", params={"limit": 3})
+        assert response.status_code == 200
+        assert [e["id"] for e in response.json()] == ["7", "6", "5"]
+        cursor = response.headers["X-Next-Cursor"]
+        page = client.get("/api/executions", params={"limit": 3, "cursor": cursor}).json()
+        assert [e["id"] for e in page] == ["4", "3", "2"]
+
+        errors = client.get("/api/executions", params={"status": "error", "since": "2026-01-01T00:03:00Z"}).json()
+        assert [e["id"] for e in errors] == ["7", "5", "3"]
+        assert client.get("/api/executions", params={"since": "yesterday"}).status_code == 400
+        assert client.get("/api/executions", params={"cursor": "abc"}).status_code == 400
+    finally:
+        routes.get_mcp_client, routes.get_execution_sync = original_client, original_sync
+        sync.store.close()
+    print("✓ Route answers from the store")
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Flowgent Execution Store Tests")
+    print("="*60 + "\n")
+
+    try:
+        test_store_filters_and_pages()
+        test_sync_fetches_only_new_executions()
+        test_route_serves_from_store()
+
+        print("\n" + "="*60)
+        print("✓ All execution store tests passed!")
+        print("="*60)
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
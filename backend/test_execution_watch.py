@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test shared execution pollers and the wait/stream routes
+"""
+import asyncio
+import json
+import sys
+
+from fastapi.testclient import TestClient
+
+import api.routes as routes
+from main import app
+from n8n_mcp.execution_watch import ExecutionWatcher, is_finished
+
+client = TestClient(app)
+
+
+class FakeExecution:
+    """Reports the given statuses in turn, then stays on the last one."""
+
+    def __init__(self, *statuses, fail_with=None):
+        self.statuses = list(statuses)
+        self.fail_with = fail_with
+        self.calls = []
+
+    async def get_execution(self, execution_id):
+        self.calls.append(asyncio.get_running_loop().time())
+        if self.fail_with:
+            raise Exception(self.fail_with)
+        status = self.statuses[min(len(self.calls) - 1, len(self.statuses) - 1)]
+        return {"id": execution_id, "status": status, "finished": status == "success"}
+
+
+def test_waiters_share_one_poller():
+    """Many waiters cause one upstream poll per interval, which backs off while nothing changes."""
+    print("Testing shared poller...")
+    upstream = FakeExecution("new", "running", "running", "running", "running", "success")
+    watcher = ExecutionWatcher(min_interval=0.01, max_interval=0.05, backoff=2.0)
+
+    async def run():
+        fetch = lambda: upstream.get_execution("42")
+        return await asyncio.gather(*(watcher.wait("42", fetch, timeout=5) for _ in range(20)))
+
+    results = asyncio.run(run())
+    assert all(done and execution["status"] == "success" for execution, done in results)
+    assert len(upstream.calls) == 6, f"expected one poller, saw {len(upstream.calls)} polls"
+    gaps = [b - a for a, b in zip(upstream.calls, upstream.calls[1:])]
+    # reset on the status change, then growing while "running" repeats
+    assert gaps[3] > gaps[1] * 2, gaps
+    assert is_finished({"finished": True}) and not is_finished({"status": "waiting"})
+    print("✓ One poller serves all waiters, with backoff")
+
+
+def test_wait_timeout_and_retained_result():
+    """A wait that times out reports the latest state; finished results are served without polling."""
+    print("\nTesting timeout and retention...")
+    watcher = ExecutionWatcher(min_interval=0.01, max_interval=0.01)
+
+    async def run():
+        running = FakeExecution("running")
+        execution, done = await watcher.wait("slow", lambda: running.get_execution("slow"), timeout=0.05)
+        assert not done and execution["status"] == "running"
+
+        finished = FakeExecution("success")
+        fetch = lambda: finished.get_execution("fast")
+        await watcher.wait("fast", fetch, timeout=1)
+        polls = len(finished.calls)
+        execution, done = await watcher.wait("fast", fetch, timeout=1)
+        assert done and len(finished.calls) == polls
+        await asyncio.sleep(0.05)
+        assert watcher.stats()["active_polls"] == 0, watcher.stats()
+
+    asyncio.run(run())
+    print("✓ Timeouts return the latest state; results are retained")
+
+
+def test_routes():
+    """/wait long-polls, /stream emits status changes and a done event, upstream 404s map to 404."""
+    print("\nTesting routes...")
+    upstream = FakeExecution("running", "running", "success")
+    original_client, original_watcher = routes.get_mcp_client, routes.get_execution_watcher
+    watcher = ExecutionWatcher(min_interval=0.01, max_interval=0.02, retain_seconds=0)
+    routes.get_mcp_client = lambda: upstream
+    routes.get_execution_watcher = lambda: watcher
+    try:
+        body = client.get("/api/executions/7/wait", params={"timeout": 5}).json()
+        assert body["done"] and body["execution"]["status"] == "success"
+
+        upstream.calls.clear()
+        response = client.get("/api/executions/7/stream")
+        events = [
+            (block.split("\n")[0][len("event: "):], json.loads(block.split("data: ", 1)[1]))
+            for block in response.text.strip().split("\n\n") if block.startswith("event:")
+        ]
+        assert [name for name, _ in events] == ["status", "done"], events
+        assert events[-1][1]["execution"]["status"] == "success"
+
+        upstream.fail_with = "Client error '404 Not Found'"
+        assert client.get("/api/executions/8/wait", params={"timeout": 5}).status_code == 404
+    finally:
+        routes.get_mcp_client, routes.get_execution_watcher = original_client, original_watcher
+    print("✓ Wait and stream routes follow executions")
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Flowgent Execution Watch Tests")
+    print("="*60 + "\n")
+
+    try:
+        test_waiters_share_one_poller()
+        test_wait_timeout_and_retained_result()
+        test_routes()
+
+        print("\n" + "="*60)
+        print("✓ All execution watch tests passed!")
+        print("="*60)
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Test idempotent workflow creation through the route and the agent tool
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+from fastapi.testclient import TestClient
+
+import api.routes as routes
+import agent.flowgent_agent as flowgent_agent
+from main import app
+from n8n_mcp.client_pool import instance_key
+from n8n_mcp.idempotency import IdempotencyConflict, IdempotencyStore, IdempotentOperationFailed, request_fingerprint
+
+client = TestClient(app)
+
+NODES = [{"id": "t", "name": "Start", "type": "n8n-nodes-base.manualTrigger", "typeVersion": 1,
+          "position": [0, 0], "parameters": {}}]
+
+
+class FakeCreator:
+    """Creates workflows with increasing ids, optionally failing first."""
+
+    def __init__(self, failures=0, delay=0.0):
+        self.created = []
+        self.failures = failures
+        self.delay = delay
+
+    async def create_workflow(self, name, nodes, connections):
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise Exception("Read timed out")
+        self.created.append(name)
+        return {"id": str(len(self.created)), "name": name, "nodes": nodes, "connections": connections}
+
+
+def _store(**kwargs):
+    return IdempotencyStore(os.path.join(tempfile.mkdtemp(), "idempotency.sqlite3"), **kwargs)
+
+
+def test_store_replays_and_coalesces():
+    """Completed keys replay, concurrent calls share one create, failures are retried, mismatches conflict."""
+    print("Testing store...")
+    store = _store()
+    upstream = FakeCreator(failures=1, delay=0.01)
+    fingerprint = request_fingerprint("A", NODES, {})
+
+    async def run():
+        create = lambda: upstream.create_workflow("A", NODES, {})
+        try:
+            await store.run("mcp", "key-1", fingerprint, create)
+            raise AssertionError("the failure should propagate")
+        except Exception as e:
+            assert "timed out" in str(e)
+
+        results = await asyncio.gather(*(store.run("mcp", "key-1", fingerprint, create) for _ in range(3)))
+        assert [r[1] for r in results] == [False, True, True] and upstream.created == ["A"]
+        assert await store.run("mcp", "key-1", fingerprint, create) == (results[0][0], True)
+        assert (await store.run("other", "key-1", fingerprint, create))[1] is False, "keys are scoped per instance"
+
+        try:
+            await store.run("mcp", "key-1", request_fingerprint("B", NODES, {}), create)
+            raise AssertionError("a reused key should conflict")
+        except IdempotencyConflict:
+            pass
+
+    asyncio.run(run())
+    assert store.stats == {"executed": 3, "replayed": 1, "coalesced": 2, "conflicts": 1}
+
+    reopened = IdempotencyStore(store.db_path)
+    assert reopened.get("mcp", "key:key-1")[1]["id"] == "1", "outcomes survive a restart"
+    reopened.close()
+    store.close()
+    print("✓ Replays, coalescing and conflicts work")
+
+
+def test_content_window():
+    """Without a key, identical content is deduplicated only within the window."""
+    print("\nTesting content dedup...")
+    upstream = FakeCreator()
+
+    async def run(store):
+        create = lambda: upstream.create_workflow("A", NODES, {})
+        reordered = json.loads(json.dumps(NODES, sort_keys=True))
+        assert request_fingerprint("A", reordered, {}) == request_fingerprint("A", NODES, {})
+        first = await store.run("mcp", None, request_fingerprint("A", NODES, {}), create)
+        second = await store.run("mcp", None, request_fingerprint("A", reordered, {}), create)
+        return first, second
+
+    first, second = asyncio.run(run(_store()))
+    assert second == (first[0], True) and len(upstream.created) == 1
+    first, second = asyncio.run(run(_store(content_window=0)))
+    assert second[1] is False and len(upstream.created) == 3
+    print("✓ Identical creates within the window are deduplicated")
+
+
+def test_error_results_are_retried():
+    """A create that returns an error instead of raising is reported and run again on retry."""
+    print("\nTesting error results...")
+    calls = []
+
+    class ErroringCreator:
+        async def create_workflow(self, name, nodes, connections):
+            calls.append(name)
+            return {"text": "n8n API error: 500", "isError": True}
+
+    async def run(store):
+        create = lambda: ErroringCreator().create_workflow("A", NODES, {})
+        for _ in range(2):
+            try:
+                await store.run("mcp", "key-1", request_fingerprint("A", NODES, {}), create)
+                raise AssertionError("an error result should raise")
+            except IdempotentOperationFailed as e:
+                assert "500" in str(e) and e.result["isError"] is True
+
+    store = _store()
+    asyncio.run(run(store))
+    assert len(calls) == 2 and store.get("mcp", "key:key-1") is None, "error results are not stored"
+    store.close()
+
+    store = _store()
+    originals = (routes.get_mcp_client, routes.get_idempotency_store,
+                 flowgent_agent.get_mcp_client, flowgent_agent.get_idempotency_store)
+    routes.get_mcp_client = flowgent_agent.get_mcp_client = lambda: ErroringCreator()
+    routes.get_idempotency_store = flowgent_agent.get_idempotency_store = lambda: store
+    try:
+        body = {"name": "Failing", "nodes": NODES, "connections": {}}
+        for _ in range(2):
+            response = client.post("/api/workflows", json=body)
+            assert response.status_code == 500 and "Idempotent-Replayed" not in response.headers
+        nodes_json = json.dumps({"nodes": NODES, "connections": {}})
+        for _ in range(2):
+            assert asyncio.run(flowgent_agent.create_workflow("Failing", "", nodes_json))["status"] == "error"
+        assert len(calls) == 6
+    finally:
+        (routes.get_mcp_client, routes.get_idempotency_store,
+         flowgent_agent.get_mcp_client, flowgent_agent.get_idempotency_store) = originals
+        store.close()
+    print("✓ Error results are surfaced and retried")
+
+
+def test_route_and_agent():
+    """POST /api/workflows honours Idempotency-Key; the agent tool reports replays."""
+    print("\nTesting route and agent tool...")
+    upstream = FakeCreator()
+    store = _store()
+    originals = (routes.get_mcp_client, routes.get_idempotency_store,
+                 flowgent_agent.get_mcp_client, flowgent_agent.get_idempotency_store)
+    routes.get_mcp_client = flowgent_agent.get_mcp_client = lambda: upstream
+    routes.get_idempotency_store = flowgent_agent.get_idempotency_store = lambda: store
+    try:
+        body = {"name": "Route", "nodes": NODES, "connections": {}}
+        first = client.post("/api/workflows", json=body, headers={"Idempotency-Key": "abc"})
+        again = client.post("/api/workflows", json=body, headers={"Idempotency-Key": "abc"})
+        assert first.status_code == again.status_code == 200
+        assert again.json()["id"] == first.json()["id"] and again.headers["Idempotent-Replayed"] == "true"
+        assert "Idempotent-Replayed" not in first.headers and upstream.created == ["Route"]
+        conflict = client.post("/api/workflows", json=dict(body, name="Other"), headers={"Idempotency-Key": "abc"})
+        assert conflict.status_code == 422
+
+        nodes_json = json.dumps({"nodes": NODES, "connections": {}})
+        first = asyncio.run(flowgent_agent.create_workflow("Agent", "", nodes_json))
+        again = asyncio.run(flowgent_agent.create_workflow("Agent", "", nodes_json))
+        assert first["status"] == "success" and "replayed" not in first
+        assert again["replayed"] is True and again["workflow_id"] == first["workflow_id"]
+        assert upstream.created == ["Route", "Agent"]
+    finally:
+        (routes.get_mcp_client, routes.get_idempotency_store,
+         flowgent_agent.get_mcp_client, flowgent_agent.get_idempotency_store) = originals
+        store.close()
+    print("✓ Route and agent tool return the existing workflow on replay")
+
+
+def test_scoped_per_credential():
+    """Identical creates through different API keys on one instance both create; URL variants share a scope."""
+    print("\nTesting credential scope...")
+    upstream = FakeCreator()
+    store = _store()
+
+    def create_client(url, api_key):
+        upstream.cache_key = instance_key(url, api_key)
+        return upstream
+
+    originals = (routes.create_n8n_client, routes.get_idempotency_store)
+    routes.create_n8n_client = create_client
+    routes.get_idempotency_store = lambda: store
+    try:
+        def post(url, api_key):
+            body = {"name": "Shared", "nodes": NODES, "connections": {},
+                    "n8n_config": {"instance_url": url, "api_key": api_key}}
+            return client.post("/api/workflows", json=body)
+
+        assert "Idempotent-Replayed" not in post("https://n8n.example.com", "alice").headers
+        assert "Idempotent-Replayed" not in post("https://n8n.example.com", "bob").headers
+        assert post("https://n8n.example.com/", "bob").headers["Idempotent-Replayed"] == "true"
+        assert upstream.created == ["Shared", "Shared"]
+    finally:
+        routes.create_n8n_client, routes.get_idempotency_store = originals
+        store.close()
+    print("✓ Outcomes are scoped per instance and API key")
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Flowgent Idempotency Tests")
+    print("="*60 + "\n")
+
+    try:
+        test_store_replays_and_coalesces()
+        test_content_window()
+        test_error_results_are_retried()
+        test_route_and_agent()
+        test_scoped_per_credential()
+
+        print("\n" + "="*60)
+        print("✓ All idempotency tests passed!")
+        print("="*60)
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
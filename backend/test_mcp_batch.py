@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Test JSON-RPC batch tool calls in the MCP client
+"""
+import asyncio
+import json
+import os
+import sys
+
+import httpx
+
+from n8n_mcp.cache import ToolResultCache
+from n8n_mcp.n8n_client import N8nMcpClient
+import agent.flowgent_agent as flowgent_agent
+
+
+def _tool_response(request_id, payload):
+    return {"jsonrpc": "2.0", "id": request_id, "result": {"content": [{"type": "text", "text": json.dumps(payload)}]}}
+
+
+def _make_client(handler):
+    client = N8nMcpClient(cache=ToolResultCache())
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client._initialized = True
+    return client
+
+
+def test_batch_returns_results_by_id():
+    """One POST carries every call; results come back in input order with per-item errors."""
+    print("Testing JSON-RPC batch...")
+    posts = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        posts.append(body)
+        assert isinstance(body, list), "Expected a batch array"
+        responses = []
+        for message in reversed(body):  # out of order on purpose
+            node_type = message["params"]["arguments"]["nodeType"]
+            if node_type == "missing":
+                responses.append({"jsonrpc": "2.0", "id": message["id"], "error": {"code": -32000, "message": "Node not found"}})
+            else:
+                responses.append(_tool_response(message["id"], {"nodeType": node_type}))
+        return httpx.Response(200, json=responses)
+
+    async def run():
+        client = _make_client(handler)
+        calls = [("get_node", {"nodeType": t}) for t in ("slack", "missing", "gmail")]
+        results = await client.call_tools_batch(calls)
+        assert len(posts) == 1, "All calls should share one request"
+        assert results[0] == {"name": "get_node", "result": {"nodeType": "slack"}}
+        assert results[1] == {"name": "get_node", "error": "Node not found"}
+        assert results[2]["result"] == {"nodeType": "gmail"}
+
+        # Successful results are cached - a repeat needs no request
+        await client.call_tools_batch([calls[0], calls[2]])
+        assert len(posts) == 1, "Cached results should not be re-fetched"
+        await client._client.aclose()
+
+    asyncio.run(run())
+    print("✓ Batch results are matched by id")
+
+
+def test_falls_back_to_concurrent_requests():
+    """Servers that reject batches get pipelined single requests instead."""
+    print("\nTesting batch fallback...")
+    posts = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        posts.append(body)
+        if isinstance(body, list):
+            return httpx.Response(400, json={"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "Invalid Request"}})
+        return httpx.Response(200, json=_tool_response(body["id"], {"query": body["params"]["arguments"]["query"]}))
+
+    async def run():
+        client = _make_client(handler)
+        results = await client.call_tools_batch([("search_templates", {"query": q}) for q in ("a", "b", "c")])
+        assert [r["result"]["query"] for r in results] == ["a", "b", "c"]
+        assert client._batch_supported is False
+        assert len(posts) == 4, "One rejected batch plus three single requests"
+        await client._client.aclose()
+
+    asyncio.run(run())
+    print("✓ Falls back to concurrent requests")
+
+
+def test_failed_batch_becomes_item_errors():
+    """A 5xx on the batch POST is reported per item; cached results are still returned."""
+    print("\nTesting failed batch...")
+    posts = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        posts.append(body)
+        if not isinstance(body, list):
+            return httpx.Response(200, json=_tool_response(body["id"], {"nodeType": "slack"}))
+        return httpx.Response(503, text="upstream unavailable")
+
+    async def run():
+        client = _make_client(handler)
+        client.deadline = 0.5
+        client._batch_supported = True
+        cached = ("get_node", {"nodeType": "slack"})
+        await client.call_tools_batch([cached])
+        results = await client.call_tools_batch([cached, ("get_node", {"nodeType": "a"}), ("get_node", {"nodeType": "b"})])
+        assert results[0] == {"name": "get_node", "result": {"nodeType": "slack"}}
+        assert "503" in results[1]["error"] and "503" in results[2]["error"]
+        assert client._batch_supported is True, "A server error is not a batch rejection"
+        await client._client.aclose()
+
+    os.environ["UPSTREAM_RETRY_ATTEMPTS"] = "1"
+    try:
+        asyncio.run(run())
+    finally:
+        del os.environ["UPSTREAM_RETRY_ATTEMPTS"]
+    print("✓ Batch failures become per-item errors")
+
+
+def test_nodes_documentation_tool_merges_results():
+    """get_nodes_documentation fetches every node in one call and reports failures per node."""
+    print("\nTesting get_nodes_documentation tool...")
+    posts = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        posts.append(body)
+        responses = []
+        for message in body:
+            node_type = message["params"]["arguments"]["nodeType"]
+            if node_type == "missing":
+                responses.append({"jsonrpc": "2.0", "id": message["id"], "error": {"code": -32000, "message": "Node not found"}})
+            else:
+                responses.append(_tool_response(message["id"], {"docs": node_type}))
+        return httpx.Response(200, json=responses)
+
+    async def run():
+        client = _make_client(handler)
+        original = flowgent_agent.get_mcp_client
+        flowgent_agent.get_mcp_client = lambda: client
+        try:
+            result = await flowgent_agent.get_nodes_documentation(["slack", "gmail", "slack", "missing"])
+        finally:
+            flowgent_agent.get_mcp_client = original
+            await client._client.aclose()
+        assert len(posts) == 1 and len(posts[0]) == 3, "Duplicates are fetched once, in one round trip"
+        assert result["status"] == "success"
+        assert result["data"] == {"slack": {"docs": "slack"}, "gmail": {"docs": "gmail"}}
+        assert result["errors"] == {"missing": "Node not found"}
+
+    asyncio.run(run())
+    print("✓ Node docs are fetched together and merged")
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Flowgent MCP Batch Tests")
+    print("="*60 + "\n")
+
+    try:
+        test_batch_returns_results_by_id()
+        test_falls_back_to_concurrent_requests()
+        test_failed_batch_becomes_item_errors()
+        test_nodes_documentation_tool_merges_results()
+
+        print("\n" + "="*60)
+        print("✓ All MCP batch tests passed!")
+        print("="*60)
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test MCP tool result caching
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+from n8n_mcp.cache import ToolResultCache, SingleFlightCache, MISS
+from n8n_mcp.n8n_client import N8nMcpClient
+
+
+class CountingMcpClient(N8nMcpClient):
+    """MCP client that counts upstream tool calls instead of hitting the network."""
+
+    def __init__(self, cache):
+        super().__init__(cache=cache)
+        self.upstream_calls = 0
+
+    async def _call_tool_uncached(self, tool_name, arguments=None, on_progress=None):
+        self.upstream_calls += 1
+        return {"nodeType": arguments.get("nodeType"), "docs": "..."}
+
+
+def test_memory_and_disk_tiers():
+    """Results are served from memory, then from SQLite after a restart."""
+    print("Testing cache tiers...")
+    db_path = os.path.join(tempfile.mkdtemp(), "cache.sqlite3")
+
+    async def run():
+        cache = ToolResultCache(db_path=db_path)
+        args = {"nodeType": "n8n-nodes-base.slack", "mode": "docs"}
+        assert await cache.get("get_node", args) is MISS
+        await cache.set("get_node", args, {"docs": "slack"})
+        assert await cache.get("get_node", {"mode": "docs", "nodeType": "n8n-nodes-base.slack"}) == {"docs": "slack"}
+        cache.close()
+
+        # A fresh cache (e.g. after restart) finds the entry on disk
+        restarted = ToolResultCache(db_path=db_path)
+        assert await restarted.get("get_node", args) == {"docs": "slack"}
+        stats = restarted.stats()
+        assert stats["disk_hits"] == 1, f"Expected a disk hit, got {stats}"
+        assert await restarted.get("get_node", args) == {"docs": "slack"}
+        assert restarted.stats()["memory_hits"] == 1, "Disk hits should be promoted to memory"
+        restarted.close()
+
+    asyncio.run(run())
+    print("✓ Memory and SQLite tiers work")
+
+
+def test_ttl_and_uncacheable_results():
+    """Expired entries and error results are not served."""
+    print("\nTesting TTL and error results...")
+
+    async def run():
+        cache = ToolResultCache(ttls={"search_nodes": 0.01})
+        await cache.set("search_nodes", {"query": "slack"}, {"results": []})
+        await asyncio.sleep(0.05)
+        assert await cache.get("search_nodes", {"query": "slack"}) is MISS, "Entry should expire"
+
+        await cache.set("get_node", {"nodeType": "x"}, {"error": "not found"})
+        assert await cache.get("get_node", {"nodeType": "x"}) is MISS, "Errors must not be cached"
+        assert not cache.is_cacheable("n8n_create_workflow"), "Mutating tools must not be cached"
+
+    asyncio.run(run())
+    print("✓ TTLs and error results handled")
+
+
+def test_tool_errors_keep_is_error_and_are_not_cached():
+    """Results flagged isError stay flagged after parsing, so the cache skips them."""
+    print("\nTesting isError results...")
+    client = N8nMcpClient(cache=ToolResultCache())
+    error = {"content": [{"type": "text", "text": "Node type not found"}], "isError": True}
+    parsed = client._parse_tool_result("get_node", error)
+    assert parsed == {"text": "Node type not found", "isError": True}
+    json_error = {"content": [{"type": "text", "text": '{"message": "bad"}'}], "isError": True}
+    assert client._parse_tool_result("get_node", json_error) == {"message": "bad", "isError": True}
+    assert client._parse_tool_result("get_node", {"content": [{"type": "text", "text": "fine"}]}) == {"text": "fine"}
+
+    async def run():
+        await client._cache.set("get_node", {"nodeType": "x"}, parsed)
+        assert await client._cache.get("get_node", {"nodeType": "x"}) is MISS
+
+    asyncio.run(run())
+    print("✓ Tool errors are not cached")
+
+
+def test_client_uses_cache_for_read_only_tools():
+    """Repeated doc lookups hit the MCP server once."""
+    print("\nTesting client cache integration...")
+
+    async def run():
+        client = CountingMcpClient(cache=ToolResultCache())
+        for _ in range(5):
+            await client.get_node("n8n-nodes-base.httpRequest", mode="docs", detail="full")
+        assert client.upstream_calls == 1, f"Expected 1 upstream call, got {client.upstream_calls}"
+        assert client.cache_stats()["hit_ratio"] == 0.8
+
+    asyncio.run(run())
+    print("✓ Client serves repeated doc lookups from cache")
+
+
+def test_single_flight_coalesces_and_expires_fallbacks():
+    """Concurrent loads of one key share a single upstream call; fallbacks expire quickly."""
+    print("\nTesting single-flight node info cache...")
+
+    async def run():
+        cache = SingleFlightCache(max_entries=2, ttl=60, negative_ttl=0.01)
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return {"name": "Slack"}, len(calls) == 1  # first load is a fallback
+
+        results = await asyncio.gather(*[cache.get_or_load("slack", loader) for _ in range(10)])
+        assert len(calls) == 1, f"Expected one upstream call, got {len(calls)}"
+        assert all(r == {"name": "Slack"} for r in results)
+
+        await asyncio.sleep(0.05)
+        assert "slack" not in cache, "Fallback result should expire after negative_ttl"
+        await cache.get_or_load("slack", loader)
+        await cache.get_or_load("slack", loader)
+        assert len(calls) == 2, "Real result should stay cached"
+
+        cache.pin("seeded", {"name": "Seeded"})
+        await cache.get_or_load("a", loader)
+        await cache.get_or_load("b", loader)
+        assert "slack" not in cache, "Cache should be bounded"
+        assert cache.get("seeded") == {"name": "Seeded"}, "Pinned entries are never evicted"
+
+    asyncio.run(run())
+    print("✓ Node info loads are coalesced and bounded")
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Flowgent MCP Cache Tests")
+    print("="*60 + "\n")
+
+    try:
+        test_memory_and_disk_tiers()
+        test_ttl_and_uncacheable_results()
+        test_tool_errors_keep_is_error_and_are_not_cached()
+        test_client_uses_cache_for_read_only_tools()
+        test_single_flight_coalesces_and_expires_fallbacks()
+
+        print("\n" + "="*60)
+        print("✓ All MCP cache tests passed!")
+        print("="*60)
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
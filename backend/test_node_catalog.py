@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test the local node catalog search
+"""
+import asyncio
+import sys
+
+from n8n_mcp.node_catalog import NodeCatalog, BUNDLED_CATALOG_PATH, tokenize
+from n8n_mcp.n8n_client import N8nMcpClient
+
+
+def test_tokenize_splits_camel_case():
+    """Node types are searchable by their camelCase parts."""
+    print("Testing tokenizer...")
+    assert tokenize("n8n-nodes-base.httpRequest") == ["n8n", "nodes", "base", "httprequest", "http", "request"]
+    print("✓ Tokenizer splits camelCase")
+
+
+def test_ranked_prefix_and_fuzzy_search():
+    """Exact, prefix and misspelled queries all find the right node."""
+    print("\nTesting catalog search...")
+    catalog = NodeCatalog.from_file(BUNDLED_CATALOG_PATH)
+    assert len(catalog) > 50, "Bundled snapshot should load"
+
+    result = catalog.search("slack")
+    assert result["results"][0]["workflowNodeType"] == "n8n-nodes-base.slack"
+    assert result["exact"] is True
+
+    result = catalog.search("google sheets append")
+    assert result["results"][0]["workflowNodeType"] == "n8n-nodes-base.googleSheets"
+
+    result = catalog.search("postg")
+    assert result["results"][0]["displayName"] == "Postgres", "Prefix should match"
+
+    result = catalog.search("webhok")
+    assert result["results"][0]["displayName"] == "Webhook", "Trigram fuzzy match should catch typos"
+    assert result["exact"] is False, "Fuzzy-only matches are not exact"
+
+    assert catalog.search("xyzzy")["results"] == []
+    assert catalog.search("database")["exact"] is False, "Description-only matches are not exact"
+    assert catalog.search("google")["exact"] is False, "Words shared by several nodes are not exact"
+    assert catalog.search("a")["exact"] is False and catalog.search("s")["exact"] is False
+    assert catalog.search("tele")["exact"] is False, "Prefixes are not exact"
+    assert catalog.search("Google Sheets")["exact"] is True and catalog.search("googleSheets")["exact"] is True
+    print("✓ Ranked, prefix and fuzzy search work")
+
+
+def test_client_search_nodes_prefers_local_catalog():
+    """search_nodes answers locally when the catalog matches, and goes remote otherwise."""
+    print("\nTesting search_nodes local backend...")
+
+    class RemoteCountingClient(N8nMcpClient):
+        remote_calls = 0
+
+        async def call_tool(self, tool_name, arguments=None):
+            self.remote_calls += 1
+            results = [{"nodeType": "nodes-base.whatsApp", "displayName": "WhatsApp Business Cloud"}]
+            return {"query": arguments["query"], "results": results if "whatsapp" in arguments["query"] else [],
+                    "totalCount": 1}
+
+    async def run():
+        client = RemoteCountingClient()
+        result = await client.search_nodes("telegram")
+        assert result["source"] == "local"
+        assert client.remote_calls == 0, "Local match should not hit MCP"
+
+        await client.search_nodes("xyzzy")
+        assert client.remote_calls == 1, "No local match should fall back to MCP"
+
+        result = await client.search_nodes("google")
+        assert client.remote_calls == 2, "Broad queries still ask MCP"
+        assert len(result["results"]) == 5 and result["source"] == "mcp+local"
+
+        result = await client.search_nodes("send whatsapp message")
+        assert client.remote_calls == 3, "Matches outside node names still ask MCP"
+        names = [r["displayName"] for r in result["results"]]
+        assert names[0] == "WhatsApp Business Cloud" and len(names) > 1 and result["source"] == "mcp+local"
+
+    asyncio.run(run())
+    print("✓ search_nodes uses the local catalog first")
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Flowgent Node Catalog Tests")
+    print("="*60 + "\n")
+
+    try:
+        test_tokenize_splits_camel_case()
+        test_ranked_prefix_and_fuzzy_search()
+        test_client_search_nodes_prefers_local_catalog()
+
+        print("\n" + "="*60)
+        print("✓ All node catalog tests passed!")
+        print("="*60)
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
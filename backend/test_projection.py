@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test tool output projection
+"""
+import json
+import os
+import sys
+
+from agent.projection import project_tool_output, projection_stats, ProjectionBudget, project
+
+
+def big_node_docs():
+    return {
+        "nodeType": "n8n-nodes-base.slack",
+        "displayName": "Slack",
+        "iconUrl": "icons/slack.svg",
+        "documentation": "# Slack\n" + "Lots of markdown. " * 5000,
+        "properties": [{"name": f"prop{i}", "description": "x" * 300} for i in range(200)],
+    }
+
+
+def test_projection_fits_budget():
+    """Large results are trimmed under the byte budget with visible markers."""
+    print("Testing projection budget...")
+    docs = big_node_docs()
+    projected = project_tool_output("get_node_documentation", docs)
+    size = len(json.dumps(projected).encode("utf-8"))
+    assert size <= 16_000, f"Projected size {size} exceeds budget"
+    assert "iconUrl" not in projected, "Noise fields are dropped"
+    assert projected["displayName"] == "Slack"
+    assert "chars truncated" in projected["documentation"]
+    assert "more items omitted" in projected["properties"][-1]
+
+    stats = projection_stats()["get_node_documentation"]
+    assert stats["original_bytes"] > stats["projected_bytes"] and stats["trimmed_calls"] >= 1
+    print(f"✓ {stats['original_bytes']} bytes projected to {stats['projected_bytes']}")
+
+
+def test_parameters_and_small_results_are_kept():
+    """Node parameters keep every key and small results pass through unchanged."""
+    print("\nTesting parameter preservation...")
+    workflow = {
+        "id": "1",
+        "pinData": {"Webhook": [{"json": {"a": 1}}]},
+        "nodes": [{"name": "Slack", "parameters": {"user": "U123", "image": "cat.png"}}],
+    }
+    projected = project(workflow, ProjectionBudget())
+    assert "pinData" not in projected
+    assert projected["nodes"][0]["parameters"] == {"user": "U123", "image": "cat.png"}
+
+    small = {"results": [{"nodeType": "n8n-nodes-base.set"}]}
+    assert project_tool_output("search_nodes", small) == small
+    print("✓ Parameters and small results are untouched")
+
+
+def test_workflows_are_never_trimmed():
+    """get_workflow keeps nodes, parameters, webhookId and connections whole, or outlines a huge workflow."""
+    print("\nTesting workflow projection...")
+    nodes = [{"id": f"n{i}", "name": f"Code {i}", "type": "n8n-nodes-base.code", "typeVersion": 2,
+              "webhookId": f"hook-{i}", "parameters": {"jsCode": "return items;" * 50}} for i in range(30)]
+    connections = {"icon": {"main": [[{"node": "Code 1", "type": "main", "index": 0}]]}}
+    workflow = {"id": "1", "name": "Big", "pinData": {"a": [1]}, "nodes": nodes, "connections": connections}
+
+    projected = project_tool_output("get_workflow", workflow)
+    assert "pinData" not in projected and projected["nodes"] == nodes and projected["connections"] == connections
+
+    huge = dict(workflow, nodes=nodes * 4)
+    outline = project_tool_output("get_workflow", huge)
+    assert outline["too_large"] is True and "node_name" in outline["note"]
+    assert len(outline["nodes"]) == 120 and "parameters" not in outline["nodes"][0]
+    assert outline["connections"] == connections
+
+    # Connection keys are node names, even when they look like noise fields
+    assert project({"connections": connections}, ProjectionBudget())["connections"] == connections
+    print("✓ Workflows are passed whole or outlined")
+
+
+def test_env_override_disables_projection():
+    """AGENT_TOOL_MAX_BYTES_<TOOL>=0 passes results through as is."""
+    print("\nTesting env override...")
+    os.environ["AGENT_TOOL_MAX_BYTES_GET_WORKFLOW_TEMPLATE"] = "0"
+    try:
+        docs = big_node_docs()
+        assert project_tool_output("get_workflow_template", docs) is docs
+    finally:
+        del os.environ["AGENT_TOOL_MAX_BYTES_GET_WORKFLOW_TEMPLATE"]
+    print("✓ Projection can be disabled per tool")
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Flowgent Tool Projection Tests")
+    print("="*60 + "\n")
+
+    try:
+        test_projection_fits_budget()
+        test_parameters_and_small_results_are_kept()
+        test_workflows_are_never_trimmed()
+        test_env_override_disables_projection()
+
+        print("\n" + "="*60)
+        print("✓ All projection tests passed!")
+        print("="*60)
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Test retries, deadlines and circuit breakers for upstream calls
+"""
+import asyncio
+import json
+import sys
+
+import httpx
+from fastapi.testclient import TestClient
+
+import n8n_mcp.resilience as resilience
+from main import app
+from n8n_mcp.resilience import (
+    CircuitBreaker, CircuitOpenError, RetryPolicy, breaker_states, call_with_resilience, get_breaker,
+    retry_after_seconds, OPEN, CLOSED, HALF_OPEN
+)
+
+FAST = RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.01)
+
+
+def _status_error(status, headers=None):
+    request = httpx.Request("GET", "https://n8n.test/api/v1/workflows")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return httpx.HTTPStatusError(f"HTTP {status}", request=request, response=response)
+
+
+def test_idempotent_calls_retry_transient_errors():
+    """GET-like calls retry 503s; writes do not."""
+    print("Testing retries...")
+
+    async def run():
+        attempts = []
+
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise _status_error(503)
+            return "ok"
+
+        assert await call_with_resilience("test-retry", flaky, idempotent=True, deadline=5, policy=FAST) == "ok"
+        assert len(attempts) == 3
+
+        attempts.clear()
+        try:
+            await call_with_resilience("test-write", flaky, idempotent=False, deadline=5, policy=FAST)
+            assert False, "Non-idempotent call should not be retried"
+        except httpx.HTTPStatusError:
+            pass
+        assert len(attempts) == 1
+
+    asyncio.run(run())
+    print("✓ Transient failures are retried only when safe")
+
+
+def test_retry_after_and_deadline():
+    """Retry-After is honored, but never beyond the deadline."""
+    print("\nTesting Retry-After and deadline...")
+    assert retry_after_seconds(_status_error(429, {"Retry-After": "2"})) == 2.0
+
+    async def run():
+        async def throttled():
+            raise _status_error(429, {"Retry-After": "10"})
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            await call_with_resilience("test-deadline", throttled, idempotent=True, deadline=1, policy=FAST)
+            assert False, "Should give up"
+        except httpx.HTTPStatusError:
+            pass
+        assert loop.time() - started < 0.5, "Should not sleep past the deadline"
+
+    asyncio.run(run())
+    print("✓ Retry-After respected within the deadline")
+
+
+def test_breaker_opens_fails_fast_and_recovers():
+    """After repeated failures the breaker rejects calls, then probes and closes."""
+    print("\nTesting circuit breaker...")
+    breaker = get_breaker("test-breaker")
+    breaker.failure_threshold = 2
+    breaker.reset_timeout = 0.05
+
+    async def run():
+        calls = []
+
+        async def down():
+            calls.append(1)
+            raise httpx.ConnectError("connection refused")
+
+        for _ in range(2):
+            try:
+                await call_with_resilience("test-breaker", down, idempotent=True, deadline=5,
+                                           policy=RetryPolicy(max_attempts=1))
+            except httpx.ConnectError:
+                pass
+        assert breaker.state == OPEN
+
+        try:
+            await call_with_resilience("test-breaker", down, idempotent=True, deadline=5)
+            assert False, "Open breaker should fail fast"
+        except CircuitOpenError:
+            pass
+        assert len(calls) == 2, "Open breaker must not call the upstream"
+
+        await asyncio.sleep(0.06)
+
+        async def up():
+            return "ok"
+
+        assert await call_with_resilience("test-breaker", up, idempotent=True, deadline=5) == "ok"
+        assert breaker.state == CLOSED
+
+    asyncio.run(run())
+    print("✓ Breaker opens, fails fast and recovers")
+
+
+def test_half_open_allows_single_probe():
+    """Only one probe goes through while half-open."""
+    print("\nTesting half-open probe...")
+    breaker = CircuitBreaker("probe", failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow() is True
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is False, "Second caller should be rejected during the probe"
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    print("✓ Half-open state lets one probe through")
+
+
+def test_health_hides_instances_and_evicts_idle_breakers():
+    """/health reports the MCP breaker and an anonymous n8n count; idle n8n breakers are dropped."""
+    print("\nTesting breaker reporting...")
+    instance = get_breaker("n8n:https://private.example.com")
+    instance.failure_threshold = 1
+    instance.record_failure()
+    states = breaker_states()
+    assert "n8n:https://private.example.com" not in json.dumps(states)
+    assert states["n8n"]["open"] >= 1
+
+    body = TestClient(app).get("/health").json()
+    assert "private.example.com" not in json.dumps(body)
+    assert body["status"] == ("degraded" if body["upstreams"].get("mcp", {}).get("state") == OPEN else "healthy")
+
+    instance.last_used -= 10_000
+    get_breaker("n8n:https://other.example.com")
+    assert "n8n:https://private.example.com" not in resilience._breakers
+    print("✓ Instance URLs stay private and idle breakers are evicted")
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Flowgent Resilience Tests")
+    print("="*60 + "\n")
+
+    try:
+        test_idempotent_calls_retry_transient_errors()
+        test_retry_after_and_deadline()
+        test_breaker_opens_fails_fast_and_recovers()
+        test_half_open_allows_single_probe()
+        test_health_hides_instances_and_evicts_idle_breakers()
+
+        print("\n" + "="*60)
+        print("✓ All resilience tests passed!")
+        print("="*60)
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
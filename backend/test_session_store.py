@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test the SQLite session store
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from google.genai import types
+
+from agent.session_store import SqliteSessionService
+
+APP = "flowgent"
+USER = "default_user"
+
+
+def _event(author, text, state_delta=None):
+    return Event(
+        author=author,
+        invocation_id="inv",
+        content=types.Content(role="user" if author == "user" else "model", parts=[types.Part(text=text)]),
+        actions=EventActions(state_delta=state_delta or {}),
+    )
+
+
+def test_sessions_survive_restart():
+    """Events and state are persisted and visible to a second service on the same file."""
+    print("Testing persistence...")
+    path = os.path.join(tempfile.mkdtemp(), "sessions.sqlite3")
+
+    async def run():
+        service = SqliteSessionService(path)
+        session = await service.create_session(app_name=APP, user_id=USER, session_id="s1")
+        await service.append_event(session, _event("user", "hello", {"topic": "slack", "user:plan": "pro", "temp:x": 1}))
+        await service.append_event(session, _event("flowgent", "hi there"))
+        service.close()
+
+        other = SqliteSessionService(path)
+        loaded = await other.get_session(app_name=APP, user_id=USER, session_id="s1")
+        assert [e.content.parts[0].text for e in loaded.events] == ["hello", "hi there"]
+        assert loaded.state["topic"] == "slack" and loaded.state["user:plan"] == "pro"
+        assert "temp:x" not in loaded.state, "temp: state is never persisted"
+
+        listed = await other.list_sessions(app_name=APP, user_id=USER)
+        assert [s.id for s in listed.sessions] == ["s1"]
+        await other.delete_session(app_name=APP, user_id=USER, session_id="s1")
+        assert await other.get_session(app_name=APP, user_id=USER, session_id="s1") is None
+        other.close()
+
+    asyncio.run(run())
+    print("✓ Sessions persist across service instances")
+
+
+def test_history_cap_and_idle_expiry():
+    """History is trimmed at a user turn and idle sessions expire."""
+    print("\nTesting history cap and expiry...")
+    path = os.path.join(tempfile.mkdtemp(), "sessions.sqlite3")
+
+    async def run():
+        service = SqliteSessionService(path, max_cached=1, max_events=4)
+        session = await service.create_session(app_name=APP, user_id=USER, session_id="s1")
+        for turn in range(4):
+            await service.append_event(session, _event("user", f"question {turn}"))
+            await service.append_event(session, _event("flowgent", f"answer {turn}"))
+
+        # Another session evicts s1 from the hot cache, so this read comes from SQLite
+        await service.create_session(app_name=APP, user_id=USER, session_id="s2")
+        loaded = await service.get_session(app_name=APP, user_id=USER, session_id="s1")
+        texts = [e.content.parts[0].text for e in loaded.events]
+        assert texts == ["question 2", "answer 2", "question 3", "answer 3"], texts
+
+        service.idle_ttl = 0.01
+        time.sleep(0.02)
+        assert service.purge_expired() == 2
+        assert await service.get_session(app_name=APP, user_id=USER, session_id="s1") is None
+        service.close()
+
+    asyncio.run(run())
+    print("✓ History is capped and idle sessions expire")
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Flowgent Session Store Tests")
+    print("="*60 + "\n")
+
+    try:
+        test_sessions_survive_restart()
+        test_history_cap_and_idle_expiry()
+
+        print("\n" + "="*60)
+        print("✓ All session store tests passed!")
+        print("="*60)
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test incremental SSE parsing of MCP responses
+"""
+import asyncio
+import json
+import sys
+
+import httpx
+
+from n8n_mcp.sse import SSEParser
+from n8n_mcp.n8n_client import N8nMcpClient
+
+
+STREAM = (
+    b"event: message\r\n"
+    b"data: {\"jsonrpc\": \"2.0\", \"method\": \"notifications/progress\",\r\n"
+    b"data:  \"params\": {\"progressToken\": 1, \"progress\": 50}}\r\n"
+    b"\r\n"
+    b": keep-alive comment\n"
+    b"event: message\n"
+    b"data: {\"jsonrpc\": \"2.0\", \"id\": 1, \"result\": {\"content\": [{\"type\": \"text\", \"text\": \"{\\\"ok\\\": true}\"}]}}\n"
+    b"\n"
+)
+
+
+def test_parser_handles_any_chunking():
+    """Events decode the same no matter how the bytes are split."""
+    print("Testing SSE parser chunking...")
+    for size in (1, 2, 5, 17, len(STREAM)):
+        parser = SSEParser()
+        events = []
+        for i in range(0, len(STREAM), size):
+            events.extend(parser.feed(STREAM[i:i + size]))
+        events.extend(parser.flush())
+        assert len(events) == 2, f"chunk size {size}: expected 2 events, got {len(events)}"
+        assert events[0].json()["params"]["progress"] == 50, "Multi-line data should be joined"
+        assert events[1].json()["id"] == 1
+    print("✓ Parser is chunking-independent")
+
+
+def test_flush_dispatches_unterminated_event():
+    """A final event without a trailing blank line is still delivered."""
+    print("\nTesting flush...")
+    parser = SSEParser()
+    assert parser.feed(b"data: {\"id\": 3}") == []
+    events = parser.flush()
+    assert [e.json() for e in events] == [{"id": 3}]
+    print("✓ Trailing event is dispatched on flush")
+
+
+def test_call_mcp_streams_response_and_progress():
+    """_call_mcp reads a streamed response and surfaces progress notifications."""
+    print("\nTesting streamed _call_mcp...")
+
+    def handler(request):
+        body = json.loads(request.content)
+        assert body["params"]["_meta"]["progressToken"] == body["id"], "Progress token should be requested"
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=STREAM)
+
+    async def run():
+        client = N8nMcpClient()
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        progress = []
+        result = await client._call_mcp("tools/call", {"name": "get_node"}, on_progress=progress.append)
+        assert result == {"content": [{"type": "text", "text": "{\"ok\": true}"}]}
+        assert progress == [{"progressToken": 1, "progress": 50}]
+        await client._client.aclose()
+
+    asyncio.run(run())
+    print("✓ Streamed responses and progress notifications work")
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Flowgent SSE Parser Tests")
+    print("="*60 + "\n")
+
+    try:
+        test_parser_handles_any_chunking()
+        test_flush_dispatches_unterminated_event()
+        test_call_mcp_streams_response_and_progress()
+
+        print("\n" + "="*60)
+        print("✓ All SSE parser tests passed!")
+        print("="*60)
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test request tracing and chat timings
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+from fastapi.testclient import TestClient
+
+import api.routes as routes
+from main import app
+from observability.tracing import (
+    span, start_span, finish, llm_step_started, llm_step_finished, timing_breakdown, to_otlp, export_trace
+)
+
+client = TestClient(app)
+
+
+def test_spans_nest_and_break_down():
+    """Child spans attach to the current span and are summed per category."""
+    print("Testing span nesting...")
+
+    async def run():
+        with span("chat.turn", category="chat") as turn:
+            llm_step_started("inv-1", "demo-model")
+            llm_step_finished("inv-1")
+            with span("tool get_workflow", category="tool"):
+                upstream = start_span("n8n GET /workflows/{id}", category="n8n")
+                await asyncio.sleep(0.01)
+                finish(upstream, RuntimeError("boom"))
+        return turn
+
+    turn = asyncio.run(run())
+    names = {s.name: s for s in turn.trace.spans}
+    assert names["tool get_workflow"].parent_id == turn.span_id
+    assert names["n8n GET /workflows/{id}"].parent_id == names["tool get_workflow"].span_id
+    assert start_span("outside a trace") is None
+
+    timings = timing_breakdown(turn)
+    assert timings["llm_calls"] == 1 and timings["tool_calls"] == 1 and timings["n8n_calls"] == 1
+    assert timings["n8n_ms"] >= 10
+    assert timings["slowest"][0]["name"] in ("tool get_workflow", "n8n GET /workflows/{id}")
+    assert any(s.get("error") == "RuntimeError: boom" for s in timings["slowest"])
+    print("✓ Spans nest and roll up into the timing breakdown")
+
+
+def test_otlp_file_export():
+    """Finished traces are written as OTLP/JSON."""
+    print("\nTesting OTLP export...")
+    path = os.path.join(tempfile.mkdtemp(), "traces.jsonl")
+    os.environ["TRACE_EXPORT"] = "file"
+    os.environ["TRACE_EXPORT_PATH"] = path
+    try:
+        with span("root", count=3) as root:
+            finish(start_span("child", category="mcp"))
+    finally:
+        del os.environ["TRACE_EXPORT"], os.environ["TRACE_EXPORT_PATH"]
+
+    with open(path) as f:
+        exported = json.loads(f.readline())
+    assert exported == to_otlp(root.trace)
+    spans = exported["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert {s["name"] for s in spans} == {"root", "child"}
+    assert all(s["traceId"] == root.trace.trace_id for s in spans)
+    root_span = next(s for s in spans if s["name"] == "root")
+    assert "parentSpanId" not in root_span
+    assert {"key": "count", "value": {"intValue": "3"}} in root_span["attributes"]
+    export_trace(root.trace)  # export off: no-op
+    print("✓ Traces export as OTLP/JSON")
+
+
+def test_chat_debug_timings():
+    """/chat returns timings only when debug is requested."""
+    print("\nTesting /chat timings...")
+    original = routes.chat_with_agent
+
+    async def fake_chat(message, session_id):
+        with span("tool search_nodes", category="tool"):
+            await asyncio.sleep(0.005)
+        return "done"
+
+    routes.chat_with_agent = fake_chat
+    try:
+        plain = client.post("/api/chat", json={"message": "hi"}).json()
+        debug = client.post("/api/chat", json={"message": "hi", "debug": True}).json()
+    finally:
+        routes.chat_with_agent = original
+
+    assert plain["response"] == "done" and plain["timings"] is None
+    timings = debug["timings"]
+    assert timings["tool_calls"] == 1 and timings["tool_ms"] >= 5
+    assert timings["total_ms"] >= timings["tool_ms"]
+    assert len(timings["trace_id"]) == 32
+    print("✓ Debug chat responses carry a timing breakdown")
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Flowgent Tracing Tests")
+    print("="*60 + "\n")
+
+    try:
+        test_spans_nest_and_break_down()
+        test_otlp_file_export()
+        test_chat_debug_timings()
+
+        print("\n" + "="*60)
+        print("✓ All tracing tests passed!")
+        print("="*60)
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
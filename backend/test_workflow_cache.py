@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test the workflow snapshot cache
+"""
+import asyncio
+import sys
+import time
+
+from n8n_mcp.direct_client import DirectN8nClient
+from n8n_mcp.workflow_cache import WorkflowSnapshotCache, get_workflow_cache
+
+
+class FakeN8nClient(DirectN8nClient):
+    """One workflow whose updatedAt changes on every PUT."""
+
+    def __init__(self):
+        super().__init__("https://cache-test.n8n.com", "test-key")
+        self.workflow = {"id": "1", "name": "Original", "nodes": [], "connections": {}, "updatedAt": "v1"}
+        self.requests = []
+
+    async def _request(self, method, endpoint, **kwargs):
+        self.requests.append((method, endpoint))
+        if method == "GET" and endpoint == "/workflows":
+            return {"data": [dict(self.workflow)], "nextCursor": None}
+        if method == "PUT":
+            version = int(self.workflow["updatedAt"][1:]) + 1
+            self.workflow = {**self.workflow, **kwargs["json"], "updatedAt": f"v{version}"}
+        return dict(self.workflow)
+
+
+def test_fresh_and_revalidated_hits():
+    """Snapshots are served while fresh, then while listings confirm updatedAt."""
+    print("Testing snapshot cache...")
+    cache = WorkflowSnapshotCache(fresh_ttl=0, index_ttl=60)
+    instance = ("https://n8n", "key")
+    cache.store(instance, {"id": "7", "updatedAt": "a", "nodes": [{"name": "Start"}]})
+
+    assert cache.get(instance, "7")["nodes"] == [{"name": "Start"}], "Own write is indexed"
+
+    cache.observe_listing(instance, [{"id": "7", "updatedAt": "b"}])
+    assert cache.get(instance, "7") is None, "Newer updatedAt in a listing must invalidate"
+
+    copy = WorkflowSnapshotCache(fresh_ttl=60)
+    copy.store(instance, {"id": "7", "updatedAt": "a", "nodes": []})
+    copy.get(instance, "7")["nodes"].append({"name": "Injected"})
+    assert copy.get(instance, "7")["nodes"] == [], "Callers get copies"
+    print("✓ Fresh, revalidated and stale snapshots behave")
+
+
+def test_instances_and_index_are_bounded():
+    """Least recently used instances are dropped whole; listing indexes keep only recent, unexpired ids."""
+    print("\nTesting bounds...")
+    cache = WorkflowSnapshotCache(fresh_ttl=60, max_index_per_instance=10, max_instances=2)
+    for key in ("a", "b"):
+        cache.store(("https://n8n", key), {"id": "1", "updatedAt": "v1"})
+    assert cache.get(("https://n8n", "a"), "1") is not None
+    cache.observe_listing(("https://n8n", "c"), [{"id": str(i), "updatedAt": "v1"} for i in range(50)])
+    assert cache.get(("https://n8n", "b"), "1") is None, "least recently used instance is evicted"
+    assert cache.get(("https://n8n", "a"), "1") is not None and len(cache._instances) == 2
+    assert list(cache._instances[("https://n8n", "c")].index) == [str(i) for i in range(40, 50)]
+
+    expiring = WorkflowSnapshotCache(index_ttl=0.01)
+    expiring.observe_listing(("https://n8n", "a"), [{"id": str(i)} for i in range(100)])
+    time.sleep(0.02)
+    expiring.observe_listing(("https://n8n", "a"), [{"id": "new"}])
+    assert list(expiring._instances[("https://n8n", "a")].index) == ["new"], "expired sightings are dropped"
+    print("✓ Instances and listing indexes are bounded")
+
+
+def test_client_reuses_and_refreshes_snapshot():
+    """Repeated get_workflow hits the cache; our own update replaces the snapshot."""
+    print("\nTesting DirectN8nClient integration...")
+    get_workflow_cache().clear()
+    fake = FakeN8nClient()
+
+    async def run():
+        for _ in range(3):
+            await fake.get_workflow("1")
+        assert fake.requests.count(("GET", "/workflows/1")) == 1, "Later reads should be cached"
+
+        await fake.update_workflow("1", {"name": "Renamed"})
+        workflow = await fake.get_workflow("1")
+        assert workflow["name"] == "Renamed" and workflow["updatedAt"] == "v2"
+        assert fake.requests.count(("GET", "/workflows/1")) == 1, "PUT response refreshes the snapshot"
+
+    asyncio.run(run())
+    print("✓ get_workflow is served from the snapshot cache")
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Flowgent Workflow Cache Tests")
+    print("="*60 + "\n")
+
+    try:
+        test_fresh_and_revalidated_hits()
+        test_instances_and_index_are_bounded()
+        test_client_reuses_and_refreshes_snapshot()
+
+        print("\n" + "="*60)
+        print("✓ All workflow cache tests passed!")
+        print("="*60)
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test the workflow graph: analysis and branch-aware auto-connection
+"""
+import sys
+import time
+
+from n8n_mcp.workflow_graph import WorkflowGraph, auto_connect
+
+
+def _node(name, node_type="n8n-nodes-base.set", **parameters):
+    return {"id": name.lower().replace(" ", "-"), "name": name, "type": node_type,
+            "typeVersion": 1, "position": [0, 0], "parameters": parameters}
+
+
+def _link(*targets):
+    return [[{"node": t, "type": "main", "index": 0}] for t in targets]
+
+
+def test_compile_and_analyse():
+    """Edges are indexed per output; order, cycles, reachability, orphans and dangling links are found."""
+    print("Testing analysis...")
+    nodes = [
+        _node("Webhook", "n8n-nodes-base.webhook"), _node("If", "n8n-nodes-base.if"),
+        _node("Yes"), _node("No"), _node("Loop A"), _node("Loop B"), _node("Lonely"),
+        {"name": "Note", "type": "n8n-nodes-base.stickyNote"},
+    ]
+    connections = {
+        "Webhook": {"main": _link("If")},
+        "If": {"main": _link("Yes", "No")},
+        "Yes": {"main": _link("Ghost")},
+        "Loop A": {"main": _link("Loop B")},
+        "Loop B": {"main": _link("Loop A")},
+    }
+    graph = WorkflowGraph(nodes, connections)
+    assert graph.name_of(graph.outputs(graph.index["If"])[1]) == ["No"]
+    assert graph.dangling == [("Yes", "Ghost")]
+    assert graph.name_of(graph.triggers()) == ["Webhook"]
+    assert [graph.name_of(c) for c in graph.cycles()] == [["Loop A", "Loop B"]]
+    order = graph.name_of(graph.topological_order())
+    assert order.index("Webhook") < order.index("If") < order.index("No") and "Loop A" not in order
+    assert graph.name_of(graph.orphans()) == ["Lonely"]
+    assert graph.name_of(graph.unreachable()) == ["Loop A", "Loop B", "Lonely"]
+    assert graph.to_connections() == {k: v for k, v in connections.items() if k != "Yes"}
+
+    duplicate = WorkflowGraph([_node("A"), _node("A")])
+    assert duplicate.duplicate_names == ["A"]
+    print("✓ Graph analysis works")
+
+
+def test_auto_connect_linear_and_branches():
+    """Plain lists chain; If outputs feed the next nodes in turn and a Merge joins the branches."""
+    print("\nTesting auto-connect...")
+    assert auto_connect([_node("Manual Trigger", "n8n-nodes-base.manualTrigger"), _node("A"), _node("B")]) == {
+        "Manual Trigger": {"main": _link("A")}, "A": {"main": _link("B")},
+    }
+
+    nodes = [
+        _node("Webhook", "n8n-nodes-base.webhook"), _node("Check", "n8n-nodes-base.if"),
+        _node("Approve"), _node("Reject"), _node("Notify"), _node("Join", "n8n-nodes-base.merge"), _node("Done"),
+    ]
+    connections = auto_connect(nodes)
+    assert connections["Check"] == {"main": _link("Approve", "Reject")}
+    assert connections["Reject"] == {"main": _link("Notify")}
+    assert connections["Approve"] == {"main": [[{"node": "Join", "type": "main", "index": 0}]]}
+    assert connections["Notify"] == {"main": [[{"node": "Join", "type": "main", "index": 1}]]}
+    assert connections["Join"] == {"main": _link("Done")}
+
+    switch = _node("Route", "n8n-nodes-base.switch", rules={"values": [{}, {}, {}]})
+    connections = auto_connect([_node("Start", "n8n-nodes-base.manualTrigger"), switch, _node("A"), _node("B"), _node("C")])
+    assert connections["Route"] == {"main": _link("A", "B", "C")}
+    print("✓ Auto-connect follows branches")
+
+
+def test_auto_connect_ai_sub_nodes():
+    """Models, memory and tools attach to the agent with their ai_* connection type."""
+    print("\nTesting AI sub-nodes...")
+    nodes = [
+        _node("Chat", "@n8n/n8n-nodes-langchain.chatTrigger"),
+        _node("Agent", "@n8n/n8n-nodes-langchain.agent"),
+        _node("Model", "@n8n/n8n-nodes-langchain.lmChatOpenAi"),
+        _node("Memory", "@n8n/n8n-nodes-langchain.memoryBufferWindow"),
+        _node("Reply"),
+    ]
+    connections = auto_connect(nodes)
+    assert connections["Chat"] == {"main": _link("Agent")}
+    assert connections["Agent"] == {"main": _link("Reply")}
+    assert connections["Model"] == {"ai_languageModel": [[{"node": "Agent", "type": "ai_languageModel", "index": 0}]]}
+    assert connections["Memory"] == {"ai_memory": [[{"node": "Agent", "type": "ai_memory", "index": 0}]]}
+    assert WorkflowGraph(nodes, connections).unreachable() == []
+    print("✓ Sub-nodes attach to their agent")
+
+
+def test_linear_time():
+    """A 20k-node chain compiles, sorts and is checked for cycles quickly."""
+    print("\nTesting scale...")
+    nodes = [_node("Start", "n8n-nodes-base.manualTrigger")] + [_node(f"N{i}") for i in range(20000)]
+    started = time.perf_counter()
+    graph = WorkflowGraph(nodes, auto_connect(nodes))
+    assert len(graph.topological_order()) == len(nodes) and graph.cycles() == []
+    assert len(graph.reachable(graph.triggers())) == len(nodes)
+    elapsed = time.perf_counter() - started
+    assert elapsed < 2.0, elapsed
+    print(f"✓ 20k nodes analysed in {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Flowgent Workflow Graph Tests")
+    print("="*60 + "\n")
+
+    try:
+        test_compile_and_analyse()
+        test_auto_connect_linear_and_branches()
+        test_auto_connect_ai_sub_nodes()
+        test_linear_time()
+
+        print("\n" + "="*60)
+        print("✓ All workflow graph tests passed!")
+        print("="*60)
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test cursor-paginated workflow listing
+"""
+import asyncio
+import json
+import sys
+
+from fastapi.testclient import TestClient
+
+import api.routes as routes
+import agent.flowgent_agent as flowgent_agent
+from agent.context import request_context
+from main import app
+from n8n_mcp.direct_client import DirectN8nClient
+
+client = TestClient(app)
+
+
+class FakePagedN8nClient(DirectN8nClient):
+    """Serves `total` workflows through n8n-style cursor pagination."""
+
+    def __init__(self, total):
+        super().__init__("https://test.n8n.com", "test-key")
+        self.workflows = [{"id": str(i), "name": f"Workflow {i}", "active": i % 2 == 0} for i in range(total)]
+        self.requests = []
+
+    async def _request(self, method, endpoint, **kwargs):
+        params = kwargs.get("params", {})
+        self.requests.append(params)
+        start = int(params.get("cursor") or 0)
+        end = start + params["limit"]
+        return {
+            "data": self.workflows[start:end],
+            "nextCursor": str(end) if end < len(self.workflows) else None
+        }
+
+
+def test_list_workflows_walks_every_page():
+    """list_workflows follows nextCursor until the last page."""
+    print("Testing pagination...")
+    fake = FakePagedN8nClient(25)
+    workflows = asyncio.run(fake.list_workflows(page_size=10))
+    assert [w["id"] for w in workflows] == [str(i) for i in range(25)]
+    assert len(fake.requests) == 3, "25 workflows at 10 per page is 3 requests"
+    print("✓ All pages are fetched")
+
+
+def test_stream_ndjson_with_limit_and_cursor():
+    """stream=1 emits NDJSON rows and a resumable nextCursor."""
+    print("\nTesting NDJSON stream...")
+    fake = FakePagedN8nClient(25)
+    original = routes.get_n8n_client_from_headers
+    routes.get_n8n_client_from_headers = lambda url, key: fake
+    try:
+        response = client.get("/api/workflows", params={"stream": 1, "limit": 12, "page_size": 5})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        rows, trailer = lines[:-1], lines[-1]
+        assert [r["id"] for r in rows] == [str(i) for i in range(12)]
+        assert trailer == {"nextCursor": "12"}, f"Cursor should resume after the last row, got {trailer}"
+
+        response = client.get("/api/workflows", params={"stream": 1, "cursor": trailer["nextCursor"]})
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["id"] for r in lines[:-1]] == [str(i) for i in range(12, 25)]
+        assert lines[-1] == {"nextCursor": None}
+
+        response = client.get("/api/workflows")
+        assert len(response.json()) == 25, "Non-streaming mode should return every workflow"
+        assert "X-Next-Cursor" not in response.headers
+
+        response = client.get("/api/workflows", params={"limit": 10, "page_size": 4})
+        assert len(response.json()) == 10 and response.headers["X-Next-Cursor"] == "10"
+    finally:
+        routes.get_n8n_client_from_headers = original
+    print("✓ NDJSON stream supports limit and cursor")
+
+
+def test_agent_tool_returns_one_page():
+    """The agent's list_workflows returns a capped page and a cursor instead of the whole instance."""
+    print("\nTesting agent list_workflows...")
+    fake = FakePagedN8nClient(250)
+    original = flowgent_agent.create_n8n_client
+    flowgent_agent.create_n8n_client = lambda url, key: fake
+
+    async def run():
+        with request_context(instance_url="https://test.n8n.com", api_key="test-key"):
+            first = await flowgent_agent.list_workflows(limit=1000)
+            second = await flowgent_agent.list_workflows(cursor=first["next_cursor"])
+        return first, second
+
+    try:
+        first, second = asyncio.run(run())
+        assert first["count"] == flowgent_agent.LIST_WORKFLOWS_MAX and first["next_cursor"] == "100"
+        assert second["workflows"][0]["id"] == "100" and second["count"] == 50
+    finally:
+        flowgent_agent.create_n8n_client = original
+    print("✓ Agent tool pages with a cursor")
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Flowgent Workflow Pagination Tests")
+    print("="*60 + "\n")
+
+    try:
+        test_list_workflows_walks_every_page()
+        test_stream_ndjson_with_limit_and_cursor()
+        test_agent_tool_returns_one_page()
+
+        print("\n" + "="*60)
+        print("✓ All pagination tests passed!")
+        print("="*60)
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
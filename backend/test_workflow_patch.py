@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Test node-level workflow patches with optimistic concurrency
+"""
+import asyncio
+import sys
+
+from fastapi.testclient import TestClient
+
+import api.routes as routes
+from main import app
+from n8n_mcp.direct_client import DirectN8nClient
+from n8n_mcp.workflow_cache import get_workflow_cache
+from n8n_mcp.workflow_patch import apply_workflow_patch, WorkflowPatchError, WorkflowConflictError
+
+client = TestClient(app)
+
+
+def sample_workflow():
+    return {
+        "id": "42",
+        "name": "Leads",
+        "updatedAt": "v1",
+        "settings": {},
+        "nodes": [
+            {"id": "a", "name": "Webhook", "type": "n8n-nodes-base.webhook", "parameters": {}},
+            {"id": "b", "name": "HTTP Request", "type": "n8n-nodes-base.httpRequest", "parameters": {"url": "https://old"}},
+        ],
+        "connections": {
+            "Webhook": {"main": [[{"node": "HTTP Request", "type": "main", "index": 0}]]}
+        }
+    }
+
+
+class FakeN8nClient(DirectN8nClient):
+    """Serves one workflow; `edited_elsewhere` simulates a change made in the n8n editor."""
+
+    def __init__(self):
+        super().__init__("https://patch-test.n8n.com", "test-key")
+        self.workflow = sample_workflow()
+        self.puts = []
+
+    def edited_elsewhere(self):
+        self.workflow = {**self.workflow, "name": "Edited in n8n", "updatedAt": "v-human"}
+
+    async def _request(self, method, endpoint, **kwargs):
+        if method == "PUT":
+            self.puts.append(kwargs["json"])
+            self.workflow = {**self.workflow, **kwargs["json"], "updatedAt": f"v{len(self.puts) + 1}"}
+        return dict(self.workflow)
+
+
+def test_apply_operations():
+    """Renames follow connections, removals drop them, and failures change nothing."""
+    print("Testing patch operations...")
+    original = sample_workflow()
+    patched = apply_workflow_patch(original, [
+        {"type": "updateNode", "nodeName": "HTTP Request", "updates": {"parameters.url": "https://new"}},
+        {"type": "renameNode", "nodeName": "HTTP Request", "newName": "Fetch"},
+        {"type": "addNode", "node": {"name": "Set", "type": "n8n-nodes-base.set", "parameters": {}}},
+        {"type": "addConnection", "source": "Fetch", "target": "Set"},
+    ])
+    fetch = next(n for n in patched["nodes"] if n["name"] == "Fetch")
+    assert fetch["parameters"]["url"] == "https://new"
+    assert patched["connections"]["Webhook"]["main"][0][0]["node"] == "Fetch"
+    assert patched["connections"]["Fetch"]["main"][0][0]["node"] == "Set"
+    assert original == sample_workflow(), "Input must not be modified"
+
+    patched = apply_workflow_patch(original, [{"type": "removeNode", "nodeName": "HTTP Request"}])
+    assert patched["connections"]["Webhook"]["main"] == [[]]
+
+    try:
+        apply_workflow_patch(original, [{"type": "updateName", "name": "X"}, {"type": "removeNode", "nodeName": "Nope"}])
+        assert False, "Unknown node should fail"
+    except WorkflowPatchError as e:
+        assert "Operation 1" in str(e)
+    print("✓ Patch operations apply correctly")
+
+
+def test_direct_client_detects_conflicts():
+    """A stale expected_updated_at is rejected; a current one is applied in one PUT."""
+    print("\nTesting optimistic concurrency...")
+    get_workflow_cache().clear()
+    fake = FakeN8nClient()
+
+    async def run():
+        base = await fake.get_workflow("42")
+        result = await fake.patch_workflow("42", [{"type": "updateName", "name": "Leads v2"}], base["updatedAt"])
+        assert result["name"] == "Leads v2" and len(fake.puts) == 1
+
+        fake.edited_elsewhere()
+        try:
+            await fake.patch_workflow("42", [{"type": "updateName", "name": "Leads v3"}], result["updatedAt"])
+            assert False, "Editor change should be a conflict"
+        except WorkflowConflictError as e:
+            assert e.actual == "v-human"
+        assert len(fake.puts) == 1, "Nothing should be written on conflict"
+
+        await fake.get_workflow("42")
+        fake.workflow = {**fake.workflow, "name": "Renamed in n8n", "updatedAt": "v-human-2"}
+        await fake.patch_workflow("42", [{"type": "updateNode", "nodeName": "HTTP Request",
+                                          "updates": {"parameters.url": "https://new"}}])
+        assert fake.puts[-1]["name"] == "Renamed in n8n", "Unconditional patches start from n8n, not the cache"
+
+    asyncio.run(run())
+    print("✓ Conflicts are detected before writing")
+
+
+def test_patch_route_returns_409():
+    """PATCH /api/workflows/{id} maps conflicts to 409 and bad operations to 400."""
+    print("\nTesting PATCH route...")
+    get_workflow_cache().clear()
+    fake = FakeN8nClient()
+    original = routes.create_n8n_client
+    routes.create_n8n_client = lambda url, key: fake
+    config = {"instance_url": "https://patch-test.n8n.com", "api_key": "test-key"}
+    try:
+        response = client.patch("/api/workflows/42", json={
+            "operations": [{"type": "updateName", "name": "Renamed"}],
+            "expected_updated_at": "v1",
+            "n8n_config": config
+        })
+        assert response.status_code == 200, response.text
+        assert response.json()["name"] == "Renamed"
+
+        response = client.patch("/api/workflows/42", json={
+            "operations": [{"type": "updateName", "name": "Again"}],
+            "expected_updated_at": "v1",
+            "n8n_config": config
+        })
+        assert response.status_code == 409
+
+        response = client.patch("/api/workflows/42", json={
+            "operations": [{"type": "explode"}],
+            "n8n_config": config
+        })
+        assert response.status_code == 400
+
+        for index in ("first", None, -1):
+            response = client.patch("/api/workflows/42", json={
+                "operations": [{"type": "addConnection", "source": "Webhook", "target": "HTTP Request",
+                                "sourceIndex": index}],
+                "n8n_config": config
+            })
+            assert response.status_code == 400 and "sourceIndex" in response.json()["detail"], response.text
+    finally:
+        routes.create_n8n_client = original
+    print("✓ PATCH route reports conflicts")
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Flowgent Workflow Patch Tests")
+    print("="*60 + "\n")
+
+    try:
+        test_apply_operations()
+        test_direct_client_detects_conflicts()
+        test_patch_route_returns_409()
+
+        print("\n" + "="*60)
+        print("✓ All workflow patch tests passed!")
+        print("="*60)
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
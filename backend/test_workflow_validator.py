@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test the local workflow validator and its content-hash cache
+"""
+import asyncio
+import json
+import sys
+
+import agent.flowgent_agent as flowgent_agent
+from n8n_mcp.workflow_validator import WorkflowValidator, check_workflow, content_hash
+
+
+def _node(name, node_type="n8n-nodes-base.set"):
+    return {"id": name.lower(), "name": name, "type": node_type, "typeVersion": 1, "position": [0, 0], "parameters": {}}
+
+
+def _workflow(*names, connections=None):
+    nodes = [_node(names[0], "n8n-nodes-base.manualTrigger")] + [_node(n) for n in names[1:]]
+    if connections is None:
+        connections = {a: {"main": [[{"node": b, "type": "main", "index": 0}]]} for a, b in zip(names, names[1:])}
+    return {"name": "Test", "nodes": nodes, "connections": connections}
+
+
+def _codes(issues, severity="error"):
+    return sorted(i["code"] for i in issues if i["severity"] == severity)
+
+
+def test_local_checks():
+    """Missing fields, duplicates, dangling and malformed connections are errors; loose nodes are warnings."""
+    print("Testing local checks...")
+    assert check_workflow(_workflow("Start", "A", "B")) == []
+
+    workflow = _workflow("Start", "A", "B")
+    del workflow["nodes"][1]["id"]
+    workflow["nodes"][2]["typeVersion"] = "1"
+    workflow["nodes"][2]["position"] = [0]
+    assert _codes(check_workflow(workflow)) == ["invalid_field", "invalid_field", "missing_field"]
+
+    workflow = _workflow("Start", "A", "A")
+    workflow["nodes"][2]["id"] = "start"
+    assert _codes(check_workflow(workflow)) == ["duplicate_id", "duplicate_name"]
+
+    workflow = _workflow("Start", "A", connections={"Start": {"main": [[{"node": "Ghost"}]]}, "A": {"main": "B"}})
+    issues = check_workflow(workflow)
+    assert _codes(issues) == ["dangling_connection", "invalid_connection"]
+    assert _codes(issues, "warning") == ["orphan_node", "orphan_node"]
+
+    loop = _workflow("Start", "A", "B")
+    loop["connections"]["B"] = {"main": [[{"node": "A", "type": "main", "index": 0}]]}
+    assert _codes(check_workflow(loop), "warning") == ["cycle"]
+    assert _codes(check_workflow({"nodes": [_node("A"), _node("B")], "connections": {}}), "warning") == [
+        "no_trigger", "orphan_node", "orphan_node"]
+    assert _codes(check_workflow([])) == ["invalid_workflow"]
+    print("✓ Structural problems are caught locally")
+
+
+def test_cache_and_short_circuit():
+    """Local failures never reach the remote; unchanged content is validated once; remote errors aren't cached."""
+    print("\nTesting cache...")
+    calls = []
+
+    async def remote(workflow):
+        calls.append(workflow)
+        if workflow.get("name") == "boom":
+            raise RuntimeError("MCP down")
+        if workflow.get("name") == "flaky":
+            return {"text": "Internal error", "isError": True}
+        return {"valid": True, "errors": [], "warnings": []}
+
+    async def run():
+        validator = WorkflowValidator()
+        broken = _workflow("Start", "A", connections={"Start": {"main": [[{"node": "Ghost"}]]}})
+        result = await validator.validate(broken, remote)
+        assert result["valid"] is False and result["source"] == "local" and calls == []
+
+        good = _workflow("Start", "A", "B")
+        results = await asyncio.gather(*(validator.validate(good, remote) for _ in range(3)))
+        assert all(r["valid"] for r in results) and len(calls) == 1
+        reordered = json.loads(json.dumps(good, sort_keys=True))
+        reordered["name"] = "Renamed"
+        assert content_hash(reordered) == content_hash(good)
+        await validator.validate(reordered, remote)
+        assert len(calls) == 1 and validator.stats()["hits"] == 1
+
+        failing = dict(_workflow("Start", "C"), name="boom")
+        for _ in range(2):
+            try:
+                await validator.validate(failing, remote)
+                raise AssertionError("remote error should propagate")
+            except RuntimeError:
+                pass
+        assert len(calls) == 3
+
+        flaky = dict(_workflow("Start", "D"), name="flaky")
+        assert (await validator.validate(flaky, remote))["isError"] is True
+        await validator.validate(flaky, remote)
+        assert len(calls) == 5, "error results are not cached"
+
+    asyncio.run(run())
+    print("✓ Revalidation is served from the cache")
+
+
+def test_agent_tool():
+    """validate_workflow_json answers local errors without calling the MCP client."""
+    print("\nTesting agent tool...")
+
+    class Client:
+        calls = 0
+
+        async def validate_workflow(self, workflow):
+            Client.calls += 1
+            return {"valid": True, "errors": [], "warnings": []}
+
+    original = flowgent_agent.get_mcp_client
+    flowgent_agent.get_mcp_client = lambda: Client()
+    try:
+        broken = _workflow("Start", "A", "A")
+        result = asyncio.run(flowgent_agent.validate_workflow_json(json.dumps(broken)))
+        assert result["status"] == "success" and result["data"]["valid"] is False and Client.calls == 0
+        good = json.dumps(_workflow("Start", "Validated once"))
+        for _ in range(2):
+            assert asyncio.run(flowgent_agent.validate_workflow_json(good))["data"]["valid"] is True
+        assert Client.calls == 1
+    finally:
+        flowgent_agent.get_mcp_client = original
+    print("✓ Agent tool short-circuits and caches")
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Flowgent Workflow Validator Tests")
+    print("="*60 + "\n")
+
+    try:
+        test_local_checks()
+        test_cache_and_short_circuit()
+        test_agent_tool()
+
+        print("\n" + "="*60)
+        print("✓ All workflow validator tests passed!")
+        print("="*60)
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)